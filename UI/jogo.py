@@ -1,29 +1,35 @@
 import pygame
 import os
 import sys
+from functools import lru_cache
 from setup import *  # Importa tudo do setup
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.action import IncomeAction, ForeignAidAction, CoupAction
-from src.player import HumanPlayer, AIPlayer
-from src.game_manager import GameManager
+from src.driver import GameDriver, ACTION, TARGET
+from src.moves import INCOME, FOREIGN_AID, COUP, action_id
 
-def montar_estado(game_manager: GameManager) -> dict:
-    players = game_manager.players
-    descartadas = []
-    if hasattr(game_manager, "_deck"):
-        descartadas = [c.get("character") for c in game_manager._deck._discard_pile]
+# Evento que a thread do jogo posta para acordar o laço de frames
+EVENTO_MOTOR = pygame.USEREVENT + 1
+
+
+def montar_estado(visao: dict) -> dict:
+    """Converte a visão publicada pelo ``GameDriver`` no estado da tela."""
+    players = visao["players"]
 
     def info_oponente(idx: int) -> dict:
         if idx < len(players):
             p = players[idx]
-            return {"moedas": p.coins, "cartas": len(p.characters)}
+            return {"moedas": p["coins"], "cartas": len(p["characters"])}
         return {"moedas": 0, "cartas": 0}
 
+    if visao["game_over"]:
+        ultima_acao = f"Fim de jogo: {visao['winner']} venceu"
+    else:
+        ultima_acao = visao["last"] or "Sua vez. Escolha uma ação."
     return {
-        "rodada": len(game_manager.history) + 1,
-        "ultima_acao": game_manager.history[-1] if game_manager.history else "Sua vez. Escolha uma ação.",
-        "cartas_reveladas": descartadas,
-        "jogador": {"moedas": players[0].coins, "cartas": players[0].characters},
+        "rodada": visao["rounds"] + 1,
+        "ultima_acao": ultima_acao,
+        "cartas_reveladas": visao["discard"],
+        "jogador": {"moedas": players[0]["coins"], "cartas": players[0]["characters"]},
         "oponentes": {
             "esquerda": info_oponente(1),
             "topo": info_oponente(2),
@@ -57,49 +63,262 @@ botoes_do_menu = {
 botoes_do_menu["Renda"].center = (fundo_menu_rect.centerx, fundo_menu_rect.y + 100)
 
 
-def desenhar_info_jogador(pos_texto, moedas, cor_texto=PRETO):
-    texto_moedas = FONTE_GERAL.render(f"$ {moedas}", True, cor_texto)
-    rect_texto = texto_moedas.get_rect(center=pos_texto)
-    TELA.blit(texto_moedas, rect_texto)
+# Personagens do motor (em inglês) -> nomes dos arquivos de imagem
+NOMES_IMAGENS = {
+    "Duke": "duque", "Assassin": "assassino", "Captain": "capitao",
+    "Ambassador": "embaixador", "Contessa": "condessa",
+}
 
 
-def desenhar_cartas_reveladas(lista_cartas):
+def cartas_jogador(pos_base, lista_cartas):
+    """Cartas do jogador, viradas para cima, centradas em pos_base."""
+    itens = []
     if not lista_cartas:
-        return
+        return itens
+    largura_total = (len(lista_cartas) - 1) * ESPACAMENTO_JOGADOR + LARGURA_CARTA_JOGADOR
+    start_x = pos_base[0] - largura_total / 2
+    pos_y = pos_base[1] - ALTURA_CARTA_JOGADOR - MARGEM / 2
+    for i, nome_carta in enumerate(lista_cartas):
+        imagem = CARTAS_JOGADOR_GRANDES.get(NOMES_IMAGENS.get(nome_carta, nome_carta))
+        if imagem:
+            itens.append((imagem, imagem.get_rect(topleft=(start_x + i * ESPACAMENTO_JOGADOR, pos_y))))
+    return itens
+
+
+@lru_cache(maxsize=None)
+def verso_rotacionado(angulo):
+    return pygame.transform.rotate(CARTA_VERSO_IMG, angulo)
+
+
+def cartas_oponente(pos_base, quantidade, angulo):
+    """Cartas viradas de um oponente encostadas na borda de pos_base."""
+    itens = []
+    if quantidade <= 0 or CARTA_VERSO_IMG is None:
+        return itens
+    verso = verso_rotacionado(angulo)
+    spread = (quantidade - 1) * ESPACAMENTO_CARTAS
+    for i in range(quantidade):
+        desloc = -spread / 2 + i * ESPACAMENTO_CARTAS
+        rect = verso.get_rect()
+        if angulo == 90:
+            rect.midleft = (pos_base[0], pos_base[1] + desloc)
+        elif angulo == 270:
+            rect.midright = (pos_base[0], pos_base[1] + desloc)
+        else:
+            rect.midtop = (pos_base[0] + desloc, pos_base[1])
+        itens.append((verso, rect))
+    return itens
+
+
+@lru_cache(maxsize=256)
+def renderizar_texto(fonte, texto, cor=PRETO):
+    """Superfície do texto, guardada num LRU pelo conteúdo."""
+    return fonte.render(texto, True, cor)
+
+
+def info_jogador(pos_texto, moedas, cor_texto=PRETO):
+    texto_moedas = renderizar_texto(FONTE_GERAL, f"$ {moedas}", cor_texto)
+    return [(texto_moedas, texto_moedas.get_rect(center=pos_texto))]
+
 
+def cartas_reveladas(lista_cartas):
+    itens = []
     start_x = MARGEM
     pos_y = MARGEM * 3
 
     espacamento_reveladas = LARGURA_CARTA_REVELADA * 0.4
 
     for i, nome_carta in enumerate(lista_cartas):
-        imagem = CARTAS_REVELADAS_IMGS.get(nome_carta)
+        imagem = CARTAS_REVELADAS_IMGS.get(NOMES_IMAGENS.get(nome_carta, nome_carta))
         if imagem:
-            TELA.blit(imagem, (start_x + i * espacamento_reveladas, pos_y))
+            itens.append((imagem, imagem.get_rect(topleft=(start_x + i * espacamento_reveladas, pos_y))))
+    return itens
 
-def desenhar_menu_de_acoes():
-    fundo_transparente = pygame.Surface(TELA.get_size(), pygame.SRCALPHA); fundo_transparente.fill((0, 0, 0, 180)); TELA.blit(fundo_transparente, (0, 0))
-    pygame.draw.rect(TELA, BRANCO, fundo_menu_rect); pygame.draw.rect(TELA, PRETO, fundo_menu_rect, 2)
-    texto_titulo = FONTE_TITULO.render("Ações", True, PRETO); rect_titulo = texto_titulo.get_rect(center=(fundo_menu_rect.centerx, fundo_menu_rect.y + 40)); TELA.blit(texto_titulo, rect_titulo)
+
+def _montar_fundo():
+    """Camada fixa: fundo branco, moldura da caixa de informação e botão de ação."""
+    fundo = pygame.Surface(TELA.get_size()).convert()
+    fundo.fill(BRANCO)
+    pygame.draw.rect(fundo, (240, 240, 240), info_rect)
+    pygame.draw.rect(fundo, PRETO, info_rect, 2)
+    pygame.draw.rect(fundo, CINZA, botao_acao_rect)
+    texto_botao = renderizar_texto(FONTE_GERAL, "Ação")
+    fundo.blit(texto_botao, texto_botao.get_rect(center=botao_acao_rect.center))
+    return fundo
+
+
+def _montar_menu_de_acoes():
+    """Menu de ações pronto: véu escuro em tela cheia, caixa, título e botões."""
+    menu = pygame.Surface(TELA.get_size(), pygame.SRCALPHA)
+    menu.fill((0, 0, 0, 180))
+    pygame.draw.rect(menu, BRANCO, fundo_menu_rect); pygame.draw.rect(menu, PRETO, fundo_menu_rect, 2)
+    texto_titulo = renderizar_texto(FONTE_TITULO, "Ações"); menu.blit(texto_titulo, texto_titulo.get_rect(center=(fundo_menu_rect.centerx, fundo_menu_rect.y + 40)))
     for nome_acao, rect_acao in botoes_do_menu.items():
-        pygame.draw.rect(TELA, CINZA, rect_acao); texto_acao = FONTE_GERAL.render(nome_acao, True, PRETO); rect_texto_acao = texto_acao.get_rect(center=rect_acao.center); TELA.blit(texto_acao, rect_texto_acao)
+        pygame.draw.rect(menu, CINZA, rect_acao); texto_acao = renderizar_texto(FONTE_GERAL, nome_acao); menu.blit(texto_acao, texto_acao.get_rect(center=rect_acao.center))
+    return menu
+
+
+FUNDO = _montar_fundo()
+MENU_DE_ACOES = _montar_menu_de_acoes()
+
+# Espera máxima por eventos quando nada mudou (a tela ociosa não gira à toa)
+ESPERA_OCIOSA_MS = 250
+
+
+class CacheDeTela:
+    """Última lista de desenho de cada região da tela, indexada pelo conteúdo.
+
+    Cada região é uma lista de (superfície, rect). Quando a chave de uma
+    região muda, só a área antiga e a nova dela são repintadas (o fundo é
+    restaurado e as regiões que cruzam a área são desenhadas de novo com
+    recorte) e só esses retângulos vão para ``pygame.display.update``.
+    """
+
+    def __init__(self):
+        self.invalidar()
+
+    def invalidar(self):
+        self.chaves = {}
+        self.itens = {}
+        self.ociosa = False
+
+    def atualizar(self, regioes):
+        """Aplica ``regioes`` (nome -> (chave, construtor)) e devolve os retângulos sujos."""
+        primeira = not self.chaves
+        sujos = []
+        for nome, (chave, construir) in regioes.items():
+            if self.chaves.get(nome, _SEM_CHAVE) == chave:
+                continue
+            antigos = self.itens.get(nome, [])
+            novos = construir()
+            self.chaves[nome] = chave
+            self.itens[nome] = novos
+            sujos.extend(rect for _, rect in antigos)
+            sujos.extend(rect for _, rect in novos)
+        if primeira:
+            sujos = [TELA_RECT.copy()]
+        sujos = [r.clip(TELA_RECT) for r in sujos if r.width and r.height]
+        for area in sujos:
+            TELA.set_clip(area)
+            TELA.blit(FUNDO, area, area)
+            for itens in self.itens.values():
+                TELA.blits([item for item in itens if area.colliderect(item[1])], False)
+        TELA.set_clip(None)
+        self.ociosa = not sujos
+        return sujos
+
+
+_SEM_CHAVE = object()
+cache_de_tela = CacheDeTela()
+
+
+def invalidar_cache():
+    """Força o redesenho completo (ao voltar de outra tela)."""
+    cache_de_tela.invalidar()
 
 
 # --- FUNÇÃO PRINCIPAL DO MÓDULO ---
-def executar_acao(game_manager: GameManager, nome_acao: str) -> None:
-    jogador = game_manager.current_player
-    if nome_acao == "Renda":
-        jogador.perform_action(IncomeAction(), None, game_manager)
-    elif nome_acao == "Ajuda Externa":
-        jogador.perform_action(ForeignAidAction(), None, game_manager)
-    elif nome_acao == "Golpear":
-        alvo = next((p for p in game_manager.players if p is not jogador and p.is_alive), None)
-        if alvo:
-            jogador.perform_action(CoupAction(), alvo, game_manager)
-
-def rodar_tela_jogo(game_manager: GameManager, menu_visivel_atual: bool):
+ACOES_DO_MENU = {"Renda": INCOME, "Ajuda Externa": FOREIGN_AID, "Golpear": COUP}
+
+
+def executar_acao(driver: GameDriver, nome_acao: str) -> None:
+    """Responde o pedido de ação do jogador com a ação escolhida no menu."""
+    pedido = driver.pending_prompt
+    if pedido is None or pedido.kind != ACTION:
+        return
+    escolhida = next((a for a in pedido.options if action_id(a) == ACOES_DO_MENU[nome_acao]), None)
+    if escolhida is not None:
+        driver.answer(pedido.id, escolhida)
+
+
+def responder_pedidos(driver: GameDriver) -> None:
+    """Decisões que a tela ainda não pergunta ao jogador.
+
+    O alvo é o primeiro oponente vivo; desafios e bloqueios usam a
+    resposta padrão do pedido (não desafiar, não bloquear).
+    """
+    pedido = driver.pending_prompt
+    if pedido is None or pedido.kind == ACTION:
+        return
+    driver.answer(pedido.id, pedido.options[0] if pedido.kind == TARGET else pedido.default)
+
+def _regioes(estado_do_jogo, menu_acoes_visivel):
+    """Regiões da tela: nome -> (chave do conteúdo, função que monta os itens)."""
+    MARGEM_MOEDAS_VERTICAL = 20 # Reduzido um pouco para melhor ajuste
+    jogador = estado_do_jogo['jogador']
+    esquerda = estado_do_jogo['oponentes']['esquerda']
+    topo = estado_do_jogo['oponentes']['topo']
+    direita = estado_do_jogo['oponentes']['direita']
+
+    def rodada():
+        texto = renderizar_texto(FONTE_GERAL, f"Rodada: {estado_do_jogo['rodada']}")
+        return [(texto, texto.get_rect(topleft=(MARGEM, MARGEM)))]
+
+    # Jogador (Base)
+    def base():
+        pos_base_jogador = (TELA_RECT.centerx, TELA_RECT.bottom)
+        return cartas_jogador(pos_base_jogador, jogador['cartas']) + info_jogador(
+            (pos_base_jogador[0], pos_base_jogador[1] - ALTURA_CARTA_JOGADOR - MARGEM_MOEDAS_VERTICAL),
+            jogador['moedas']
+        )
+
+    # Oponentes da esquerda e da direita: moedas alinhadas com as cartas, logo abaixo delas
+    def lateral(oponente, borda, angulo, sinal):
+        def montar():
+            pos_base = (borda, TELA_RECT.centery)
+            itens = cartas_oponente(pos_base, oponente['cartas'], angulo)
+            if oponente['cartas'] > 0:
+                spread_vertical = (oponente['cartas'] - 1) * ESPACAMENTO_CARTAS + LARGURA_CARTA
+                pos_y_moedas = TELA_RECT.centery + spread_vertical / 2 + MARGEM_MOEDAS_VERTICAL
+                pos_x_moedas = pos_base[0] + sinal * ALTURA_CARTA / 2
+                itens += info_jogador((pos_x_moedas, pos_y_moedas), oponente['moedas'])
+            return itens
+        return montar
+
+    # Oponente Topo
+    def superior():
+        pos_base_topo = (TELA_RECT.centerx, TELA_RECT.top)
+        return cartas_oponente(pos_base_topo, topo['cartas'], 180) + info_jogador(
+            (pos_base_topo[0], pos_base_topo[1] + ALTURA_CARTA + MARGEM_MOEDAS_VERTICAL),
+            topo['moedas']
+        )
+
+    # Caixa de informação (a moldura está no fundo)
+    def informacao():
+        texto_acao = renderizar_texto(FONTE_ACAO, estado_do_jogo['ultima_acao'])
+        return [(texto_acao, texto_acao.get_rect(center=info_rect.center))]
+
+    reveladas = tuple(estado_do_jogo['cartas_reveladas'])
+    return {
+        "rodada": (estado_do_jogo['rodada'], rodada),
+        "jogador": ((tuple(jogador['cartas']), jogador['moedas']), base),
+        "esquerda": ((esquerda['cartas'], esquerda['moedas']), lateral(esquerda, TELA_RECT.left, 90, 1)),
+        "direita": ((direita['cartas'], direita['moedas']), lateral(direita, TELA_RECT.right, 270, -1)),
+        "topo": ((topo['cartas'], topo['moedas']), superior),
+        # Cemitério (sem título)
+        "reveladas": (reveladas, lambda: cartas_reveladas(reveladas)),
+        "informacao": (estado_do_jogo['ultima_acao'], informacao),
+        # Menu por último: fica por cima de tudo
+        "menu": (menu_acoes_visivel, lambda: [(MENU_DE_ACOES, TELA_RECT.copy())] if menu_acoes_visivel else []),
+    }
+
+
+def rodar_tela_jogo(driver: GameDriver, menu_visivel_atual: bool, espera_ms: int = ESPERA_OCIOSA_MS):
+    """Processa os eventos e repinta só as regiões que mudaram.
+
+    O jogo roda na thread do ``GameDriver``; aqui só se lê a última visão
+    publicada e se respondem os pedidos de decisão. A própria função chama
+    ``pygame.display.update`` com os retângulos sujos; se o quadro anterior
+    não mudou nada, ela bloqueia até chegar um evento (ou ``espera_ms``
+    passar) em vez de girar o laço.
+    """
     menu_acoes_visivel = menu_visivel_atual
-    for evento in pygame.event.get():
+    eventos = pygame.event.get()
+    if not eventos and cache_de_tela.ociosa and espera_ms > 0:
+        evento = pygame.event.wait(espera_ms)
+        if evento.type != pygame.NOEVENT:
+            eventos = [evento] + pygame.event.get()
+    for evento in eventos:
         if evento.type == pygame.QUIT: return "sair", menu_acoes_visivel
         if evento.type == pygame.MOUSEBUTTONDOWN:
             if menu_acoes_visivel:
@@ -107,70 +326,17 @@ def rodar_tela_jogo(game_manager: GameManager, menu_visivel_atual: bool):
                 for nome, rect in botoes_do_menu.items():
                     if rect.collidepoint(evento.pos): acao_escolhida = nome; break
                 if acao_escolhida:
-                    executar_acao(game_manager, acao_escolhida)
+                    executar_acao(driver, acao_escolhida)
                     menu_acoes_visivel = False
                 elif not fundo_menu_rect.collidepoint(evento.pos): menu_acoes_visivel = False
             else:
                 if botao_acao_rect.collidepoint(evento.pos): menu_acoes_visivel = True
 
-    estado_do_jogo = montar_estado(game_manager)
+    driver.poll_events()
+    responder_pedidos(driver)
+    estado_do_jogo = montar_estado(driver.state)
+    sujos = cache_de_tela.atualizar(_regioes(estado_do_jogo, menu_acoes_visivel))
+    if sujos:
+        pygame.display.update(sujos)
 
-    TELA.fill(BRANCO)
-    TELA.blit(FONTE_GERAL.render(f"Rodada: {estado_do_jogo['rodada']}", True, PRETO), (MARGEM, MARGEM))
-    
-    MARGEM_MOEDAS_VERTICAL = 20 # Reduzido um pouco para melhor ajuste
-
-    # --- Desenho dos Elementos com Posições Ajustadas ---
-    
-    # Jogador (Base)
-    pos_base_jogador = (TELA_RECT.centerx, TELA_RECT.bottom)
-    desenhar_cartas_jogador(pos_base_jogador, estado_do_jogo['jogador']['cartas'])
-    desenhar_info_jogador(
-        (pos_base_jogador[0], pos_base_jogador[1] - ALTURA_CARTA_JOGADOR - MARGEM_MOEDAS_VERTICAL),
-        estado_do_jogo['jogador']['moedas']
-    )
-    
-    # Oponente Esquerda
-    pos_base_esquerda = (TELA_RECT.left, TELA_RECT.centery)
-    qtd_cartas_esq = estado_do_jogo['oponentes']['esquerda']['cartas']
-    desenhar_cartas_oponente(pos_base_esquerda, qtd_cartas_esq, 90)
-    # NOVA ALTERAÇÃO 2: Posição das moedas alinhada verticalmente com as cartas, mas posicionada abaixo
-    if qtd_cartas_esq > 0:
-        spread_vertical_esq = (qtd_cartas_esq - 1) * ESPACAMENTO_CARTAS + LARGURA_CARTA
-        pos_y_moedas_esq = TELA_RECT.centery + spread_vertical_esq / 2 + MARGEM_MOEDAS_VERTICAL
-        pos_x_moedas_esq = pos_base_esquerda[0] + ALTURA_CARTA / 2 
-        desenhar_info_jogador((pos_x_moedas_esq, pos_y_moedas_esq), estado_do_jogo['oponentes']['esquerda']['moedas'])
-
-    # Oponente Direita
-    pos_base_direita = (TELA_RECT.right, TELA_RECT.centery)
-    qtd_cartas_dir = estado_do_jogo['oponentes']['direita']['cartas']
-    desenhar_cartas_oponente(pos_base_direita, qtd_cartas_dir, 270)
-    # NOVA ALTERAÇÃO 2: Posição das moedas alinhada verticalmente com as cartas, mas posicionada abaixo
-    if qtd_cartas_dir > 0:
-        spread_vertical_dir = (qtd_cartas_dir - 1) * ESPACAMENTO_CARTAS + LARGURA_CARTA
-        pos_y_moedas_dir = TELA_RECT.centery + spread_vertical_dir / 2 + MARGEM_MOEDAS_VERTICAL
-        pos_x_moedas_dir = pos_base_direita[0] - ALTURA_CARTA / 2
-        desenhar_info_jogador((pos_x_moedas_dir, pos_y_moedas_dir), estado_do_jogo['oponentes']['direita']['moedas'])
-    
-    # Oponente Topo
-    pos_base_topo = (TELA_RECT.centerx, TELA_RECT.top)
-    desenhar_cartas_oponente(pos_base_topo, estado_do_jogo['oponentes']['topo']['cartas'], 180)
-    desenhar_info_jogador(
-        (pos_base_topo[0], pos_base_topo[1] + ALTURA_CARTA + MARGEM_MOEDAS_VERTICAL),
-        estado_do_jogo['oponentes']['topo']['moedas']
-    )
-    
-    # Cemitério (sem título)
-    desenhar_cartas_reveladas(estado_do_jogo['cartas_reveladas'])
-    
-    # Caixa de informação (agora centralizada)
-    pygame.draw.rect(TELA, (240, 240, 240), info_rect)
-    pygame.draw.rect(TELA, PRETO, info_rect, 2)
-    texto_acao = FONTE_ACAO.render(estado_do_jogo['ultima_acao'], True, PRETO)
-    TELA.blit(texto_acao, texto_acao.get_rect(center=info_rect.center))
-
-    # Botão de Ação e Menu
-    pygame.draw.rect(TELA, CINZA, botao_acao_rect); texto_botao = FONTE_GERAL.render("Ação", True, PRETO); TELA.blit(texto_botao, texto_botao.get_rect(center=botao_acao_rect.center))
-    if menu_acoes_visivel: desenhar_menu_de_acoes()
-    
     return "tela_jogo", menu_acoes_visivel
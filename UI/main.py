@@ -5,12 +5,14 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.game_manager import GameManager
-from src.player import HumanPlayer, AIPlayer
+from src.player import AIPlayer
+from src.persistence import FlushPolicy
+from src.driver import GameDriver, QueuedHumanPlayer
 
 # Importa as funções de cada tela
 from inicial import rodar_tela_inicial
 from login import rodar_tela_login
-from jogo import rodar_tela_jogo
+from jogo import rodar_tela_jogo, invalidar_cache, EVENTO_MOTOR
 # Importa o setup para inicializar o Pygame, que já acontece lá dentro
 import setup
 
@@ -24,6 +26,7 @@ def main():
     # Elas precisam "viver" aqui no main para não serem resetadas
     menu_acoes_visivel = False
     game_manager = None
+    driver = None
     
     # Relógio para controlar o FPS
     relogio = pygame.time.Clock()
@@ -43,15 +46,29 @@ def main():
             if estado_tela == "tela_jogo":
                 from login import texto_usuario
                 players = [
-                    HumanPlayer(texto_usuario or "Jogador"),
+                    QueuedHumanPlayer(texto_usuario or "Jogador"),
                     AIPlayer("Bot 1"),
                     AIPlayer("Bot 2"),
                     AIPlayer("Bot 3"),
                 ]
-                game_manager = GameManager(players)
+                # Estado gravado em segundo plano: o loop de frames não espera o disco
+                game_manager = GameManager(players, flush_policy=FlushPolicy(interval_ms=500))
+                # Os turnos (IAs, desafios, gravação) rodam na thread do driver;
+                # cada evento publicado acorda o laço de frames
+                driver = GameDriver(
+                    game_manager,
+                    turn_delay=0.8,
+                    notify=lambda: pygame.event.post(pygame.event.Event(EVENTO_MOTOR)),
+                )
+                driver.start()
+                invalidar_cache()
 
         elif estado_tela == "tela_jogo":
-            estado_tela, menu_acoes_visivel = rodar_tela_jogo(game_manager, menu_acoes_visivel)
+            # A tela de jogo atualiza só as regiões que mudaram e espera
+            # por eventos quando está ociosa
+            estado_tela, menu_acoes_visivel = rodar_tela_jogo(driver, menu_acoes_visivel)
+            relogio.tick(60)
+            continue
 
         elif estado_tela == "sair":
             rodando = False # Quebra o loop para sair do jogo
@@ -62,7 +79,11 @@ def main():
         # Garante que o jogo não passe de 60 frames por segundo
         relogio.tick(60)
 
-    # Finaliza o Pygame e fecha o programa
+    # Grava o estado pendente, finaliza o Pygame e fecha o programa
+    if driver is not None:
+        driver.stop()
+    if game_manager is not None:
+        game_manager.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,186 @@
+"""Modelo compacto de cartas contra a representação anterior.
+
+A representação anterior é reproduzida aqui: mãos como listas de nomes
+num ``__dict__``, cartas do baralho como dicionários ``{"id",
+"character", "in_game"}`` e ``has_character`` como busca na lista. O
+relatório mostra a memória de mãos + baralho por partida, o custo de
+cada operação nas duas formas e o ciclo comprar/descartar/devolver do
+baralho (fatias e ``shuffle()`` completo antes, ``array`` agora) com
+baralhos de vários tamanhos.
+
+Uso:
+    python benchmarks/cards.py --players 4 --games 2000 --copies 3 5 20
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from cards import CHARACTERS, COPIES_PER_CHARACTER, card_character
+from Deck import Deck
+from game_cache import deep_size
+from moves import ACTIONS, STEAL
+from player import AIPlayer
+
+
+class _ListPlayer:
+    """Jogador como antes: atributos num ``__dict__`` e mão em lista de nomes."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._coins = 2
+        self._characters: List[str] = []
+        self._alive = True
+
+    def add_character(self, character: str) -> None:
+        self._characters.append(character)
+
+    def lose_influence(self) -> None:
+        if self._characters:
+            self._characters.pop()
+            if not self._characters:
+                self._alive = False
+
+    def has_character(self, character: str) -> bool:
+        return character in self._characters
+
+    def can_block(self, action) -> bool:
+        for character in action.blockable_by:
+            if self.has_character(character):
+                return True
+        return False
+
+
+class _DictDeck:
+    """Baralho como antes: lista de dicionários."""
+
+    def __init__(self, copies: int = COPIES_PER_CHARACTER):
+        self._cards = [{"id": i * copies + k + 1, "character": c, "in_game": False}
+                       for i, c in enumerate(CHARACTERS) for k in range(copies)]
+        self._discard_pile: List[Dict] = []
+        random.shuffle(self._cards)
+
+    def draw(self, count: int = 1) -> List[Dict]:
+        drawn = self._cards[:count]
+        self._cards = self._cards[count:]
+        for card in drawn:
+            card["in_game"] = True
+        return drawn
+
+    def discard(self, card: Dict) -> None:
+        card["in_game"] = False
+        self._discard_pile.append(card)
+
+    def return_cards(self, cards: List[Dict]) -> None:
+        for card in cards:
+            card["in_game"] = False
+            if card in self._discard_pile:
+                self._discard_pile.remove(card)
+        self._cards.extend(cards)
+        random.shuffle(self._cards)
+
+
+def _table(players: int, compact: bool):
+    if compact:
+        deck = Deck(None)
+        seats = [AIPlayer(f"Jogador {i}") for i in range(players)]
+        for p in seats:
+            for card in deck.draw(2):
+                p.add_character(card_character(card))
+    else:
+        deck = _DictDeck()
+        seats = [_ListPlayer(f"Jogador {i}") for i in range(players)]
+        for p in seats:
+            for card in deck.draw(2):
+                p.add_character(card["character"])
+    return seats, deck
+
+
+def bench_memory(players: int, games: int) -> Dict[str, float]:
+    """Bytes de mãos + baralho por partida, em média sobre ``games`` mesas."""
+    report = {}
+    for compact in (False, True):
+        random.seed(0)
+        tables = [_table(players, compact) for _ in range(games)]
+        # Os nomes dos jogadores são iguais nas duas formas e ficam de fora
+        names = [p._name for seats, _ in tables for p in seats]
+        report["compact" if compact else "list"] = deep_size(tables, skip=names) / games
+    return report
+
+
+def bench_ops(number: int) -> Dict[str, Dict[str, float]]:
+    """Nanossegundos por operação nas duas representações."""
+    random.seed(0)
+    steal = ACTIONS[STEAL]
+    old, new = _ListPlayer("a"), AIPlayer("a")
+    for name in ("Duke", "Contessa"):
+        old.add_character(name)
+        new.add_character(name)
+
+    def cycle(p):
+        p.add_character("Captain")
+        p.lose_influence()
+
+    cases = {
+        "has_character": (lambda: old.has_character("Contessa"), lambda: new.has_character("Contessa")),
+        "can_block": (lambda: old.can_block(steal), lambda: new.can_block(steal)),
+        "add+lose": (lambda: cycle(old), lambda: cycle(new)),
+        "deal": (lambda: _table(4, False), lambda: _table(4, True)),
+    }
+    report = {}
+    for name, (before, after) in cases.items():
+        runs = number if name != "deal" else max(1, number // 100)
+        report[name] = {
+            "list": min(timeit.repeat(before, number=runs, repeat=3)) / runs * 1e9,
+            "compact": min(timeit.repeat(after, number=runs, repeat=3)) / runs * 1e9,
+        }
+    return report
+
+
+def _deck_cycle(deck, rounds: int) -> None:
+    # Como na troca do Embaixador: compra duas, descarta uma, devolve as duas
+    for _ in range(rounds):
+        hand = deck.draw(2)
+        deck.discard(hand[0])
+        deck.return_cards(hand)
+
+
+def bench_deck(copies: List[int], rounds: int) -> Dict[int, Dict[str, float]]:
+    """Microssegundos por ciclo comprar/descartar/devolver, por tamanho de baralho."""
+    report = {}
+    for n in copies:
+        random.seed(0)
+        old, new = _DictDeck(n), Deck(None, copies=n)
+        report[n] = {
+            "list": min(timeit.repeat(lambda: _deck_cycle(old, rounds), number=1, repeat=3)) / rounds * 1e6,
+            "array": min(timeit.repeat(lambda: _deck_cycle(new, rounds), number=1, repeat=3)) / rounds * 1e6,
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Modelo compacto de cartas contra listas e dicionários.")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--number", type=int, default=200000, help="repetições por operação")
+    parser.add_argument("--copies", type=int, nargs="+", default=[3, 5, 20],
+                        help="cópias de cada personagem nos baralhos medidos")
+    args = parser.parse_args()
+
+    memory = bench_memory(args.players, args.games)
+    print(f"Mãos + baralho por partida ({args.players} jogadores): "
+          f"{memory['list']:.0f} B antes, {memory['compact']:.0f} B agora "
+          f"({memory['list'] / memory['compact']:.1f}x)")
+    for name, costs in bench_ops(args.number).items():
+        print(f"{name:>14}: {costs['list']:8.0f} ns antes, {costs['compact']:8.0f} ns agora")
+    for n, costs in bench_deck(args.copies, max(1, args.number // 20)).items():
+        print(f"Baralho com {n * len(CHARACTERS):>3} cartas: {costs['list']:6.2f} µs por ciclo antes, "
+              f"{costs['array']:6.2f} µs agora")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Benchmarks dos caminhos críticos: motor, persistência, baralho e tela.
+
+Gera um relatório JSON e, opcionalmente, compara com um baseline salvo,
+falhando (código de saída 1) se alguma métrica piorar além do limite.
+
+Uso:
+    python benchmarks/run.py --output relatorio.json
+    python benchmarks/run.py --save-baseline            # grava benchmarks/baseline.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+UI = ROOT / "UI"
+sys.path.insert(0, str(SRC))
+
+from Deck import Deck
+from driver import GameDriver
+from game_manager import GameManager
+from player import AIPlayer
+from simulate import play_game
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+SCHEMA_VERSION = 1
+
+
+def _metric(value: float, unit: str, better: str) -> Dict:
+    return {"value": value, "unit": unit, "better": better}
+
+
+def _median_time(fn: Callable[[], None], repeat: int) -> float:
+    """Mediana, em segundos, de ``repeat`` execuções de ``fn``."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+# --- Motor -------------------------------------------------------------------
+def bench_engine(games: int, repeat: int) -> Dict[str, Dict]:
+    """Turnos/s de ``GameManager.play_turn`` em mesas só de IAs."""
+    turns = 0
+
+    def run():
+        nonlocal turns
+        random.seed(0)
+        turns = sum(play_game(4)[1] for _ in range(games))
+
+    elapsed = _median_time(run, repeat)
+    return {
+        "engine.turns_per_s": _metric(turns / elapsed, "turns/s", "higher"),
+        "engine.games_per_s": _metric(games / elapsed, "games/s", "higher"),
+    }
+
+
+# --- Persistência ------------------------------------------------------------
+def _game_with_history(state_file: str, length: int) -> GameManager:
+    game = GameManager([AIPlayer(f"Bot {i}") for i in range(4)], state_file=state_file,
+                       deck=Deck(None))
+    names = [p.name for p in game.players]
+    game._history = [f"{names[i % 4]} bloqueou a ação com Duke" for i in range(length)]
+    return game
+
+
+def bench_persistence(lengths: List[int], repeat: int) -> Dict[str, Dict]:
+    """Latência de save_state/load_state (e snapshots binários) por tamanho do histórico."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for length in lengths:
+            state_file = os.path.join(tmp, f"estado_{length}.json")
+            game = _game_with_history(state_file, length)
+            save = _median_time(game.save_state, repeat)
+            load = _median_time(game.load_state, repeat)
+            game.save_snapshot()
+            save_bin = _median_time(game.save_snapshot, repeat)
+            load_bin = _median_time(game.load_snapshot, repeat)
+            results[f"persistence.save_state_ms[history={length}]"] = _metric(save * 1e3, "ms", "lower")
+            results[f"persistence.load_state_ms[history={length}]"] = _metric(load * 1e3, "ms", "lower")
+            results[f"persistence.save_snapshot_ms[history={length}]"] = _metric(save_bin * 1e3, "ms", "lower")
+            results[f"persistence.load_snapshot_ms[history={length}]"] = _metric(load_bin * 1e3, "ms", "lower")
+    return results
+
+
+# --- Baralho -----------------------------------------------------------------
+def _deck_cycle(deck: Deck, rounds: int) -> None:
+    for _ in range(rounds):
+        hand = deck.draw(2)
+        deck.discard(hand[0])
+        deck.return_cards(hand)
+
+
+def bench_deck(rounds: int, repeat: int) -> Dict[str, Dict]:
+    """Operações/s de draw + discard + return_cards, em memória e com arquivo."""
+    ops = rounds * 3
+    random.seed(0)
+    memory = Deck(None)
+    elapsed = _median_time(lambda: _deck_cycle(memory, rounds), repeat)
+    results = {"deck.ops_per_s[memory]": _metric(ops / elapsed, "ops/s", "higher")}
+    with tempfile.TemporaryDirectory() as tmp:
+        persisted = Deck(os.path.join(tmp, "deck_state.json"))
+        disk_rounds = max(1, rounds // 20)
+        elapsed = _median_time(lambda: _deck_cycle(persisted, disk_rounds), repeat)
+        results["deck.ops_per_s[json]"] = _metric(disk_rounds * 3 / elapsed, "ops/s", "higher")
+    return results
+
+
+# --- Tela --------------------------------------------------------------------
+def bench_ui(frames: int) -> Dict[str, Dict]:
+    """Tempo de frame de ``UI/jogo.rodar_tela_jogo`` com o driver de vídeo dummy.
+
+    Mede quadros em que uma região muda e quadros sem mudança nenhuma.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    try:
+        import pygame  # noqa: F401
+    except ImportError:
+        print("pygame não instalado: benchmark da tela ignorado")
+        return {}
+
+    sys.path.insert(0, str(UI))
+    cwd = os.getcwd()
+    os.chdir(UI)  # o setup carrega as imagens de UI/cartas
+    try:
+        import jogo
+    finally:
+        os.chdir(cwd)
+
+    random.seed(0)
+    game = _game_with_history(None, 0)
+    for _ in range(8):
+        game.play_turn()
+    driver = GameDriver(game)  # sem start(): o benchmark publica o estado à mão
+    jogo.invalidar_cache()
+    opponent = game.players[1]
+
+    def frame(change: bool) -> float:
+        if change:  # muda as moedas de um oponente: força o redesenho de uma região
+            opponent.coins += 1
+            driver.publish_state()
+        start = time.perf_counter()
+        jogo.rodar_tela_jogo(driver, False, espera_ms=0)
+        return time.perf_counter() - start
+
+    samples = sorted(frame(True) for _ in range(frames))
+    idle = [frame(False) for _ in range(frames)]
+    return {
+        "ui.frame_ms[median]": _metric(statistics.median(samples) * 1e3, "ms", "lower"),
+        "ui.frame_ms[p95]": _metric(samples[int(len(samples) * 0.95) - 1] * 1e3, "ms", "lower"),
+        "ui.frame_ms[idle]": _metric(statistics.median(idle) * 1e3, "ms", "lower"),
+    }
+
+
+# --- Relatório ---------------------------------------------------------------
+def run_all(quick: bool = False, skip_ui: bool = False) -> Dict:
+    repeat = 3 if quick else 5
+    metrics: Dict[str, Dict] = {}
+    metrics.update(bench_engine(50 if quick else 300, repeat))
+    metrics.update(bench_persistence([10, 100, 1000] if quick else [10, 100, 1000, 10000], repeat))
+    metrics.update(bench_deck(500 if quick else 5000, repeat))
+    if not skip_ui:
+        metrics.update(bench_ui(60 if quick else 300))
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": metrics,
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Métricas que pioraram mais que ``threshold`` (0.2 = 20%) em relação ao baseline."""
+    regressions = []
+    for name, base in baseline.get("metrics", {}).items():
+        current = report["metrics"].get(name)
+        if current is None or not base["value"] or not current["value"]:
+            continue
+        if base["better"] == "higher":
+            slowdown = base["value"] / current["value"] - 1
+        else:
+            slowdown = current["value"] / base["value"] - 1
+        status = "REGRESSÃO" if slowdown > threshold else "ok"
+        print(f"  {name:<48} {base['value']:>12.3f} -> {current['value']:>12.3f} "
+              f"{current['unit']:<8} {slowdown:+7.1%}  {status}")
+        if slowdown > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks do Coup.")
+    parser.add_argument("--output", help="grava o relatório JSON neste arquivo")
+    parser.add_argument("--baseline", help="compara com este relatório")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"grava o relatório como baseline em {DEFAULT_BASELINE}")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="piora máxima tolerada por métrica (0.2 = 20%%)")
+    parser.add_argument("--quick", action="store_true", help="menos repetições")
+    parser.add_argument("--skip-ui", action="store_true", help="não mede a tela do pygame")
+    args = parser.parse_args(argv)
+
+    report = run_all(args.quick, args.skip_ui)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    if args.save_baseline:
+        DEFAULT_BASELINE.write_text(text + "\n", encoding="utf-8")
+    if not args.output and not args.save_baseline:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        print(f"Comparação com {args.baseline} (limite {args.threshold:.0%}):")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} métrica(s) pioraram além do limite")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 class Carta:
+  __slots__ = ("_nome", "_virada", "_descricao")
+
   def __init__(self, nome: str, descricao: str):
     # Os atributos internos devem usar o prefixo `_` para
     # corresponder aos getters definidos abaixo.
@@ -1,102 +1,362 @@
-import json␊
-import random␊
-from typing import List, Dict, Optional␊
-from pathlib import Path␊
-␊
-class Deck:␊
-    """Classe que gerencia o baralho do jogo Coup com persistência em JSON"""␊
-    ␊
-    def __init__(self, json_file: str = "deck_state.json"):␊
-        """␊
-        Inicializa o baralho carregando do JSON ou criando novo␊
-        ␊
-        Args:␊
-            json_file: Caminho para o arquivo de estado do deck␊
-        """␊
-        self._json_file = json_file␊
-        self._cards = []␊
-        self._discard_pile = []␊
-        ␊
-        if Path(json_file).exists():␊
+import json
+import random
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+
+from cards import CARD_BITS, CHARACTERS, COPIES_PER_CHARACTER, card_character, card_id, make_card
+from persistence import FlushPolicy, StateWriter
+from zobrist import deck_hash, deck_key, discard_key
+
+class Deck:
+    """Classe que gerencia o baralho do jogo Coup com persistência em JSON
+
+    Cada carta é um inteiro (``cards.make_card``: id e personagem). O JSON
+    continua no formato ``{"id", "character", "in_game"}``.
+
+    O baralho fica num ``array`` com o topo no fim, e um mapa id da carta
+    -> posição (outro ``array``, indexado pelo id) acompanha cada pilha.
+    Comprar ``k`` cartas custa O(k); uma carta devolvida entra no fim e
+    troca de lugar com uma posição sorteada (um passo do Fisher–Yates "de
+    dentro para fora"), então o baralho continua embaralhado sem
+    ``shuffle()`` completo. Tirar uma carta do descarte troca-a com a
+    última, em O(1). Nenhuma operação depende do tamanho do baralho, então
+    variantes maiores (``copies``) custam o mesmo por carta.
+
+    O hash de Zobrist das pilhas (``zobrist``) é atualizado a cada carta
+    movida, também em O(1).
+
+    No modo diário (``begin_journal``, usado pelo ``GameManager`` com
+    ``journal=True``) as alterações não regravam o JSON: cada uma vira um
+    delta pequeno (``take_deltas``) que vai no registro do turno, e o
+    arquivo só é regravado em ``checkpoint``.
+    """
+
+    __slots__ = ("_json_file", "_copies", "_cards", "_positions", "_discard_pile",
+                 "_discard_positions", "_writer", "_zhash", "_deltas")
+    
+    def __init__(
+        self,
+        json_file: Optional[str] = "deck_state.json",
+        flush_policy: Optional[FlushPolicy] = None,
+        copies: int = COPIES_PER_CHARACTER,
+    ):
+        """
+        Inicializa o baralho carregando do JSON ou criando novo
+        
+        Args:
+            json_file: Caminho para o arquivo de estado do deck. Com
+                ``None`` o baralho fica só em memória (sem I/O em disco).
+            flush_policy: Política de gravação em segundo plano. Com
+                ``None`` cada alteração grava o arquivo na hora.
+            copies: Cópias de cada personagem num baralho novo (3 no
+                jogo padrão; variantes para 7 a 10 jogadores usam 5).
+        """
+        self._json_file = json_file
+        self._copies = copies
+        self._cards = array("I")
+        self._positions = array("i")
+        self._discard_pile = array("I")
+        self._discard_positions = array("i")
+        self._zhash = 0
+        self._deltas: Optional[List[list]] = None
+        self._writer: Optional[StateWriter] = None
+        if json_file is not None:
+            self._writer = StateWriter(
+                json_file,
+                self.piles,
+                flush_policy,
+                encode=lambda piles: json.dumps(piles_to_dict(*piles), indent=2),
+            )
+        
+        if json_file is not None and Path(json_file).exists():
             self._load_from_json()
-        else:␊
+        else:
             self._initialize_new_deck()
-    ␊
-    def _initialize_new_deck(self) -> None:␊
-        """Cria um baralho novo com as cartas padroes do Coup."""␊
-        characters = ["Duke", "Assassin", "Captain", "Ambassador", "Contessa"]␊
-        self._cards = []␊
-        card_id = 1␊
-        for character in characters:␊
-            for _ in range(3):  # três cópias de cada personagem␊
-                self._cards.append({"id": card_id, "character": character, "in_game": False})␊
-                card_id += 1␊
-␊
-        self._discard_pile = []␊
-        self.shuffle()␊
-        self._save_to_json()␊
-    ␊
-    def _load_from_json(self) -> None:␊
-        """Carrega o estado do baralho do JSON."""␊
-        try:␊
-            with open(self._json_file, 'r') as f:␊
-                data = json.load(f)␊
-                self._cards = data.get('cards', [])␊
-                self._discard_pile = data.get('discard_pile', [])␊
-        except Exception as e:␊
-            print(f"Erro ao carregar deck: {e}")␊
-            self._initialize_new_deck()␊
-    ␊
-    def _save_to_json(self) -> None:␊
-        """Salva o estado atual do baralho em JSON."""␊
-        data = {␊
-            "cards": self._cards,␊
-            "discard_pile": self._discard_pile␊
-        }␊
-        try:␊
-            with open(self._json_file, 'w') as f:␊
-                json.dump(data, f, indent=2)␊
-        except Exception as e:␊
-            print(f"Erro ao salvar deck: {e}")␊
-    ␊
-    def shuffle(self) -> None:␊
-        """Embaralha as cartas do baralho principal"""␊
-        random.shuffle(self._cards)
-        self._save_to_json()␊
-    ␊
-    def draw(self, count: int = 1) -> List[Dict]:␊
-        """Compra cartas do topo do baralho."""␊
-        count = min(count, len(self._cards))␊
-        drawn = self._cards[:count]␊
-        self._cards = self._cards[count:]␊
-␊
-        for card in drawn:␊
-            card["in_game"] = True␊
-        self._save_to_json()␊
-        return drawn␊
-    ␊
-    def discard(self, card: Dict) -> None:␊
-        """Descarta uma carta para a pilha de descarte."""␊
-        card["in_game"] = False␊
+    
+    def _initialize_new_deck(self) -> None:
+        """Cria um baralho novo com as cartas padroes do Coup."""
+        cards = []
+        next_id = 1
+        for character in CHARACTERS:
+            for _ in range(self._copies):
+                cards.append(make_card(next_id, character))
+                next_id += 1
+
+        random.shuffle(cards)
+        self._set_piles(cards, [])
+        self._save_to_json()
+    
+    def _load_from_json(self) -> None:
+        """Carrega o estado do baralho do JSON."""
+        try:
+            with open(self._json_file, 'r') as f:
+                data = json.load(f)
+                self._set_piles(_parse(data.get('cards', [])), _parse(data.get('discard_pile', [])))
+        except Exception as e:
+            print(f"Erro ao carregar deck: {e}")
+            self._initialize_new_deck()
+
+    def _set_piles(self, cards: Iterable[int], discard_pile: Iterable[int]) -> None:
+        """Troca as pilhas; ``cards`` vem com o topo primeiro, como no JSON."""
+        self._cards = array("I", cards)
+        self._cards.reverse()
+        self._discard_pile = array("I", discard_pile)
+        size = max([len(CHARACTERS) * self._copies]
+                   + [card >> CARD_BITS for card in self._cards]
+                   + [card >> CARD_BITS for card in self._discard_pile]) + 1
+        self._positions = _position_map(self._cards, size)
+        self._discard_positions = _position_map(self._discard_pile, size)
+        self._zhash = deck_hash(self._cards, self._discard_pile)
+
+    @property
+    def cards(self) -> List[int]:
+        """Cartas do baralho, do topo para o fundo."""
+        return self._cards[::-1].tolist()
+
+    @property
+    def discard_pile(self) -> List[int]:
+        return self._discard_pile.tolist()
+
+    @property
+    def zobrist(self) -> int:
+        """Hash de Zobrist das pilhas (``zobrist.deck_hash``), mantido incrementalmente."""
+        return self._zhash
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __contains__(self, card: int) -> bool:
+        i = card_id(card)
+        return i < len(self._positions) and self._positions[i] >= 0
+    
+    def snapshot(self) -> Tuple:
+        """Cópia do estado em memória (cópias dos ``array``), para ``restore``."""
+        return (array("I", self._cards), array("i", self._positions), array("I", self._discard_pile),
+                array("i", self._discard_positions), self._zhash)
+
+    def piles(self) -> Tuple[array, array]:
+        """Cópia barata das pilhas (baralho e descarte); ``piles_to_dict`` dá o formato do JSON."""
+        return array("I", self._cards), array("I", self._discard_pile)
+
+    def to_dict(self) -> Dict:
+        """Estado no formato do JSON (cartas e descarte)."""
+        return piles_to_dict(self._cards, self._discard_pile)
+
+    def clone(self) -> "Deck":
+        """Cópia em memória do baralho, sem arquivo associado."""
+        twin = Deck.__new__(Deck)
+        twin._json_file = None
+        twin._writer = None
+        twin._copies = self._copies
+        twin._cards = array("I", self._cards)
+        twin._positions = array("i", self._positions)
+        twin._discard_pile = array("I", self._discard_pile)
+        twin._discard_positions = array("i", self._discard_positions)
+        twin._zhash = self._zhash
+        twin._deltas = None
+        return twin
+
+    def restore(self, state: Tuple) -> None:
+        """Volta ao estado devolvido por ``snapshot``, sem serialização nem disco."""
+        cards, positions, discard_pile, discard_positions, self._zhash = state
+        self._cards = array("I", cards)
+        self._positions = array("i", positions)
+        self._discard_pile = array("I", discard_pile)
+        self._discard_positions = array("i", discard_positions)
+        self._record_piles()
+
+    def load_dict(self, state: Dict) -> None:
+        """Substitui o conteúdo do baralho por ``state`` (mesmo formato do JSON) e grava."""
+        self._set_piles(_parse(state.get("cards", [])), _parse(state.get("discard_pile", [])))
+        self._record_piles()
+        self._save_to_json()
+
+    def _save_to_json(self) -> None:
+        """Marca o estado como alterado; o escritor grava o JSON (fora do modo diário)."""
+        if self._writer is not None and self._deltas is None:
+            self._writer.mark_dirty()
+
+    # --- Modo diário -----------------------------------------------------------
+    def begin_journal(self) -> None:
+        """Passa a acumular deltas em vez de regravar o JSON a cada alteração."""
+        if self._deltas is None:
+            self._deltas = []
+
+    def take_deltas(self) -> List[list]:
+        """Deltas desde a última chamada (ou ``checkpoint``), para o diário."""
+        deltas = self._deltas or []
+        if self._deltas is not None:
+            self._deltas = []
+        return deltas
+
+    def checkpoint(self) -> None:
+        """Agenda a gravação do JSON completo e descarta os deltas já cobertos por ele."""
+        if self._deltas is not None:
+            self._deltas = []
+        if self._writer is not None:
+            self._writer.mark_dirty()
+
+    def apply_deltas(self, deltas: Iterable[list]) -> None:
+        """Reaplica deltas de ``take_deltas`` (recuperação pelo diário)."""
+        for delta in deltas:
+            op = delta[0]
+            if op == "d":
+                self._pop(delta[1])
+            elif op == "x":
+                self._push_discard(delta[1])
+            elif op == "r":
+                self._insert(delta[1], delta[2])
+            elif op == "p":
+                self._set_piles(delta[1], delta[2])
+        self._save_to_json()
+
+    def _record_piles(self) -> None:
+        if self._deltas is not None:
+            self._deltas.append(["p", self._cards[::-1].tolist(), self._discard_pile.tolist()])
+
+    def flush(self) -> None:
+        """Grava imediatamente alterações pendentes."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        """Encerra o escritor em segundo plano, gravando o pendente."""
+        if self._writer is not None:
+            self._writer.close()
+
+    def shuffle(self) -> None:
+        """Embaralha as cartas do baralho principal"""
+        cards = self._cards.tolist()
+        random.shuffle(cards)
+        self._cards = array("I", cards)
+        positions = self._positions
+        for i, card in enumerate(cards):
+            positions[card >> CARD_BITS] = i
+        self._zhash = deck_hash(self._cards, self._discard_pile)
+        self._record_piles()
+        self._save_to_json()
+    
+    def draw(self, count: int = 1) -> List[int]:
+        """Compra cartas do topo do baralho (``cards.card_character`` dá o personagem)."""
+        drawn = self._pop(count)
+        if self._deltas is not None:
+            self._deltas.append(["d", len(drawn)])
+        self._save_to_json()
+        return drawn
+
+    def _pop(self, count: int) -> List[int]:
+        cards = self._cards
+        positions = self._positions
+        drawn = []
+        h = self._zhash
+        for _ in range(min(count, len(cards))):
+            card = cards.pop()
+            positions[card >> CARD_BITS] = -1
+            h ^= deck_key(card, len(cards))
+            drawn.append(card)
+        self._zhash = h
+        return drawn
+    
+    def discard(self, card: int) -> None:
+        """Descarta uma carta para a pilha de descarte."""
+        self._push_discard(card)
+        if self._deltas is not None:
+            self._deltas.append(["x", card])
+        self._save_to_json()
+
+    def _push_discard(self, card: int) -> None:
+        self._reserve(card)
+        self._discard_positions[card >> CARD_BITS] = len(self._discard_pile)
         self._discard_pile.append(card)
+        self._zhash ^= discard_key(card)
+    
+    def return_cards(self, cards: List[int]) -> None:
+        """Devolve cartas para o baralho, cada uma numa posição sorteada."""
+        positions = self._positions
+        pick = random.random
+        for card in cards:
+            self._reserve(card)
+            if positions[card >> CARD_BITS] >= 0:
+                continue  # já está no baralho
+            # Passo do Fisher–Yates: a carta nova troca com uma posição em [0, n]
+            j = int(pick() * (len(self._cards) + 1))
+            self._insert(card, j)
+            if self._deltas is not None:
+                self._deltas.append(["r", card, j])
         self._save_to_json()
-    ␊
-    def return_cards(self, cards: List[Dict]) -> None:␊
-        """Devolve cartas para o baralho."""␊
-        for card in cards:␊
-            card["in_game"] = False␊
-            if card in self._discard_pile:␊
-                self._discard_pile.remove(card)␊
-        self._cards.extend(cards)␊
-        self.shuffle()␊
-    ␊
-    def get_deck_state(self) -> Dict:␊
-        """Retorna o estado atual do baralho para debug"""␊
-        return {␊
-            "remaining_cards": len(self._cards),␊
-            "discarded_cards": len(self._discard_pile),␊
-            "total_cards": len(self._cards) + len(self._discard_pile)␊
-        }␊
-    ␊
-    def __str__(self) -> str:␊
-        return f"Deck: {len(self._cards)} cartas | Descarte: {len(self._discard_pile)}"␊
+
+    def _insert(self, card: int, j: int) -> None:
+        """Põe ``card`` (fora do baralho) na posição ``j``; a que estava lá vai para o fim."""
+        self._reserve(card)
+        self._take_from_discard(card)
+        deck = self._cards
+        positions = self._positions
+        n = len(deck)
+        if j == n:
+            deck.append(card)
+            self._zhash ^= deck_key(card, n)
+        else:
+            other = deck[j]
+            deck[j] = card
+            deck.append(other)
+            positions[other >> CARD_BITS] = n
+            self._zhash ^= deck_key(other, j) ^ deck_key(other, n) ^ deck_key(card, j)
+        positions[card >> CARD_BITS] = j
+
+    def _reserve(self, card: int) -> None:
+        """Aumenta os mapas de posição para caber o id de ``card``."""
+        missing = (card >> CARD_BITS) + 1 - len(self._positions)
+        if missing > 0:
+            self._positions.extend([-1] * missing)
+            self._discard_positions.extend([-1] * missing)
+
+    def _take_from_discard(self, card: int) -> None:
+        """Tira ``card`` do descarte (se estiver lá) trocando-a com a última."""
+        positions = self._discard_positions
+        i = positions[card >> CARD_BITS]
+        if i < 0:
+            return
+        positions[card >> CARD_BITS] = -1
+        self._zhash ^= discard_key(card)
+        pile = self._discard_pile
+        last = pile.pop()
+        if last != card:
+            pile[i] = last
+            positions[last >> CARD_BITS] = i
+    
+    def get_deck_state(self) -> Dict:
+        """Retorna o estado atual do baralho para debug"""
+        return {
+            "remaining_cards": len(self._cards),
+            "discarded_cards": len(self._discard_pile),
+            "total_cards": len(self._cards) + len(self._discard_pile)
+        }
+    
+    def __str__(self) -> str:
+        return f"Deck: {len(self._cards)} cartas | Descarte: {len(self._discard_pile)}"
+
+
+def piles_to_dict(cards: array, discard_pile: array) -> Dict:
+    """Pilhas de ``Deck.piles`` no formato do JSON (o topo do baralho vem primeiro)."""
+    return {
+        "cards": [_entry(card) for card in cards[::-1]],
+        "discard_pile": [_entry(card) for card in discard_pile]
+    }
+
+
+def _entry(card: int) -> Dict:
+    """Carta no formato do JSON (as cartas do baralho e do descarte estão fora de jogo)."""
+    return {"id": card_id(card), "character": card_character(card), "in_game": False}
+
+
+def _position_map(pile: array, size: int) -> array:
+    """Posição de cada id de carta em ``pile`` (-1 fora dela)."""
+    positions = array("i", [-1]) * size
+    for i, card in enumerate(pile):
+        positions[card >> CARD_BITS] = i
+    return positions
+
+
+def _parse(entries: List[Dict]) -> List[int]:
+    return [make_card(entry["id"], entry["character"]) for entry in entries]
@@ -1,15 +1,23 @@
 from abc import ABC, abstractmethod
 from typing import Optional, List, TYPE_CHECKING
 
+from cards import character_mask
+from outcomes import Outcome, OutcomeKind
+
 if TYPE_CHECKING:
     from player import Player
     from game_manager import GameManager
 
 class Action(ABC):
+    # Ações que exigem escolher um jogador alvo
+    needs_target = False
+
     def __init__(self, cost: int, requirement: str = None, blockable_by: List[str] = None):
         self._cost = cost
         self._requirement = requirement
         self._blockable_by = blockable_by or []  # Lista de personagens que podem bloquear
+        # Testa numa mão empacotada se há algum desses personagens
+        self.block_mask = character_mask(self._blockable_by)
     
     @property
     def blockable_by(self) -> List[str]:
@@ -29,7 +37,7 @@ class Action(ABC):
         attacker: 'Player',
         target: Optional['Player'] = None,
         game_manager: Optional['GameManager'] = None,
-    ) -> Optional[str]:
+    ) -> Optional[Outcome]:
         """Executa a ação."""
         pass
 
@@ -43,9 +51,9 @@ class IncomeAction(Action):
         attacker: 'Player',
         target: Optional['Player'] = None,
         game_manager: Optional['GameManager'] = None,
-    ) -> str:
+    ) -> Outcome:
         attacker.coins += 1
-        return f"{attacker.name} ganhou 1 moeda"
+        return Outcome(OutcomeKind.INCOME, attacker.seat)
 
 
 class ForeignAidAction(Action):
@@ -57,13 +65,15 @@ class ForeignAidAction(Action):
         attacker: 'Player',
         target: Optional['Player'] = None,
         game_manager: Optional['GameManager'] = None,
-    ) -> str:
+    ) -> Outcome:
         attacker.coins += 2
-        return f"{attacker.name} recebeu 2 moedas de ajuda externa"
+        return Outcome(OutcomeKind.FOREIGN_AID, attacker.seat)
 
 
 
 class CoupAction(Action):
+    needs_target = True
+
     def __init__(self):
         """
         Inicializa a ação Coup (Golpe de Estado) com custo 7 moedas.
@@ -76,7 +86,7 @@ class CoupAction(Action):
         attacker: 'Player',
         target: Optional['Player'],
         game_manager: Optional['GameManager'] = None,
-    ) -> str:
+    ) -> Outcome:
         """
         Executa a ação Coup:
         1. Verifica se o atacante tem moedas suficientes (já verificado no perform_action)
@@ -100,13 +110,13 @@ class CoupAction(Action):
         
         # Registrar a ação no histórico do jogo
         if game_manager is not None:
-            game_manager.add_to_history(
-                f"{attacker.name} realizou Coup em {target.name}"
-            )
-        return f"{attacker.name} aplicou um golpe de estado em {target.name}"
+            game_manager.add_to_history(Outcome(OutcomeKind.COUP_RECORD, attacker.seat, target.seat))
+        return Outcome(OutcomeKind.COUP, attacker.seat, target.seat)
 
 class AssassinateAction(Action):
     """Ação do Assassino - custa 3 moedas para eliminar uma influência"""
+    needs_target = True
+
     def __init__(self):
         super().__init__(cost=3, requirement="Assassin", blockable_by=["Contessa"])
     
@@ -115,16 +125,15 @@ class AssassinateAction(Action):
         attacker: 'Player',
         target: Optional['Player'] = None,
         game_manager: Optional['GameManager'] = None,
-    ) -> str:
+    ) -> Outcome:
         if not target:
             raise ValueError("Assassinar precisa de um alvo")
         
         if not target.is_alive:
-            return f"{target.name} já está eliminado"
+            return Outcome(OutcomeKind.ALREADY_ELIMINATED, attacker.seat, target.seat)
         
         target.lose_influence()
-        return (f"{attacker.name} assassinou {target.name}!\n"
-                f"(Pode ser bloqueado pela Condessa)")
+        return Outcome(OutcomeKind.ASSASSINATED, attacker.seat, target.seat)
 
 class TaxAction(Action):
     """Ação do Duque - ganha 3 moedas"""
@@ -136,12 +145,14 @@ class TaxAction(Action):
         attacker: 'Player',
         target: Optional['Player'] = None,
         game_manager: Optional['GameManager'] = None,
-    ) -> str:
+    ) -> Outcome:
         attacker.coins += 3
-        return f"{attacker.name} coletou impostos como Duque (+3 moedas)"
+        return Outcome(OutcomeKind.TAX, attacker.seat)
 
 class StealAction(Action):
     """Ação do Capitão - rouba 2 moedas de outro jogador"""
+    needs_target = True
+
     def __init__(self):
         super().__init__(cost=0, requirement="Captain", blockable_by=["Captain", "Ambassador"])
     
@@ -150,7 +161,7 @@ class StealAction(Action):
         attacker: 'Player',
         target: Optional['Player'] = None,
         game_manager: Optional['GameManager'] = None,
-    ) -> str:
+    ) -> Outcome:
         if not target:
             raise ValueError("Roubo precisa de um alvo")
         
@@ -158,8 +169,7 @@ class StealAction(Action):
         target.coins -= stolen
         attacker.coins += stolen
         
-        return (f"{attacker.name} roubou {stolen} moedas de {target.name}!\n"
-                f"(Pode ser bloqueado pelo Capitão ou Embaixador)")
+        return Outcome(OutcomeKind.STEAL, attacker.seat, target.seat, amount=stolen)
 
 class ExchangeAction(Action):
     """Ação do Embaixador - troca cartas com o baralho"""
@@ -171,9 +181,9 @@ class ExchangeAction(Action):
         attacker: 'Player',
         target: Optional['Player'] = None,
         game_manager: Optional['GameManager'] = None,
-    ) -> str:
+    ) -> Outcome:
         # Em uma implementação completa, aqui seria a lógica de troca de cartas
-        return f"{attacker.name} usou o Embaixador para trocar cartas"
+        return Outcome(OutcomeKind.EXCHANGE, attacker.seat)
     
 
 class Challenge:
@@ -183,7 +193,7 @@ class Challenge:
         self._action = action
         self._target = target
     
-    def resolve(self, game: 'GameManager') -> str:
+    def resolve(self, game: 'GameManager') -> Outcome:
         """Resolve o desafio verificando se o jogador tem o personagem requerido"""
         player_to_check = self._target if self._target else game.current_player
         
@@ -193,18 +203,16 @@ class Challenge:
         if has_requirement:
             # Desafio falhou - o jogador tinha o personagem
             self._challenger.lose_influence()
-            return (f"{self._challenger.name} falhou no desafio e perdeu uma influência!\n"
-                    f"{player_to_check.name} realmente tinha {self._action.requirement}.")
+            return Outcome(OutcomeKind.CHALLENGE_FAILED, self._challenger.seat, player_to_check.seat,
+                           self._action.requirement)
         else:
             # Desafio bem-sucedido - o jogador blefou
             player_to_check.lose_influence()
             game.add_to_history(
-                f"{self._challenger.name} desafiou {player_to_check.name} corretamente"
-            )
-            return (
-                f"{self._challenger.name} desafiou corretamente! {player_to_check.name} "
-                f"não tinha {self._action.requirement} e perdeu uma influência."
+                Outcome(OutcomeKind.CHALLENGE_RECORD, self._challenger.seat, player_to_check.seat)
             )
+            return Outcome(OutcomeKind.CHALLENGE_SUCCEEDED, self._challenger.seat, player_to_check.seat,
+                           self._action.requirement)
         
 class Block:
     """Representa um bloqueio a uma ação"""
@@ -213,17 +221,15 @@ class Block:
         self._action = action
         self._blocking_character = blocking_character
     
-    def resolve(self, game: 'GameManager') -> str:
+    def resolve(self, game: 'GameManager') -> Outcome:
         """Resolve o bloqueio"""
         # Verifica se o bloqueio é válido para esta ação
         if self._blocking_character not in self._action.blockable_by:
-            return f"{self._blocking_character} não pode bloquear esta ação!"
+            return Outcome(OutcomeKind.INVALID_BLOCK, self._blocker.seat, character=self._blocking_character)
         
         # A ação é bloqueada
         game.add_to_history(
-            f"{self._blocker.name} bloqueou a ação com {self._blocking_character}"
-        )
-        return (
-            f"{self._blocker.name} bloqueou a ação com {self._blocking_character}!\n"
-            f"A ação {self._action.__class__.__name__} foi cancelada."
+            Outcome(OutcomeKind.BLOCK_RECORD, self._blocker.seat, character=self._blocking_character)
         )
+        return Outcome(OutcomeKind.BLOCKED, self._blocker.seat, character=self._blocking_character,
+                       action=self._action)
@@ -0,0 +1,360 @@
+"""Motor em lote: K partidas entre IAs avançando juntas em arrays NumPy.
+
+Em vez de objetos ``Player``/``Action`` por partida, o estado de todas as
+mesas fica em arrays (struct-of-arrays):
+
+- ``coins[K, P]``: moedas de cada jogador;
+- ``hands[K, P, 5]``: quantas cartas de cada personagem cada um tem;
+- ``revealed[K, P, 5]``: cartas perdidas (viradas);
+- ``alive[K, P]``, ``turn_index[K]``, ``deck[K, 15]``/``deck_top[K]``.
+
+Cada ``step()`` joga um turno em todas as partidas ainda ativas com
+operações mascaradas: escolha de ação e alvo como o ``AIPlayer``,
+desafio, bloqueio e execução com as regras de ``action.py`` e do
+``GameManager``. Diferenças conhecidas em relação ao motor de objetos:
+
+- ao perder influência o motor de objetos vira a carta do maior
+  personagem da mão; aqui a carta perdida é sorteada entre as da mão.
+
+Uso:
+    python -m src.batch_engine --games 10000 --validate --compare
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from moves import ACTIONS, ASSASSINATE, COUP, EXCHANGE, FOREIGN_AID, INCOME, STEAL, TAX
+from outcomes import OutcomeKind
+from Deck import COPIES_PER_CHARACTER
+from snapshot import CHARACTERS, CHARACTER_CODES
+
+NUM_CHARACTERS = len(CHARACTERS)
+
+# Tabelas por ação, na ordem de ``moves.ACTIONS``
+ACTION_NAMES = tuple(type(a).__name__ for a in ACTIONS)
+COST = np.array([a.cost for a in ACTIONS], dtype=np.int16)
+REQUIREMENT = np.array(
+    [CHARACTER_CODES[a.requirement] if a.requirement else -1 for a in ACTIONS], dtype=np.int8
+)
+NEEDS_TARGET = np.array([a.needs_target for a in ACTIONS])
+BLOCKERS = np.array(
+    [[name in a.blockable_by for name in CHARACTERS] for a in ACTIONS], dtype=bool
+)
+BLOCKABLE = BLOCKERS.any(axis=1)
+
+# Ações disponíveis por faixa de moedas (<3, 3..6, >=7), como o filtro por
+# custo de ``get_available_actions``; -1 completa as linhas.
+AVAILABLE = np.array([
+    [INCOME, FOREIGN_AID, TAX, STEAL, EXCHANGE, -1, -1],
+    [INCOME, FOREIGN_AID, TAX, ASSASSINATE, STEAL, EXCHANGE, -1],
+    [INCOME, FOREIGN_AID, TAX, ASSASSINATE, STEAL, EXCHANGE, COUP],
+], dtype=np.int8)
+AVAILABLE_COUNT = np.array([5, 6, 7])
+
+# Probabilidades fixas do ``AIPlayer``
+COUP_RATE = 0.8
+CHALLENGE_RATE = 0.1
+BLOCK_RATE = 0.2
+
+
+class BatchEngine:
+    """``num_games`` partidas de ``num_players`` IAs em lockstep."""
+
+    def __init__(self, num_games: int, num_players: int = 4, seed: Optional[int] = None):
+        self._k = num_games
+        self._p = num_players
+        self._rng = np.random.default_rng(seed)
+        self.reset()
+
+    # --- Estado ------------------------------------------------------------
+    def reset(self) -> None:
+        """Embaralha e distribui duas cartas e duas moedas a cada jogador."""
+        k, p = self._k, self._p
+        base = np.repeat(np.arange(NUM_CHARACTERS, dtype=np.int8), COPIES_PER_CHARACTER)
+        self.deck = self._rng.permuted(np.tile(base, (k, 1)), axis=1)
+        self.deck_top = np.full(k, 2 * p, dtype=np.int16)
+        dealt = self.deck[:, :2 * p].reshape(k, p, 2)
+        self.hands = np.zeros((k, p, NUM_CHARACTERS), dtype=np.int8)
+        for slot in range(2):
+            np.add.at(self.hands, (np.arange(k)[:, None], np.arange(p)[None, :], dealt[:, :, slot]), 1)
+        self.revealed = np.zeros_like(self.hands)
+        self.coins = np.full((k, p), 2, dtype=np.int16)
+        self.alive = np.ones((k, p), dtype=bool)
+        self.turn_index = np.zeros(k, dtype=np.int16)
+        self.turns = np.zeros(k, dtype=np.int32)
+        self.done = np.zeros(k, dtype=bool)
+        self.winner = np.full(k, -1, dtype=np.int16)
+
+    @property
+    def num_games(self) -> int:
+        return self._k
+
+    @property
+    def num_players(self) -> int:
+        return self._p
+
+    # --- Turno -------------------------------------------------------------
+    def step(self) -> int:
+        """Joga um turno em cada partida ativa; retorna quantas jogaram."""
+        g = np.flatnonzero(~self.done)
+        if g.size == 0:
+            return 0
+        actor = self.turn_index[g].astype(np.intp)
+        action = self._choose_actions(g, actor)
+        target = self._choose_targets(g, actor, action)
+
+        # Desafio: quem alegou o personagem é conferido
+        claims = REQUIREMENT[action] >= 0
+        challenger = self._first_willing(g, actor, claims, CHALLENGE_RATE)
+        challenged = challenger >= 0
+        has_claim = self.hands[g, actor, np.maximum(REQUIREMENT[action], 0)] > 0
+        failed = challenged & has_claim
+        if failed.any():
+            self._lose_influence(g[failed], challenger[failed])
+        caught = challenged & ~has_claim
+        if caught.any():
+            self._lose_influence(g[caught], actor[caught])
+
+        # Bloqueio: qualquer outro jogador vivo com um personagem bloqueador
+        go = ~caught
+        can_block = (self.hands[g] > 0) & BLOCKERS[action][:, None, :]
+        eligible = can_block.any(axis=2) & self.alive[g]
+        eligible[np.arange(g.size), actor] = False
+        willing = eligible & (self._rng.random(eligible.shape) < BLOCK_RATE)
+        blocked = go & BLOCKABLE[action] & willing.any(axis=1)
+        go &= ~blocked
+
+        self.apply_actions(g[go], actor[go], action[go], target[go])
+        self._advance(g, actor)
+        return int(g.size)
+
+    def run(self, max_turns: int = 1000) -> Dict:
+        """Joga até todas as partidas terminarem (ou ``max_turns``)."""
+        for _ in range(max_turns):
+            if not self.step():
+                break
+        return self.stats()
+
+    def stats(self) -> Dict:
+        finished = self.winner >= 0
+        wins = np.bincount(self.winner[finished], minlength=self._p)
+        return {
+            "games": self._k,
+            "turns": int(self.turns.sum()),
+            "unfinished": int((~finished).sum()),
+            "wins": wins.tolist(),
+        }
+
+    # --- Fases -------------------------------------------------------------
+    def _choose_actions(self, g: np.ndarray, actor: np.ndarray) -> np.ndarray:
+        coins = self.coins[g, actor]
+        bucket = (coins >= 3).astype(np.intp) + (coins >= 7)
+        pick = (self._rng.random(g.size) * AVAILABLE_COUNT[bucket]).astype(np.intp)
+        action = AVAILABLE[bucket, pick]
+        coup = (coins >= 7) & (self._rng.random(g.size) < COUP_RATE)
+        return np.where(coup, COUP, action).astype(np.intp)
+
+    def _choose_targets(self, g: np.ndarray, actor: np.ndarray, action: np.ndarray) -> np.ndarray:
+        """Alvo uniforme entre os oponentes vivos; -1 se a ação não tem alvo."""
+        valid = self.alive[g].copy()
+        valid[np.arange(g.size), actor] = False
+        return np.where(NEEDS_TARGET[action], self._sample_seat(valid), -1)
+
+    def _first_willing(self, g: np.ndarray, actor: np.ndarray, asked: np.ndarray, rate: float) -> np.ndarray:
+        """Primeiro jogador (em ordem de assento) que aceita; -1 se nenhum."""
+        eligible = self.alive[g] & asked[:, None]
+        eligible[np.arange(g.size), actor] = False
+        willing = eligible & (self._rng.random(eligible.shape) < rate)
+        return np.where(willing.any(axis=1), willing.argmax(axis=1), -1)
+
+    def apply_actions(self, g: np.ndarray, actor: np.ndarray, action: np.ndarray, target: np.ndarray) -> None:
+        """Executa ações já liberadas (sem desafio vencido nem bloqueio).
+
+        Espelha ``Player.perform_action`` + ``Action.execute``: o custo só é
+        pago quando a ação é executada.
+        """
+        if g.size == 0:
+            return
+        self.coins[g, actor] -= COST[action]
+        gain = np.select([action == INCOME, action == FOREIGN_AID, action == TAX], [1, 2, 3], 0)
+        self.coins[g, actor] += gain.astype(np.int16)
+
+        steal = action == STEAL
+        if steal.any():
+            gs, a, t = g[steal], actor[steal], target[steal]
+            stolen = np.minimum(2, self.coins[gs, t])
+            self.coins[gs, t] -= stolen
+            self.coins[gs, a] += stolen
+
+        hit = ((action == COUP) | (action == ASSASSINATE))
+        if hit.any():
+            gh, t = g[hit], target[hit]
+            # Assassinar um eliminado não tem efeito; o Coup nunca o tem como alvo
+            live = self.alive[gh, t]
+            self._lose_influence(gh[live], t[live])
+
+    def _lose_influence(self, g: np.ndarray, seat: np.ndarray) -> None:
+        """Cada (partida, jogador) vira uma carta sorteada da própria mão."""
+        hand = self.hands[g, seat].astype(np.float64)
+        total = hand.sum(axis=1)
+        has = total > 0
+        g, seat, hand, total = g[has], seat[has], hand[has], total[has]
+        if g.size == 0:
+            return
+        cum = np.cumsum(hand, axis=1)
+        pick = self._rng.random(g.size) * total
+        card = (cum <= pick[:, None]).sum(axis=1)
+        self.hands[g, seat, card] -= 1
+        self.revealed[g, seat, card] += 1
+        self.alive[g, seat] = self.hands[g, seat].sum(axis=1) > 0
+
+    def _advance(self, g: np.ndarray, actor: np.ndarray) -> None:
+        """Passa a vez ao próximo vivo e marca as partidas encerradas."""
+        self.turns[g] += 1
+        offsets = (actor[:, None] + 1 + np.arange(self._p)[None, :]) % self._p
+        alive_next = self.alive[g[:, None], offsets]
+        self.turn_index[g] = offsets[np.arange(g.size), alive_next.argmax(axis=1)]
+
+        alive_count = self.alive[g].sum(axis=1)
+        over = alive_count <= 1
+        self.done[g[over]] = True
+        won = over & (alive_count == 1)
+        self.winner[g[won]] = self.alive[g[won]].argmax(axis=1)
+
+    def _sample_seat(self, mask: np.ndarray) -> np.ndarray:
+        """Sorteia uniformemente um assento verdadeiro por linha (-1 se nenhum)."""
+        count = mask.sum(axis=1)
+        pick = (self._rng.random(mask.shape[0]) * count).astype(np.intp)
+        cum = np.cumsum(mask, axis=1)
+        seat = (cum <= pick[:, None]).sum(axis=1)
+        return np.where(count > 0, seat, -1)
+
+
+# --- Validação contra o motor de objetos -----------------------------------
+def validate_rules(trials: int = 2000, num_players: int = 4, seed: int = 0) -> List[str]:
+    """Compara ações, desafios e bloqueios com ``action.py``.
+
+    Para cada tentativa sorteia um estado, aplica a mesma jogada nos dois
+    motores e compara moedas, tamanho das mãos e jogadores vivos. Retorna
+    as divergências encontradas.
+    """
+    from action import Block, Challenge
+    from Deck import Deck
+    from game_manager import GameManager
+    from player import AIPlayer
+
+    rng = random.Random(seed)
+    engine = BatchEngine(1, num_players, seed=seed)
+    probe = GameManager([AIPlayer("a")], state_file=None, deck=Deck(None))
+    actions = {type(a).__name__: a for a in ACTIONS}
+    errors: List[str] = []
+
+    for trial in range(trials):
+        engine.reset()
+        engine.coins[0] = [rng.randint(0, 12) for _ in range(num_players)]
+        players = []
+        for seat in range(num_players):
+            chars = [rng.randrange(NUM_CHARACTERS) for _ in range(rng.randint(1, 2))]
+            engine.hands[0, seat] = np.bincount(chars, minlength=NUM_CHARACTERS)
+            p = AIPlayer(f"P{seat}")
+            p.coins = int(engine.coins[0, seat])
+            for c in chars:
+                p.add_character(CHARACTERS[c])
+            players.append(p)
+        actor, target = rng.sample(range(num_players), 2)
+        code = rng.choice([a for a in range(7) if COST[a] <= engine.coins[0, actor]])
+        action = actions[ACTION_NAMES[code]]
+        kind = rng.choice(["execute", "challenge", "block"])
+        g = np.array([0])
+
+        if kind == "execute":
+            players[actor].perform_action(action, players[target] if NEEDS_TARGET[code] else None, None)
+            engine.apply_actions(g, np.array([actor]), np.array([code]), np.array([target]))
+        elif kind == "challenge" and REQUIREMENT[code] >= 0:
+            probe._players = players
+            probe._turn_index = actor
+            Challenge(players[target], action, players[actor]).resolve(probe)
+            has = engine.hands[0, actor, REQUIREMENT[code]] > 0
+            engine._lose_influence(g, np.array([target if has else actor]))
+        elif kind == "block" and BLOCKABLE[code]:
+            character = players[target].choose_blocking_character(action)
+            blocked = Block(players[target], action, character).resolve(probe).kind is OutcomeKind.BLOCKED
+            engine_blocked = bool((engine.hands[0, target] > 0)[BLOCKERS[code]].any())
+            if blocked != engine_blocked:
+                errors.append(f"#{trial} bloqueio de {ACTION_NAMES[code]}: objetos={blocked} lote={engine_blocked}")
+            continue
+        else:
+            continue
+
+        for seat, p in enumerate(players):
+            got = (int(engine.coins[0, seat]), int(engine.hands[0, seat].sum()), bool(engine.alive[0, seat]))
+            want = (p.coins, len(p.characters), p.is_alive)
+            if got != want:
+                errors.append(f"#{trial} {kind} {ACTION_NAMES[code]} assento {seat}: objetos={want} lote={got}")
+    return errors
+
+
+# --- Comparação de desempenho ----------------------------------------------
+def compare_throughput(games: int = 2000, num_players: int = 4, seed: int = 0) -> Dict:
+    """Mede partidas/s e turnos/s dos dois motores num único processo."""
+    from simulate import run_batch
+
+    start = time.perf_counter()
+    obj = run_batch(games, num_players, 1000, seed)
+    obj_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = BatchEngine(games, num_players, seed=seed).run()
+    batch_s = time.perf_counter() - start
+
+    return {
+        "object": {"games_per_s": games / obj_s, "turns_per_s": obj["turns"] / obj_s},
+        "batch": {"games_per_s": games / batch_s, "turns_per_s": batch["turns"] / batch_s},
+        "speedup": obj_s / batch_s,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Motor em lote de partidas de Coup.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--validate", action="store_true", help="compara as regras com action.py")
+    parser.add_argument("--compare", action="store_true", help="compara com o motor de objetos")
+    args = parser.parse_args(argv)
+
+    if args.validate:
+        errors = validate_rules(num_players=args.players, seed=args.seed or 0)
+        for line in errors[:20]:
+            print(line)
+        print(f"Validação: {len(errors)} divergência(s)")
+        if errors:
+            sys.exit(1)
+
+    if args.compare:
+        result = compare_throughput(min(args.games, 5000), args.players, args.seed or 0)
+        for name in ("object", "batch"):
+            r = result[name]
+            print(f"{name:>6}: {r['games_per_s']:.0f} partidas/s, {r['turns_per_s']:.0f} turnos/s")
+        print(f"Aceleração: {result['speedup']:.1f}x")
+        return
+
+    start = time.perf_counter()
+    stats = BatchEngine(args.games, args.players, seed=args.seed).run()
+    elapsed = time.perf_counter() - start
+    print(f"Partidas: {stats['games']} ({stats['unfinished']} sem vencedor) em {elapsed:.2f}s")
+    print(f"Partidas/s: {stats['games'] / elapsed:.0f}  Turnos/s: {stats['turns'] / elapsed:.0f}")
+    finished = stats["games"] - stats["unfinished"]
+    for seat, wins in enumerate(stats["wins"]):
+        print(f"  Assento {seat + 1}: {wins / max(finished, 1):.2%} de vitórias")
+
+
+if __name__ == "__main__":
+    main()
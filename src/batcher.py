@@ -0,0 +1,243 @@
+"""Inferência em lote da política aprendida para muitas partidas ao mesmo tempo.
+
+Avaliar a ``LinearPolicy`` (``selfplay.py``) uma decisão por vez custa
+uma chamada NumPy pequena por pergunta, e quase todo o tempo vai em
+despacho do Python. O ``PolicyBatcher`` é um ``DecisionProvider``: as
+decisões de ação, desafio e bloqueio de todas as mesas que usam o mesmo
+provedor entram numa fila só com os inteiros do estado
+(``selfplay.raw_observation``), e a fila inteira é respondida de uma vez:
+observações montadas em NumPy (``featurize``), um único produto de
+matrizes (observações [B, F] x pesos [F, M]) e um sorteio vetorizado
+(Gumbel-max, equivalente a sortear pela softmax).
+
+A fila é esvaziada quando chega a ``max_batch`` decisões ou quando vence
+``max_wait`` segundos desde a primeira pendente. Com ``max_wait=0`` o
+lote sai assim que o laço de eventos roda tudo que já estava pronto, ou
+seja, junta as mesas que acordaram com o lote anterior sem esperar
+ninguém. As respostas voltam pelos futuros de cada mesa.
+
+``stats`` mostra o tamanho dos lotes e a latência de fila (da entrada da
+decisão até a resposta) em histogramas, como os do ``TurnMetrics``.
+
+Uso:
+    python -m src.batcher --policy data/policy.bin --games 2000 --concurrent 256
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from decisions import ACTION, BLOCK, CHALLENGE, TARGET, Decision, DecisionProvider, decide_with_hooks
+from Deck import Deck
+from game_manager import GameManager
+from metrics import DEFAULT_BUCKETS, Histogram
+from player import Player
+from selfplay import (
+    ACT, BLOCK as ASK_BLOCK, CHALLENGE as ASK_CHALLENGE,
+    LinearPolicy, PolicyPlayer, action_moves, featurize, raw_observation, reaction_moves, resolve_action,
+)
+
+_REACTIONS = {CHALLENGE: ASK_CHALLENGE, BLOCK: ASK_BLOCK}
+
+
+class PolicyBatcher(DecisionProvider):
+    """Responde ação, alvo, desafios e bloqueios de qualquer jogador pela ``policy``, em lotes.
+
+    As demais decisões (personagem do bloqueio, carta a perder) usam os
+    ganchos do jogador, assim como mesas de tamanho diferente do da
+    política. Decisões de um ``PolicyPlayer`` gravando entram na
+    trajetória dele, como no caminho síncrono.
+
+    Args:
+        policy: Política avaliada; pode ser trocada entre lotes (``policy``).
+        max_batch: Decisões por lote no máximo.
+        max_wait: Segundos que a primeira decisão pendente pode esperar
+            por companhia (0: só o que já está pronto no laço de eventos).
+        seed: Semente do sorteio das jogadas.
+    """
+
+    def __init__(self, policy: LinearPolicy, max_batch: int = 256, max_wait: float = 0.0,
+                 seed: Optional[int] = None):
+        if max_batch < 1:
+            raise ValueError("max_batch precisa ser pelo menos 1")
+        self.policy = policy
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._rng = np.random.default_rng(seed)
+        # (estado cru, jogadas legais, futuro, instante de entrada)
+        self._queue: List[Tuple[Tuple[int, ...], Sequence[int], asyncio.Future, float]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        # id do jogador -> alvo já escolhido, até a decisão TARGET que vem logo depois
+        self._targets: Dict[int, Player] = {}
+        self._batch_sizes = Histogram(tuple(float(1 << i) for i in range(max_batch.bit_length() + 1)))
+        self._latency = Histogram(DEFAULT_BUCKETS)
+        self.full_batches = 0
+        self.timed_batches = 0
+
+    # --- Provedor ------------------------------------------------------------
+    async def decide(self, decision: Decision) -> Any:
+        kind = decision.kind
+        players = decision.players
+        if kind == TARGET:
+            target = self._targets.pop(id(decision.player), None)
+            return target if target in decision.options else random.choice(list(decision.options))
+        ask = ACT if kind == ACTION else _REACTIONS.get(kind)
+        if ask is None or players is None or len(players) != self.policy.num_seats:
+            return decide_with_hooks(decision)
+        seat = players.index(decision.player)
+        if ask == ACT:
+            mask, moves = action_moves(players, seat)
+            move = await self._submit(decision.player, raw_observation(players, seat, ACT), mask, moves)
+            action, target = resolve_action(move, players, seat)
+            # Só ações com alvo geram a decisão TARGET que tira a entrada
+            if target is not None:
+                self._targets[id(decision.player)] = target
+            else:
+                self._targets.pop(id(decision.player), None)
+            return action
+        no, yes = reaction_moves(ask, len(players))
+        raw = raw_observation(players, seat, ask, decision.action, decision.actor, decision.target)
+        return await self._submit(decision.player, raw, 1 << no | 1 << yes, (no, yes)) == yes
+
+    # --- Fila e lotes ----------------------------------------------------------
+    async def _submit(self, player: Player, raw: Tuple[int, ...], mask: int, moves: Sequence[int]) -> int:
+        # Atributo, não ``isinstance``: num processo filho o ``selfplay`` que
+        # criou o jogador pode ser o ``__main__``, uma cópia do módulo
+        recording = getattr(player, "recording", False)
+        if len(moves) == 1 and not recording:
+            return moves[0]  # nada a sortear
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._queue
+        queue.append((raw, moves, future, time.perf_counter()))
+        if len(queue) >= self._max_batch:
+            self.full_batches += 1
+            self.flush()
+        elif self._flush_handle is None:
+            if self._max_wait > 0:
+                self._flush_handle = loop.call_later(self._max_wait, self._timed_flush)
+            else:
+                self._flush_handle = loop.call_soon(self._timed_flush)
+        move, obs = await future
+        if recording:
+            player.remember(obs, mask, move)
+        return move
+
+    def _timed_flush(self) -> None:
+        self._flush_handle = None
+        if self._queue:
+            self.timed_batches += 1
+            self.flush()
+
+    def flush(self) -> None:
+        """Responde agora todas as decisões pendentes com um único passo da política."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+        policy = self.policy
+        obs = featurize([entry[0] for entry in batch], policy.num_seats)
+        logits = obs @ policy.weights + policy.bias
+        # Só as jogadas legais de cada linha concorrem
+        rows = np.repeat(np.arange(len(batch)), [len(entry[1]) for entry in batch])
+        cols = np.fromiter(chain.from_iterable(entry[1] for entry in batch), dtype=np.intp, count=len(rows))
+        scores = np.full(logits.shape, -np.inf, dtype=np.float32)
+        scores[rows, cols] = logits[rows, cols] + self._rng.gumbel(size=len(rows))
+        chosen = scores.argmax(axis=1).tolist()
+        now = time.perf_counter()
+        self._batch_sizes.observe(len(batch))
+        latency = self._latency
+        for i, ((_, _, future, queued), move) in enumerate(zip(batch, chosen)):
+            latency.observe(now - queued)
+            if not future.done():
+                future.set_result((move, obs[i]))
+
+    # --- Métricas ------------------------------------------------------------------
+    @property
+    def stats(self) -> Dict:
+        sizes, latency = self._batch_sizes, self._latency
+        return {
+            "batches": sizes.count,
+            "decisions": latency.count,
+            "mean_batch": sizes.sum / sizes.count if sizes.count else 0.0,
+            "full_batches": self.full_batches,
+            "timed_batches": self.timed_batches,
+            "batch_size_buckets": dict(sizes.cumulative()),
+            "queue_latency_mean_s": latency.sum / latency.count if latency.count else 0.0,
+            "queue_latency_buckets": dict(latency.cumulative()),
+        }
+
+
+async def play_concurrent(provider: DecisionProvider, players_for_game, games: int, concurrent: int,
+                          max_turns: int = 1000) -> List[Tuple[List[Player], Optional[Player]]]:
+    """Joga ``games`` partidas com até ``concurrent`` mesas vivas ao mesmo tempo.
+
+    ``players_for_game()`` monta os jogadores de cada partida. Devolve,
+    por partida, os jogadores e o vencedor (``None`` se bateu ``max_turns``).
+    """
+    results: List[Tuple[List[Player], Optional[Player]]] = []
+    remaining = games
+
+    async def table() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            players = players_for_game()
+            game = GameManager(players, state_file=None, deck=Deck(None))
+            results.append((players, await game.play_async(provider, max_turns)))
+
+    await asyncio.gather(*(table() for _ in range(max(1, min(concurrent, games)))))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Política avaliada uma decisão por vez e em lote.")
+    parser.add_argument("--policy", help="pesos de python -m src.selfplay (padrão: política nula)")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--concurrent", type=int, default=256, help="mesas vivas ao mesmo tempo")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    policy = LinearPolicy.load(args.policy) if args.policy else LinearPolicy(args.players)
+    seats = policy.num_seats
+
+    def players_for_game() -> List[Player]:
+        return [PolicyPlayer(f"Bot {i + 1}", policy) for i in range(seats)]
+
+    random.seed(args.seed)
+    start = time.perf_counter()
+    for _ in range(args.games):
+        game = GameManager(players_for_game(), state_file=None, deck=Deck(None))
+        turns = 0
+        while not game.is_game_over and turns < 1000:
+            game.play_turn()
+            turns += 1
+    single = time.perf_counter() - start
+    print(f"Uma decisão por vez: {args.games / single:.0f} partidas/s")
+
+    batcher = PolicyBatcher(policy, args.max_batch, args.max_wait_ms / 1e3, args.seed)
+    start = time.perf_counter()
+    asyncio.run(play_concurrent(batcher, players_for_game, args.games, args.concurrent))
+    batched = time.perf_counter() - start
+    stats = batcher.stats
+    print(f"Em lote ({args.concurrent} mesas): {args.games / batched:.0f} partidas/s "
+          f"({single / batched:.2f}x)")
+    print(f"Lotes: {stats['batches']}, média {stats['mean_batch']:.1f} decisões "
+          f"({stats['full_batches']} cheios), fila média {stats['queue_latency_mean_s'] * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Crenças sobre as cartas ocultas dos oponentes, atualizadas por evento.
+
+``BeliefTracker`` é um ``GameListener``: inscrito no ``GameManager``, ele
+mantém, para cada oponente e personagem, a probabilidade de o oponente ter
+pelo menos uma cópia do personagem entre as cartas ocultas, do ponto de
+vista de um jogador (``observer``), que conhece a própria mão.
+
+O modelo:
+
+- A priori, as cartas ocultas de um oponente saem, sem reposição, das
+  cartas que o observador não vê: ``copies`` de cada personagem menos as
+  viradas na mesa e as da própria mão.
+- Cada declaração não desafiada (ação ou bloqueio) multiplica as chances
+  do personagem por ``1 / bluff``, em que ``bluff`` é a razão entre a
+  chance de declarar o personagem sem tê-lo e a de declará-lo tendo.
+- Um desafio fixa a resposta: quem provou o personagem o tem, quem
+  blefou não o tem. Virar a carta declarada volta a dúvida para a priori;
+  uma troca do Embaixador apaga o que se sabia do jogador.
+
+As marginais de cada jogador ficam em cache; um evento só invalida o
+jogador envolvido (ou todos, quando muda o conjunto de cartas não vistas).
+Assim ``probability`` é O(1) e nenhum evento percorre o histórico.
+"""
+import math
+from itertools import combinations_with_replacement
+from math import comb
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from cards import CHARACTERS, COPIES_PER_CHARACTER, HAND_BITS, SHIFT, pack
+from events import GameListener
+
+if TYPE_CHECKING:
+    from game_manager import GameManager
+    from player import Player
+
+_NEUTRAL = 1.0
+_HAS = math.inf     # provou ter o personagem
+_LACKS = 0.0        # blefou e foi pego
+
+
+def unseen_cards(players: Sequence["Player"], observer: Optional["Player"] = None,
+                 copies: int = COPIES_PER_CHARACTER) -> List[int]:
+    """Cópias de cada personagem fora das cartas viradas e da mão de ``observer``."""
+    unseen = [copies] * len(CHARACTERS)
+    for p in players:
+        for c in p.revealed:
+            unseen[SHIFT[c] // HAND_BITS] -= 1
+    if observer is not None:
+        for c in observer.characters:
+            unseen[SHIFT[c] // HAND_BITS] -= 1
+    return unseen
+
+
+def hand_distribution(
+    unseen: Sequence[int], cards: int, evidence: Optional[Sequence[float]] = None
+) -> List[Tuple[int, float]]:
+    """Mãos possíveis de ``cards`` cartas tiradas de ``unseen``, com a probabilidade.
+
+    As mãos vêm empacotadas (``cards.py``). ``evidence`` são os fatores de
+    chances por personagem de ``BeliefTracker``; sem ela (ou se ela
+    contradiz as cartas disponíveis) vale só a contagem de combinações.
+    """
+    hands = []
+    for combo in combinations_with_replacement(range(len(CHARACTERS)), cards):
+        ways = 1
+        for c in set(combo):
+            ways *= comb(max(unseen[c], 0), combo.count(c))
+        if ways:
+            hands.append((pack(combo), combo, float(ways)))
+    weights = [w for _, _, w in hands]
+    if evidence is not None:
+        weighted = []
+        for _, combo, w in hands:
+            for c in range(len(CHARACTERS)):
+                e = evidence[c]
+                if e == _NEUTRAL:
+                    continue
+                held = c in combo
+                if e == _HAS:
+                    w = w if held else 0.0
+                elif held:
+                    w *= e
+            weighted.append(w)
+        if sum(weighted) > 0:
+            weights = weighted
+    total = sum(weights)
+    return [(hand, w / total) for (hand, _, _), w in zip(hands, weights) if w > 0] if total else []
+
+
+class BeliefTracker(GameListener):
+    """Marginais das cartas ocultas dos oponentes, do ponto de vista de ``observer``.
+
+    Args:
+        observer: Jogador dono das crenças; com ``None`` só a informação
+            pública (nenhuma mão conhecida).
+        bluff: Razão de verossimilhança de uma declaração falsa contra uma
+            verdadeira (1.0: declarações não dizem nada).
+    """
+
+    __slots__ = ("_observer", "_bluff", "_copies", "_revealed", "_evidence", "_cache")
+
+    def __init__(self, observer: Optional["Player"] = None, bluff: float = 0.5):
+        if not 0 < bluff <= 1:
+            raise ValueError("bluff precisa estar em (0, 1]")
+        self._observer = observer
+        self._bluff = bluff
+        self._copies = COPIES_PER_CHARACTER
+        self._revealed = [0] * len(CHARACTERS)
+        # Por jogador: fator de chances de cada personagem (``_HAS``/``_LACKS`` quando certo)
+        self._evidence: Dict["Player", List[float]] = {}
+        self._cache: Dict["Player", List[float]] = {}
+
+    @property
+    def observer(self) -> Optional["Player"]:
+        return self._observer
+
+    # --- Consultas -----------------------------------------------------------
+    def probability(self, player: "Player", character: str) -> float:
+        """Chance de ``player`` ter ``character`` entre as cartas ocultas."""
+        probs = self._cache.get(player)
+        if probs is None:
+            probs = self._cache[player] = self._marginals(player)
+        return probs[SHIFT[character] // HAND_BITS]
+
+    def marginals(self, player: "Player") -> Dict[str, float]:
+        """Todas as chances de ``player``, por personagem."""
+        return {c: self.probability(player, c) for c in CHARACTERS}
+
+    def unseen(self) -> List[int]:
+        """Cópias de cada personagem que o observador não vê (ordem de ``CHARACTERS``)."""
+        own = self._observer.hand if self._observer is not None else 0
+        return [
+            self._copies - self._revealed[i] - ((own >> (HAND_BITS * i)) & 15)
+            for i in range(len(CHARACTERS))
+        ]
+
+    def hand_distribution(self, player: "Player") -> List[Tuple[int, float]]:
+        """Mãos ocultas possíveis de ``player`` com a probabilidade de cada uma."""
+        return hand_distribution(self.unseen(), len(player.characters), self._evidence.get(player))
+
+    def _marginals(self, player: "Player") -> List[float]:
+        hidden = len(player.characters)
+        if player is self._observer:
+            return [1.0 if player.has_character(c) else 0.0 for c in CHARACTERS]
+        if hidden == 0:
+            return [0.0] * len(CHARACTERS)
+        unseen = self.unseen()
+        total = sum(unseen)
+        evidence = self._evidence.get(player)
+        probs = []
+        for i, copies in enumerate(unseen):
+            factor = evidence[i] if evidence is not None else _NEUTRAL
+            if factor == _LACKS:
+                probs.append(0.0)
+                continue
+            if factor == _HAS:
+                probs.append(1.0)
+                continue
+            # A priori: 1 - P(nenhuma das cartas ocultas é este personagem)
+            none = 1.0
+            for k in range(hidden):
+                if total - k <= 0:
+                    break
+                none *= max(total - copies - k, 0) / (total - k)
+            prior = 1.0 - none
+            if prior <= 0.0 or none <= 0.0:
+                probs.append(prior)
+                continue
+            odds = prior / none * factor
+            probs.append(odds / (1.0 + odds))
+        return probs
+
+    def clone(self, players: Dict["Player", "Player"]) -> "BeliefTracker":
+        """Cópia independente, com os jogadores trocados segundo ``players`` (original -> cópia)."""
+        twin = BeliefTracker.__new__(BeliefTracker)
+        twin._observer = players.get(self._observer, self._observer)
+        twin._bluff = self._bluff
+        twin._copies = self._copies
+        twin._revealed = list(self._revealed)
+        twin._evidence = {players.get(p, p): list(e) for p, e in self._evidence.items()}
+        twin._cache = {}
+        return twin
+
+    def _evidence_of(self, player: "Player") -> List[float]:
+        evidence = self._evidence.get(player)
+        if evidence is None:
+            evidence = self._evidence[player] = [_NEUTRAL] * len(CHARACTERS)
+        return evidence
+
+    # --- Eventos ---------------------------------------------------------------
+    def on_attach(self, game: "GameManager") -> None:
+        """Recomeça a partir do estado público da partida."""
+        self._copies = game._deck._copies
+        if self._observer is not None:
+            # Depois de recarregar um arquivo os jogadores são outros objetos
+            name = self._observer.name
+            self._observer = next((p for p in game.players if p.name == name), self._observer)
+        self._revealed = [0] * len(CHARACTERS)
+        for p in game.players:
+            for c in p.revealed:
+                self._revealed[SHIFT[c] // HAND_BITS] += 1
+        self._evidence.clear()
+        self._cache.clear()
+
+    def on_claim(self, player: "Player", character: str) -> None:
+        if player is self._observer:
+            return
+        evidence = self._evidence_of(player)
+        i = SHIFT[character] // HAND_BITS
+        if evidence[i] != _LACKS and evidence[i] != _HAS:
+            evidence[i] /= self._bluff
+            self._cache.pop(player, None)
+
+    def on_challenge(self, player: "Player", character: str, truthful: bool) -> None:
+        if player is self._observer:
+            return
+        self._evidence_of(player)[SHIFT[character] // HAND_BITS] = _HAS if truthful else _LACKS
+        self._cache.pop(player, None)
+
+    def on_reveal(self, player: "Player", character: str) -> None:
+        i = SHIFT[character] // HAND_BITS
+        self._revealed[i] += 1
+        evidence = self._evidence.get(player)
+        if evidence is not None and evidence[i] == _HAS:
+            # A carta provada pode ser justamente a que foi virada
+            evidence[i] = _NEUTRAL
+        # Menos cartas não vistas: muda a priori de todos
+        self._cache.clear()
+
+    def on_exchange(self, player: "Player") -> None:
+        self._evidence.pop(player, None)
+        if player is self._observer:
+            self._cache.clear()
+        else:
+            self._cache.pop(player, None)
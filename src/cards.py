@@ -0,0 +1,108 @@
+"""Modelo compacto de cartas e mãos.
+
+- ``Character`` é um ``IntEnum`` de 0 a 4; ``CHARACTERS`` guarda os nomes
+  usados nas mensagens, nos arquivos e nas opções de decisão.
+- Uma mão é um inteiro com 4 bits por personagem (quantas cópias de cada
+  um), então ter um personagem, bloquear uma ação ou comparar mãos é
+  uma operação de bits. As cartas viradas (influências perdidas) usam o
+  mesmo formato.
+- Uma carta do baralho é ``id << 3 | personagem``.
+"""
+from enum import IntEnum
+from typing import Dict, Iterable, Tuple, Union
+
+CHARACTERS = ("Duke", "Assassin", "Captain", "Ambassador", "Contessa")
+COPIES_PER_CHARACTER = 3
+
+
+class Character(IntEnum):
+    DUKE = 0
+    ASSASSIN = 1
+    CAPTAIN = 2
+    AMBASSADOR = 3
+    CONTESSA = 4
+
+    @property
+    def label(self) -> str:
+        """Nome usado no jogo (``"Duke"``, ``"Assassin"``...)."""
+        return CHARACTERS[self]
+
+    @classmethod
+    def parse(cls, value: Union[str, int]) -> "Character":
+        """Personagem a partir do nome do jogo ou do código."""
+        if isinstance(value, str):
+            return _BY_NAME[value]
+        return cls(value)
+
+
+_BY_NAME: Dict[str, Character] = {c.label: c for c in Character}
+
+# --- Mãos (contagens empacotadas) ---------------------------------------------
+HAND_BITS = 4
+_NIBBLE = (1 << HAND_BITS) - 1
+
+# Mão -> nomes em ordem de personagem; há poucas mãos distintas
+_NAMES: Dict[int, Tuple[str, ...]] = {0: ()}
+# Deslocamento de cada personagem na mão, por nome ou código (ints simples:
+# a aritmética de ``IntEnum`` é bem mais lenta). Os caminhos quentes o
+# usam direto, sem chamada de função.
+SHIFT: Dict[Union[str, int], int] = {}
+for _c in Character:
+    SHIFT[_c.label] = SHIFT[int(_c)] = HAND_BITS * int(_c)
+
+
+def character_bit(character: Union[str, int]) -> int:
+    """Uma cópia de ``character`` no formato de mão."""
+    return 1 << SHIFT[character]
+
+
+def character_mask(characters: Iterable[Union[str, int]]) -> int:
+    """Máscara que testa, numa mão, a presença de qualquer um de ``characters``."""
+    mask = 0
+    for c in characters:
+        mask |= _NIBBLE << SHIFT[c]
+    return mask
+
+
+def count(hand: int, character: Union[str, int]) -> int:
+    return (hand >> SHIFT[character]) & _NIBBLE
+
+
+def pack(characters: Iterable[Union[str, int]]) -> int:
+    """Mão com as cartas de ``characters`` (nomes ou códigos)."""
+    hand = 0
+    for c in characters:
+        hand += character_bit(c)
+    return hand
+
+
+def names(hand: int) -> Tuple[str, ...]:
+    """Cartas da mão em ordem de personagem, como nomes."""
+    cached = _NAMES.get(hand)
+    if cached is None:
+        cached = _NAMES[hand] = tuple(
+            label for code, label in enumerate(CHARACTERS)
+            for _ in range((hand >> (HAND_BITS * code)) & _NIBBLE)
+        )
+    return cached
+
+
+def last_bit(hand: int) -> int:
+    """Uma cópia do maior personagem da mão (a carta perdida por padrão)."""
+    return 1 << ((hand.bit_length() - 1) // HAND_BITS * HAND_BITS)
+
+
+# --- Cartas do baralho ------------------------------------------------------------
+CARD_BITS = 3
+
+
+def make_card(card_id: int, character: Union[str, int]) -> int:
+    return card_id << CARD_BITS | SHIFT[character] // HAND_BITS
+
+
+def card_id(card: int) -> int:
+    return card >> CARD_BITS
+
+
+def card_character(card: int) -> str:
+    return CHARACTERS[card & 7]
@@ -0,0 +1,271 @@
+"""Protocolo de decisões: quem responde as escolhas de um turno.
+
+O turno do ``GameManager`` é um gerador que produz um ``Decision`` a cada
+escolha (ação, alvo, desafio, bloqueio, personagem do bloqueio, carta a
+perder) e recebe a resposta de volta. Quem responde depende de como o
+turno é conduzido:
+
+- ``GameManager.play_turn`` responde na hora, com os ganchos síncronos
+  do próprio jogador (``decide_with_hooks``);
+- ``GameManager.play_turn_async(provider)`` aguarda ``provider.decide``,
+  então um mesmo processo pode intercalar milhares de partidas paradas
+  esperando humanos (interface, console, clientes de rede ou bots).
+
+Uso:
+    python -m src.decisions --tables 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from action import Action
+
+if TYPE_CHECKING:
+    from player import Player
+
+ACTION = "action"
+TARGET = "target"
+CHALLENGE = "challenge"
+BLOCK = "block"
+BLOCKING_CHARACTER = "blocking_character"
+LOSE_INFLUENCE = "lose_influence"
+
+YES_NO = (True, False)
+
+
+class Decision:
+    """Uma escolha pendente de ``player``.
+
+    ``options`` são as respostas aceitas e ``default`` a resposta usada
+    quando o provedor devolve algo fora delas. ``action``, ``actor`` e
+    ``target`` descrevem a jogada em andamento (quando houver).
+
+    ``window`` é a janela de reação (desafio ou bloqueio) à qual a
+    decisão pertence: a tupla, em ordem, de todos os jogadores que podem
+    reagir. O núcleo pergunta a eles um por um até alguém aceitar; a
+    mesma tupla vem em cada pergunta da janela, então um provedor pode
+    perguntar a todos em paralelo na primeira e responder as seguintes
+    com o resultado.
+    """
+
+    __slots__ = ("kind", "player", "options", "default", "action", "actor", "target", "players", "window")
+
+    def __init__(
+        self,
+        kind: str,
+        player: "Player",
+        options: Sequence,
+        default: Any = None,
+        action: Optional[Action] = None,
+        actor: Optional["Player"] = None,
+        target: Optional["Player"] = None,
+        players: Optional[List["Player"]] = None,
+        window: Optional[Tuple["Player", ...]] = None,
+    ):
+        self.kind = kind
+        self.player = player
+        self.options = options
+        self.default = default
+        self.action = action
+        self.actor = actor
+        self.target = target
+        self.players = players
+        self.window = window
+
+    def validate(self, answer: Any) -> Any:
+        """``answer`` se for uma opção válida, senão ``default``."""
+        return answer if answer in self.options else self.default
+
+    def __repr__(self) -> str:
+        return f"Decision({self.kind!r}, {self.player.name!r})"
+
+
+def _hook_action(d: Decision) -> Action:
+    return d.player.choose_action(d.options, d.players)
+
+
+def _hook_target(d: Decision) -> "Player":
+    return d.player.choose_target(list(d.options))
+
+
+def _hook_challenge(d: Decision) -> bool:
+    return d.player.wants_to_challenge(action=d.action, actor=d.actor, target=d.target, players=d.players)
+
+
+def _hook_block(d: Decision) -> bool:
+    return d.player.wants_to_block(action=d.action, actor=d.actor, target=d.target, players=d.players)
+
+
+def _hook_blocking_character(d: Decision) -> str:
+    return d.player.choose_blocking_character(d.action)
+
+
+def _hook_lose_influence(d: Decision) -> str:
+    return d.player.choose_influence_to_lose(d.options)
+
+
+_HOOKS = {
+    ACTION: _hook_action,
+    TARGET: _hook_target,
+    CHALLENGE: _hook_challenge,
+    BLOCK: _hook_block,
+    BLOCKING_CHARACTER: _hook_blocking_character,
+    LOSE_INFLUENCE: _hook_lose_influence,
+}
+
+
+def decide_with_hooks(decision: Decision) -> Any:
+    """Responde ``decision`` com os ganchos síncronos do jogador."""
+    return _HOOKS[decision.kind](decision)
+
+
+class DecisionProvider:
+    """Provedor assíncrono de decisões.
+
+    ``decide`` despacha para um método aguardável por tipo de decisão;
+    por padrão todos usam os ganchos do próprio jogador, então basta
+    sobrescrever os que interessam (ou o próprio ``decide``).
+    """
+
+    async def decide(self, decision: Decision) -> Any:
+        return await getattr(self, _METHODS[decision.kind])(decision)
+
+    async def choose_action(self, decision: Decision) -> Action:
+        return decide_with_hooks(decision)
+
+    async def choose_target(self, decision: Decision) -> "Player":
+        return decide_with_hooks(decision)
+
+    async def wants_to_challenge(self, decision: Decision) -> bool:
+        return decide_with_hooks(decision)
+
+    async def wants_to_block(self, decision: Decision) -> bool:
+        return decide_with_hooks(decision)
+
+    async def choose_blocking_character(self, decision: Decision) -> str:
+        return decide_with_hooks(decision)
+
+    async def choose_influence_to_lose(self, decision: Decision) -> str:
+        return decide_with_hooks(decision)
+
+
+_METHODS = {
+    ACTION: "choose_action",
+    TARGET: "choose_target",
+    CHALLENGE: "wants_to_challenge",
+    BLOCK: "wants_to_block",
+    BLOCKING_CHARACTER: "choose_blocking_character",
+    LOSE_INFLUENCE: "choose_influence_to_lose",
+}
+
+
+class PendingDecisions(DecisionProvider):
+    """Decisões de jogadores remotos que chegam de fora, via ``answer``.
+
+    As decisões dos jogadores em ``remote`` ficam pendentes num futuro do
+    asyncio até alguém chamar ``answer``; os demais usam os próprios
+    ganchos. Uma instância pode servir várias mesas ao mesmo tempo.
+    """
+
+    def __init__(self, remote: Sequence["Player"] = ()):
+        self._remote = set(map(id, remote))
+        self._waiting: Dict[int, tuple] = {}
+
+    def add_remote(self, player: "Player") -> None:
+        self._remote.add(id(player))
+
+    async def decide(self, decision: Decision) -> Any:
+        key = id(decision.player)
+        if key not in self._remote:
+            return decide_with_hooks(decision)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[key] = (decision, future)
+        try:
+            return decision.validate(await future)
+        finally:
+            self._waiting.pop(key, None)
+
+    def pending(self, player: "Player") -> Optional[Decision]:
+        """Decisão que ``player`` ainda precisa responder, se houver."""
+        entry = self._waiting.get(id(player))
+        return entry[0] if entry is not None else None
+
+    @property
+    def waiting(self) -> int:
+        """Quantas decisões estão pendentes agora."""
+        return len(self._waiting)
+
+    def answer(self, player: "Player", value: Any) -> bool:
+        """Entrega a resposta de ``player``; ``False`` se não havia pedido."""
+        entry = self._waiting.get(id(player))
+        if entry is None or entry[1].done():
+            return False
+        entry[1].set_result(value)
+        return True
+
+
+# --- Demonstração: muitas mesas esperando humanos simulados -------------------
+async def _run_tables(tables: int, think_ms: float, seed: int) -> Dict:
+    from Deck import Deck
+    from game_manager import GameManager
+    from player import AIPlayer
+
+    random.seed(seed)
+    provider = PendingDecisions()
+    turns = 0
+    peak = 0
+
+    async def human(game: GameManager, me: "Player") -> None:
+        nonlocal peak
+        # Responde como um humano lento, com um atraso aleatório
+        while not game.is_game_over:
+            decision = provider.pending(me)
+            if decision is None:
+                await asyncio.sleep(think_ms / 1e3)
+                continue
+            peak = max(peak, provider.waiting)
+            await asyncio.sleep(random.random() * think_ms / 1e3)
+            provider.answer(me, random.choice(list(decision.options)))
+
+    async def table(i: int) -> None:
+        nonlocal turns
+        me = AIPlayer(f"Humano {i}")
+        game = GameManager([me] + [AIPlayer(f"Bot {j}") for j in range(3)],
+                           state_file=None, deck=Deck(None))
+        provider.add_remote(me)
+        answering = asyncio.create_task(human(game, me))
+        played = 0
+        while not game.is_game_over and played < 1000:
+            await game.play_turn_async(provider)
+            played += 1
+        turns += played
+        answering.cancel()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(table(i) for i in range(tables)))
+    elapsed = time.perf_counter() - start
+    return {"tables": tables, "turns": turns, "elapsed_s": elapsed,
+            "turns_per_s": turns / elapsed, "peak_waiting": peak}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Mesas intercaladas esperando humanos simulados.")
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--think-ms", type=float, default=20.0,
+                        help="atraso máximo de cada resposta humana")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = asyncio.run(_run_tables(args.tables, args.think_ms, args.seed))
+    print(f"Mesas: {report['tables']} num só processo")
+    print(f"Turnos: {report['turns']} em {report['elapsed_s']:.2f}s ({report['turns_per_s']:.0f}/s)")
+    print(f"Pico de decisões humanas pendentes: {report['peak_waiting']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Execução do GameManager numa thread própria, fora do laço de frames.
+
+A interface não chama mais ``play_turn`` diretamente: ela conversa com o
+``GameDriver`` por duas filas thread-safe.
+
+- ``events``: o que a thread do jogo publica (estado novo, resultado de
+  turno, pedido de decisão do humano, fim de jogo, erro);
+- ``commands``: as respostas da interface aos pedidos de decisão, cada
+  uma marcada com o ``id`` do ``Prompt`` que responde.
+
+Os turnos das IAs, as decisões do humano (``QueuedHumanPlayer``, que
+espera a resposta na fila em vez de chamar ``input()``) e a gravação do
+estado acontecem todos na thread do jogo, então o laço de frames nunca
+bloqueia.
+"""
+import itertools
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from action import Action
+from decisions import ACTION, TARGET, CHALLENGE, BLOCK, BLOCKING_CHARACTER, LOSE_INFLUENCE
+from game_manager import GameManager
+from player import HumanPlayer, Player
+from views import table_view
+
+# Tipos de evento publicados em ``GameDriver.events``
+STATE = "state"          # payload: visão do estado (ver ``GameDriver.state``)
+TURN = "turn"            # payload: texto do resultado do turno
+PROMPT = "prompt"        # payload: Prompt
+GAME_OVER = "game_over"  # payload: nome do vencedor (ou None)
+ERROR = "error"          # payload: exceção que encerrou a thread do jogo
+
+
+class DriverStopped(Exception):
+    """A thread do jogo foi parada enquanto esperava uma decisão."""
+
+
+class DriverEvent:
+    __slots__ = ("kind", "payload")
+
+    def __init__(self, kind: str, payload: Any = None):
+        self.kind = kind
+        self.payload = payload
+
+    def __repr__(self) -> str:
+        return f"DriverEvent({self.kind!r}, {self.payload!r})"
+
+
+class Prompt:
+    """Pedido de decisão para um jogador humano.
+
+    ``options`` são os valores aceitos como resposta; ``default`` é usado
+    se a resposta enviada não estiver entre eles. ``id`` é atribuído pelo
+    ``GameDriver`` ao publicar o pedido e acompanha a resposta.
+    """
+
+    __slots__ = ("id", "player", "kind", "options", "default")
+
+    def __init__(self, player: str, kind: str, options: Sequence, default: Any = None):
+        self.id = 0
+        self.player = player
+        self.kind = kind
+        self.options = tuple(options)
+        self.default = default
+
+    def __repr__(self) -> str:
+        return f"Prompt(#{self.id}, {self.player!r}, {self.kind!r}, {len(self.options)} opções)"
+
+
+_STOP = object()
+
+
+class QueuedHumanPlayer(HumanPlayer):
+    """Humano cujas decisões chegam pela fila de comandos do ``GameDriver``."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._driver: Optional["GameDriver"] = None
+
+    def _ask(self, kind: str, options: Sequence, default: Any = None) -> Any:
+        if self._driver is None:
+            raise RuntimeError(f"{self.name} não está ligado a um GameDriver")
+        return self._driver.ask(Prompt(self.name, kind, options, default))
+
+    def choose_action(self, available_actions: list, players: list) -> Action:
+        return self._ask(ACTION, available_actions, available_actions[0])
+
+    def choose_target(self, valid_targets: List[Player]) -> Player:
+        return self._ask(TARGET, valid_targets, valid_targets[0])
+
+    def wants_to_challenge(self, action=None, actor=None, target=None, players=None) -> bool:
+        return self._ask(CHALLENGE, (True, False), False)
+
+    def wants_to_block(self, action=None, actor=None, target=None, players=None) -> bool:
+        return self._ask(BLOCK, (True, False), False)
+
+    def choose_blocking_character(self, action: Action) -> str:
+        return self._ask(BLOCKING_CHARACTER, action.blockable_by, super().choose_blocking_character(action))
+
+    def choose_influence_to_lose(self, options: Sequence[str]) -> str:
+        return self._ask(LOSE_INFLUENCE, options, options[-1])
+
+    def to_dict(self) -> Dict:
+        data = super().to_dict()
+        data["type"] = HumanPlayer.__name__  # ao recarregar continua sendo um humano
+        return data
+
+
+class GameDriver:
+    """Roda os turnos de um ``GameManager`` numa thread daemon.
+
+    Args:
+        game_manager: Partida a conduzir. Os ``QueuedHumanPlayer`` da mesa
+            são ligados a este driver.
+        turn_delay: Pausa, em segundos, depois de cada turno de IA (para
+            a interface conseguir mostrar as jogadas).
+        notify: Chamado (na thread do jogo) depois de cada evento
+            publicado; a interface pode usá-lo para acordar o laço de frames.
+    """
+
+    def __init__(
+        self,
+        game_manager: GameManager,
+        turn_delay: float = 0.0,
+        notify: Optional[Callable[[], None]] = None,
+    ):
+        self._game = game_manager
+        self._turn_delay = turn_delay
+        self._notify = notify
+        self.commands: "queue.Queue[Any]" = queue.Queue()
+        self.events: "queue.Queue[DriverEvent]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._pending: Optional[Prompt] = None
+        self._prompt_ids = itertools.count(1)
+        self._state: Dict = {}
+        for player in game_manager.players:
+            if isinstance(player, QueuedHumanPlayer):
+                player._driver = self
+        self.publish_state()
+
+    # --- Interface (thread da UI) -----------------------------------------
+    @property
+    def game_manager(self) -> GameManager:
+        return self._game
+
+    @property
+    def state(self) -> Dict:
+        """Última visão publicada (substituída inteira a cada turno)."""
+        return self._state
+
+    @property
+    def pending_prompt(self) -> Optional[Prompt]:
+        """Decisão que a thread do jogo está esperando, se houver."""
+        return self._pending
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="coup-game", daemon=True)
+        self._thread.start()
+
+    def answer(self, prompt_id: int, value: Any) -> None:
+        """Responde o pedido de decisão ``prompt_id``.
+
+        Respostas a pedidos que já não estão pendentes (um clique repetido
+        antes de ``pending_prompt`` mudar, por exemplo) são descartadas.
+        """
+        self.commands.put((prompt_id, value))
+
+    def poll_events(self) -> List[DriverEvent]:
+        """Todos os eventos disponíveis, sem bloquear."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        """Para a thread do jogo (mesmo que esteja esperando uma decisão).
+
+        Quem grava o pendente é a própria thread do jogo ao sair; se ela
+        não terminar em ``timeout``, a interface não mexe no jogo (que
+        ainda pode estar no meio de um turno) e a gravação fica para ela.
+        """
+        self._stopping.set()
+        self.commands.put(_STOP)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return
+        self._game.flush()
+
+    # --- Thread do jogo ---------------------------------------------------
+    def publish_state(self) -> None:
+        """Monta a visão do estado atual e a publica como evento ``STATE``."""
+        self._state = table_view(self._game)
+        self._emit(STATE, self._state)
+
+    def ask(self, prompt: Prompt) -> Any:
+        """Publica ``prompt`` e bloqueia até a resposta dele chegar em ``commands``."""
+        prompt.id = next(self._prompt_ids)
+        self._pending = prompt
+        self._emit(PROMPT, prompt)
+        try:
+            while True:
+                command = self.commands.get()
+                if command is _STOP or self._stopping.is_set():
+                    raise DriverStopped()
+                prompt_id, value = command
+                if prompt_id == prompt.id:
+                    break
+        finally:
+            self._pending = None
+        if value not in prompt.options:
+            return prompt.default
+        return value
+
+    def _emit(self, kind: str, payload: Any = None) -> None:
+        self.events.put(DriverEvent(kind, payload))
+        if self._notify is not None:
+            self._notify()
+
+    def _run(self) -> None:
+        game = self._game
+        try:
+            while not self._stopping.is_set() and not game.is_game_over:
+                human = isinstance(game.current_player, QueuedHumanPlayer)
+                result = game.play_turn()
+                self._emit(TURN, game.describe(result))
+                self.publish_state()
+                if not human and self._turn_delay > 0:
+                    self._stopping.wait(self._turn_delay)
+            if game.is_game_over:
+                winner = game.winner
+                self._emit(GAME_OVER, winner.name if winner is not None else None)
+        except DriverStopped:
+            pass
+        except Exception as exc:  # a interface decide como mostrar o erro
+            self._emit(ERROR, exc)
+        finally:
+            # Um turno interrompido (``DriverStopped``) não chega a salvar;
+            # o escritor só tem a cópia tirada no fim do último turno completo.
+            game.flush()
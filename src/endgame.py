@@ -0,0 +1,384 @@
+"""Tabela de finais (tablebase) para partidas de dois jogadores.
+
+Enumera todos os estados com dois jogadores vivos (mãos de uma ou duas
+cartas, moedas de 0 a ``MAX_COINS`` e a vez) e resolve o jogo com
+informação perfeita sob as regras de ``action.py``: as jogadas são
+executadas pelas próprias ``Action.execute``, e o turno segue o do
+``GameManager`` (desafio, depois bloqueio, depois a ação; quem perde uma
+influência escolhe a carta). Cada estado guarda o valor (vitória/derrota
+em N turnos ou empate) e o valor de cada ação, então a política é o
+máximo do registro.
+
+Moedas acima de ``MAX_COINS`` contam como ``MAX_COINS`` (a partir de 7 o
+Coup já está disponível).
+
+Geração: os estados se dividem em unidades (o par de mãos, nas duas
+ordens) e em camadas pelo total de cartas. Perder uma carta leva a uma
+camada de baixo, então as unidades de uma camada são independentes e
+rodam em paralelo. Cada unidade pronta vira um arquivo num diretório de
+partes; interrompida, a geração recomeça de onde parou. A tabela final é
+gravada de forma atômica.
+
+Formato (little-endian): cabeçalho com a versão do formato e um resumo
+das regras (``rules_digest``: custos, requisitos, bloqueios e o código de
+cada ``execute``), seguido de um registro de tamanho fixo por estado.
+``Tablebase`` abre o arquivo via ``mmap`` e recusa tabelas de outras
+regras; cada consulta é O(1).
+
+Uso:
+    python -m src.endgame --output data/endgame.tb --workers 4
+    python -m src.simulate --games 20000 --beliefs 1 --endgame data/endgame.tb
+"""
+import argparse
+import hashlib
+import inspect
+import mmap
+import os
+import shutil
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations_with_replacement
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cards import CHARACTERS, SHIFT, names, pack
+from moves import ACTIONS, NUM_ACTIONS, available_actions
+from persistence import atomic_write_bytes
+from player import Player
+
+MAGIC = b"CPTB"
+FORMAT_VERSION = 1
+# Mude quando o fluxo do turno (fora de ``action.py``) mudar
+RULES_REVISION = 1
+MAX_COINS = 12
+
+# Todas as mãos de uma ou duas cartas, empacotadas (``cards.py``)
+HANDS: Tuple[int, ...] = tuple(
+    pack(hand) for size in (1, 2) for hand in combinations_with_replacement(range(len(CHARACTERS)), size)
+)
+HAND_INDEX: Dict[int, int] = {hand: i for i, hand in enumerate(HANDS)}
+_SIZES = tuple(len(names(hand)) for hand in HANDS)
+_COINS = MAX_COINS + 1
+NUM_STATES = len(HANDS) ** 2 * _COINS ** 2
+
+# Pontuação do ponto de vista de quem joga: WIN - n é vitória em n turnos,
+# n - WIN derrota em n turnos, 0 empate (ninguém consegue forçar o fim)
+WIN = 1000
+NO_MOVE = -32768
+
+# magic, versão, máximo de moedas, nº de mãos, nº de estados, resumo das regras
+HEADER = struct.Struct("<4sHHII16s")
+# valor, melhor ação, valor de cada ação (``NO_MOVE`` se não puder pagá-la)
+RECORD = struct.Struct(f"<hB{NUM_ACTIONS}h")
+
+
+def rules_digest() -> bytes:
+    """Resumo das regras que a tabela pressupõe."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((RULES_REVISION, MAX_COINS, CHARACTERS)).encode())
+    for action in ACTIONS:
+        h.update(repr((
+            type(action).__name__, action.cost, action.requirement,
+            tuple(action.blockable_by), action.needs_target,
+        )).encode())
+        h.update(inspect.getsource(type(action).execute).encode())
+    return h.digest()
+
+
+def state_index(mine: int, theirs: int, my_coins: int, their_coins: int) -> int:
+    """Índice do estado (mãos empacotadas, moedas), do ponto de vista de quem joga."""
+    return (((HAND_INDEX[mine] * len(HANDS) + HAND_INDEX[theirs]) * _COINS
+             + min(my_coins, MAX_COINS)) * _COINS + min(their_coins, MAX_COINS))
+
+
+# --- Regras: árvore de respostas de uma jogada ---------------------------------
+# Uma folha é o índice do estado seguinte (vez do oponente) ou _WIN/_LOSS;
+# um nó é (_MIN, filhos) quando o oponente escolhe e (_MAX, filhos) quando
+# quem joga escolhe.
+_MIN, _MAX = 0, 1
+_WIN, _LOSS = -1, -2
+Node = Union[int, Tuple[int, tuple]]
+
+_me, _them = Player("eu"), Player("oponente")
+
+
+def _losses(hand: int) -> List[int]:
+    """Mãos possíveis depois de perder uma influência (quem perde escolhe)."""
+    return [hand - (1 << SHIFT[c]) for c in dict.fromkeys(names(hand))]
+
+
+def _choice(op: int, children: List[Node]) -> Node:
+    return children[0] if len(children) == 1 else (op, tuple(children))
+
+
+def _perform(mine: int, theirs: int, my_coins: int, their_coins: int, action) -> Node:
+    _me._hand, _me._coins, _me._alive = mine, my_coins, True
+    _them._hand, _them._coins, _them._alive = theirs, their_coins, True
+    _me.perform_action(action, _them if action.needs_target else None, None)
+    my_coins, their_coins = _me.coins, _them.coins
+    if _them.hand != theirs:
+        return _choice(_MIN, [
+            _WIN if t == 0 else state_index(t, mine, their_coins, my_coins) for t in _losses(theirs)
+        ])
+    return state_index(theirs, mine, their_coins, my_coins)
+
+
+def _block(mine: int, theirs: int, my_coins: int, their_coins: int, action) -> Node:
+    done = _perform(mine, theirs, my_coins, their_coins, action)
+    if theirs & action.block_mask:
+        # Bloqueado, a ação não acontece nem é paga
+        return (_MIN, (done, state_index(theirs, mine, their_coins, my_coins)))
+    return done
+
+
+def move_tree(mine: int, theirs: int, my_coins: int, their_coins: int, action) -> Node:
+    """Respostas possíveis a ``action``, na ordem do turno do ``GameManager``."""
+    if not action.requirement:
+        return _block(mine, theirs, my_coins, their_coins, action)
+    unchallenged = _block(mine, theirs, my_coins, their_coins, action)
+    if mine >> SHIFT[action.requirement] & 15:
+        # Desafio perdido: o oponente perde uma carta e a jogada segue
+        challenged = _choice(_MIN, [
+            _WIN if t == 0 else _block(mine, t, my_coins, their_coins, action) for t in _losses(theirs)
+        ])
+    else:
+        # Blefe pego: quem joga perde uma carta e a vez passa
+        challenged = _choice(_MAX, [
+            _LOSS if m == 0 else state_index(theirs, m, their_coins, my_coins) for m in _losses(mine)
+        ])
+    return (_MIN, (unchallenged, challenged))
+
+
+def _leaves(node: Node) -> Iterable[int]:
+    if isinstance(node, int):
+        if node >= 0:
+            yield node
+        return
+    for child in node[1]:
+        yield from _leaves(child)
+
+
+def _evaluate(node: Node, values: Dict[int, int]) -> int:
+    if isinstance(node, int):
+        if node >= 0:
+            v = values[node]
+            # Um turno a mais, do ponto de vista de quem joga agora
+            return 1 - v if v > 0 else (-v - 1 if v < 0 else 0)
+        return WIN - 1 if node == _WIN else 1 - WIN
+    op, children = node
+    if op == _MIN:
+        return min(_evaluate(c, values) for c in children)
+    return max(_evaluate(c, values) for c in children)
+
+
+# --- Geração -------------------------------------------------------------------
+def _unit_states(unit: Tuple[int, int]) -> List[int]:
+    a, b = unit
+    orders = [(a, b)] if a == b else [(a, b), (b, a)]
+    return [
+        ((x * len(HANDS) + y) * _COINS + mc) * _COINS + tc
+        for x, y in orders for mc in range(_COINS) for tc in range(_COINS)
+    ]
+
+
+def _unit_of(state: int) -> Tuple[int, int]:
+    pair = state // (_COINS * _COINS)
+    x, y = divmod(pair, len(HANDS))
+    return (x, y) if x <= y else (y, x)
+
+
+def _decode(state: int) -> Tuple[int, int, int, int]:
+    rest, their_coins = divmod(state, _COINS)
+    rest, my_coins = divmod(rest, _COINS)
+    x, y = divmod(rest, len(HANDS))
+    return HANDS[x], HANDS[y], my_coins, their_coins
+
+
+def _units(layer: int) -> List[Tuple[int, int]]:
+    return [(a, b) for a in range(len(HANDS)) for b in range(a, len(HANDS)) if _SIZES[a] + _SIZES[b] == layer]
+
+
+def _part_path(parts: Path, unit: Tuple[int, int]) -> Path:
+    return parts / f"{unit[0]:02d}_{unit[1]:02d}.part"
+
+
+# Valores das camadas de baixo já lidos por este processo
+_solved: Dict[int, int] = {}
+_loaded: set = set()
+
+
+def _load_unit(parts: Path, unit: Tuple[int, int]) -> None:
+    if unit in _loaded:
+        return
+    data = _part_path(parts, unit).read_bytes()
+    for pos, state in enumerate(_unit_states(unit)):
+        _solved[state] = RECORD.unpack_from(data, pos * RECORD.size)[0]
+    _loaded.add(unit)
+
+
+def _solve_unit(unit: Tuple[int, int], parts_dir: str) -> Tuple[int, int]:
+    """Resolve os estados de ``unit`` e grava o arquivo da parte."""
+    parts = Path(parts_dir)
+    states = _unit_states(unit)
+    own = set(states)
+    trees: Dict[int, List[Optional[Node]]] = {}
+    preds: Dict[int, List[int]] = {s: [] for s in states}
+    values: Dict[int, int] = {s: 0 for s in states}
+    for s in states:
+        mine, theirs, my_coins, their_coins = _decode(s)
+        affordable = available_actions(my_coins)
+        trees[s] = row = [
+            move_tree(mine, theirs, my_coins, their_coins, a) if a in affordable else None for a in ACTIONS
+        ]
+        for tree in row:
+            if tree is None:
+                continue
+            for leaf in _leaves(tree):
+                if leaf in own:
+                    preds[leaf].append(s)
+                elif leaf not in values:
+                    _load_unit(parts, _unit_of(leaf))
+                    values[leaf] = _solved[leaf]
+
+    # Iteração de valores só sobre os estados cujos sucessores mudaram; cada
+    # estado muda no máximo uma vez (de empate para o valor final)
+    frontier = set(states)
+    while frontier:
+        new = {s: max(_evaluate(t, values) for t in trees[s] if t is not None) for s in frontier}
+        changed = [s for s, v in new.items() if v != values[s]]
+        values.update(new)
+        frontier = {p for s in changed for p in preds[s]}
+
+    out = bytearray()
+    for s in states:
+        q = [NO_MOVE if t is None else _evaluate(t, values) for t in trees[s]]
+        best = max(range(NUM_ACTIONS), key=q.__getitem__)
+        out += RECORD.pack(q[best], best, *q)
+    atomic_write_bytes(str(_part_path(parts, unit)), bytes(out))
+    return unit
+
+
+def generate(path: str, workers: int = 1, keep_parts: bool = False, verbose: bool = False) -> None:
+    """Gera a tabela em ``path``, retomando as partes já resolvidas."""
+    digest = rules_digest()
+    parts = Path(f"{path}.{digest.hex()[:8]}.parts")
+    parts.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    for layer in (2, 3, 4):
+        pending = [u for u in _units(layer) if not _part_path(parts, u).exists()]
+        if verbose:
+            print(f"Camada de {layer} cartas: {len(pending)} unidade(s) pendente(s)", flush=True)
+        if workers <= 1:
+            for unit in pending:
+                _solve_unit(unit, str(parts))
+        elif pending:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_solve_unit, pending, [str(parts)] * len(pending)))
+
+    records = bytearray(RECORD.size * NUM_STATES)
+    for layer in (2, 3, 4):
+        for unit in _units(layer):
+            data = _part_path(parts, unit).read_bytes()
+            for pos, state in enumerate(_unit_states(unit)):
+                records[state * RECORD.size:(state + 1) * RECORD.size] = data[pos * RECORD.size:(pos + 1) * RECORD.size]
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, MAX_COINS, len(HANDS), NUM_STATES, digest)
+    atomic_write_bytes(path, header + bytes(records))
+    if not keep_parts:
+        shutil.rmtree(parts)
+    if verbose:
+        print(f"{NUM_STATES} estados em {time.perf_counter() - start:.1f}s -> {path}")
+
+
+# --- Consulta ------------------------------------------------------------------
+class Tablebase:
+    """Tabela gerada por ``generate``, aberta via ``mmap``.
+
+    Use ``close`` (ou ``with``) para soltar o arquivo.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Tabela de finais vazia: {path}")
+        magic, version, max_coins, hands, states, digest = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Arquivo não é uma tabela de finais do Coup: {path}")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Versão de tabela de finais não suportada: {version}")
+        if digest != rules_digest() or (max_coins, hands, states) != (MAX_COINS, len(HANDS), NUM_STATES):
+            self.close()
+            raise ValueError(f"Tabela de finais gerada para outras regras: {path}")
+
+    def __enter__(self) -> "Tablebase":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def record(self, mine: int, theirs: int, my_coins: int, their_coins: int) -> Tuple[int, ...]:
+        """(valor, melhor ação, valor de cada ação) do estado, em O(1)."""
+        offset = HEADER.size + RECORD.size * state_index(mine, theirs, my_coins, their_coins)
+        return RECORD.unpack_from(self._map, offset)
+
+    def value(self, mine: int, theirs: int, my_coins: int, their_coins: int) -> int:
+        """``WIN - n``: vitória em n turnos; ``n - WIN``: derrota; 0: empate."""
+        return self.record(mine, theirs, my_coins, their_coins)[0]
+
+    def best_action(self, mine: int, theirs: int, my_coins: int, their_coins: int) -> int:
+        """Índice em ``moves.ACTIONS`` da melhor ação conhecendo as duas mãos."""
+        return self.record(mine, theirs, my_coins, their_coins)[1]
+
+    def choose(
+        self, mine: int, opponent_hands: Sequence[Tuple[int, float]], my_coins: int, their_coins: int
+    ) -> Optional[int]:
+        """Ação de maior valor esperado sobre as mãos possíveis do oponente.
+
+        ``opponent_hands`` são pares (mão empacotada, probabilidade), como os
+        de ``beliefs.hand_distribution``. Devolve ``None`` se não há mãos.
+        """
+        totals = [0.0] * NUM_ACTIONS
+        seen = False
+        for theirs, weight in opponent_hands:
+            if weight <= 0.0:
+                continue
+            seen = True
+            q = self.record(mine, theirs, my_coins, their_coins)[2:]
+            for a in range(NUM_ACTIONS):
+                totals[a] = -1e18 if q[a] == NO_MOVE else totals[a] + weight * q[a]
+        if not seen:
+            return None
+        return max(range(NUM_ACTIONS), key=totals.__getitem__)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera a tabela de finais de dois jogadores.")
+    parser.add_argument("--output", default="data/endgame.tb")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--keep-parts", action="store_true", help="mantém os arquivos das unidades")
+    args = parser.parse_args(argv)
+    generate(args.output, args.workers, args.keep_parts, verbose=True)
+    with Tablebase(args.output) as table:
+        counts = {"vitória": 0, "derrota": 0, "empate": 0}
+        for state in range(NUM_STATES):
+            v = table.record(*_decode(state))[0]
+            counts["vitória" if v > 0 else "derrota" if v < 0 else "empate"] += 1
+    print("Quem joga: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Eventos públicos da partida, para observadores inscritos no ``GameManager``.
+
+Um observador (``GameListener``) é inscrito com ``GameManager.subscribe`` e
+recebe só o que todos na mesa veem: personagens declarados (em ações ou
+bloqueios), o resultado dos desafios, as cartas viradas e as trocas do
+Embaixador. Sem observadores o turno não monta nem entrega evento algum.
+
+As jogadas de busca (``make_*``) e as cópias de ``GameManager.clone`` não
+avisam ninguém, para que simulações não contaminem o estado dos
+observadores da partida real.
+"""
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from game_manager import GameManager
+    from player import Player
+
+
+class GameListener:
+    """Observador dos eventos da partida; os métodos padrão não fazem nada."""
+
+    __slots__ = ()
+
+    def on_attach(self, game: "GameManager") -> None:
+        """Inscrito em ``game`` ou a partida foi recarregada de um arquivo."""
+
+    def on_claim(self, player: "Player", character: str) -> None:
+        """``player`` declarou ``character`` (ação não desafiada ou bloqueio)."""
+
+    def on_challenge(self, player: "Player", character: str, truthful: bool) -> None:
+        """A declaração de ``character`` por ``player`` foi desafiada.
+
+        ``truthful`` diz se ele realmente tinha o personagem.
+        """
+
+    def on_reveal(self, player: "Player", character: str) -> None:
+        """``player`` perdeu uma influência e virou ``character``."""
+
+    def on_exchange(self, player: "Player") -> None:
+        """``player`` trocou cartas com o baralho (Embaixador)."""
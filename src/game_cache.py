@@ -0,0 +1,262 @@
+"""Cache de partidas em memória com orçamento em bytes.
+
+Num servidor, a maior parte das mesas passa o tempo esperando um humano,
+mas cada uma mantém em memória o ``GameManager``, os jogadores, o baralho
+e o histórico inteiro. O ``GameCache`` guarda essas partidas até um
+orçamento de bytes; acima dele, despeja as partidas paradas há mais tempo
+para snapshots binários em disco (``snapshot.write_game``) e as recarrega
+quando a próxima decisão chega.
+
+Só uma partida *estacionada* (``park``) pode ser despejada: é o dono da
+mesa quem sabe quando o estado em memória é todo o estado da partida (no
+servidor, no começo do turno, esperando a ação de um humano). E só depois
+de ficar parada ``min_idle`` segundos: quem responde rápido nunca vai
+para o disco. Os despejos saem de uma varredura periódica (a cada
+``sweep_interval`` segundos enquanto o total passar do orçamento), e a
+codificação e a gravação rodam no executor, fora do laço de eventos.
+
+O orçamento é *flexível*: partidas em andamento ou paradas há pouco
+tempo nunca são despejadas, então o total pode passar dele; ``stats``
+mostra o pico e quanto ele passou do orçamento, além de acertos,
+recargas, despejos e a latência das recargas.
+"""
+import asyncio
+import collections
+import sys
+import time
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, Optional
+
+from snapshot import write_game
+
+if TYPE_CHECKING:
+    from game_manager import GameManager
+
+# Bytes por entrada do histórico além da própria string (ponteiro da lista)
+_POINTER = 8
+
+
+def estimate_size(game: "GameManager") -> int:
+    """Bytes aproximados de uma partida em memória.
+
+    Percorre jogadores, baralho e histórico com ``sys.getsizeof``; as
+    métricas e as chaves de Zobrist dos assentos (compartilhadas entre
+    mesas) não entram na conta.
+    """
+    return deep_size(game, skip=(game.metrics, *(p._zkeys for p in game.players)))
+
+
+def deep_size(root: object, skip: Iterable[object] = ()) -> int:
+    """Soma de ``sys.getsizeof`` de ``root`` e de tudo que ele alcança."""
+    skip = {id(obj) for obj in skip}
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in skip or isinstance(obj, (type, type(sys), type(estimate_size))):
+            continue
+        skip.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+    return total
+
+
+class _Entry:
+    __slots__ = ("game", "on_evict", "size", "history_seen")
+
+    def __init__(self, game: "GameManager", on_evict: Callable[[str], None], size: Optional[int] = None):
+        self.game = game
+        self.on_evict = on_evict
+        self.size = estimate_size(game) if size is None else size
+        self.history_seen = len(game.history)
+
+
+class GameCache:
+    """Partidas residentes com orçamento de memória e despejo LRU.
+
+    Args:
+        budget_bytes: Memória (estimada) das partidas residentes acima da
+            qual a varredura despeja partidas ociosas (orçamento flexível).
+        path: Caminho do snapshot de cada chave.
+        load: Recria a partida a partir do caminho do snapshot.
+        min_idle: Segundos que uma partida precisa ficar estacionada antes
+            de poder ser despejada.
+        sweep_interval: Segundos entre varreduras enquanto o total passar
+            do orçamento.
+    """
+
+    def __init__(self, budget_bytes: int, path: Callable[[str], str],
+                 load: Callable[[str], "GameManager"], min_idle: float = 1.0,
+                 sweep_interval: float = 0.25):
+        self._budget = budget_bytes
+        self._path = path
+        self._load = load
+        self._min_idle = min_idle
+        self._sweep_interval = sweep_interval
+        self._sweep_handle: Optional[asyncio.TimerHandle] = None
+        self._entries: Dict[str, _Entry] = {}
+        # Estacionadas (podem ser despejadas) -> instante em que pararam, da mais antiga à mais recente
+        self._parked: "collections.OrderedDict[str, float]" = collections.OrderedDict()
+        self._writes: Dict[str, asyncio.Future] = {}
+        # Tamanho estimado das despejadas, reaproveitado na recarga
+        self._evicted_sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._peak_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rehydrate: Deque[float] = collections.deque(maxlen=4096)
+        self._rehydrate_max = 0.0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._bytes
+
+    def add(self, key: str, game: "GameManager", on_evict: Callable[[str], None],
+            size: Optional[int] = None) -> None:
+        """Passa a controlar ``game``; ``on_evict(key)`` avisa o dono do despejo.
+
+        ``size`` evita percorrer a partida quando o tamanho já é conhecido.
+        """
+        self.remove(key)
+        entry = self._entries[key] = _Entry(game, on_evict, size)
+        self._grow(entry.size)
+
+    def touch(self, key: str) -> None:
+        """A partida andou: atualiza o tamanho estimado e a tira da fila de despejo."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        self._parked.pop(key, None)
+        history = entry.game.history
+        grown = sum(sys.getsizeof(line) + _POINTER for line in history[entry.history_seen:])
+        entry.history_seen = len(history)
+        entry.size += grown
+        self._grow(grown)
+
+    def park(self, key: str) -> None:
+        """A partida parou num ponto seguro e pode ser despejada depois de ``min_idle``."""
+        if key in self._entries:
+            self._parked[key] = time.monotonic()
+            self._parked.move_to_end(key)
+            self._schedule_sweep()
+
+    def unpark(self, key: str) -> None:
+        self._parked.pop(key, None)
+
+    def wake(self, key: str) -> bool:
+        """Chegou a decisão que a partida esperava.
+
+        ``True`` (acerto) se ela ainda está em memória; senão é preciso
+        recarregá-la com ``load``.
+        """
+        if key in self._entries:
+            self._parked.pop(key, None)
+            self._hits += 1
+            return True
+        return False
+
+    async def load(self, key: str, on_evict: Callable[[str], None]) -> "GameManager":
+        """Recarrega uma partida despejada (esperando a gravação, se ainda estiver em curso)."""
+        start = time.perf_counter()
+        pending = self._writes.get(key)
+        if pending is not None:
+            await pending
+        game = self._load(self._path(key))
+        self.add(key, game, on_evict, self._evicted_sizes.pop(key, None))
+        elapsed = time.perf_counter() - start
+        self._misses += 1
+        self._rehydrate.append(elapsed)
+        self._rehydrate_max = max(self._rehydrate_max, elapsed)
+        return game
+
+    def remove(self, key: str) -> None:
+        """Esquece a partida (terminou ou foi gravada por outro caminho)."""
+        self._evicted_sizes.pop(key, None)
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._parked.pop(key, None)
+            self._bytes -= entry.size
+
+    def close(self) -> None:
+        """Cancela a varredura agendada."""
+        if self._sweep_handle is not None:
+            self._sweep_handle.cancel()
+            self._sweep_handle = None
+
+    def _grow(self, size: int) -> None:
+        self._bytes += size
+        self._peak_bytes = max(self._peak_bytes, self._bytes)
+        self._schedule_sweep()
+
+    def _schedule_sweep(self) -> None:
+        if self._sweep_handle is None and self._parked and self._bytes > self._budget:
+            loop = asyncio.get_running_loop()
+            self._sweep_handle = loop.call_later(self._sweep_interval, self.sweep)
+
+    def sweep(self) -> int:
+        """Despeja partidas ociosas enquanto o total passar do orçamento.
+
+        Só entram as estacionadas há ``min_idle`` segundos, das paradas há
+        mais tempo para as mais recentes. Devolve quantas foram despejadas.
+        """
+        self._sweep_handle = None
+        idle_since = time.monotonic() - self._min_idle
+        parked = self._parked
+        evicted = 0
+        while self._bytes > self._budget and parked:
+            key, since = next(iter(parked.items()))
+            if since > idle_since:
+                break  # as seguintes pararam depois
+            del parked[key]
+            self._evict(key)
+            evicted += 1
+        self._schedule_sweep()
+        return evicted
+
+    def _evict(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        self._evicted_sizes[key] = entry.size
+        self._evictions += 1
+        # O dono larga a partida em ``on_evict``, então ninguém mais a altera:
+        # codificar e gravar podem ir juntos para o executor
+        write = asyncio.get_running_loop().run_in_executor(None, write_game, entry.game, self._path(key))
+        self._writes[key] = write
+        write.add_done_callback(lambda done: self._writes.pop(key, None) if self._writes.get(key) is done else None)
+        entry.on_evict(key)
+
+    def stats(self) -> Dict:
+        samples = sorted(self._rehydrate)
+        lookups = self._hits + self._misses
+        return {
+            "resident": len(self._entries),
+            "parked": len(self._parked),
+            "resident_bytes": self._bytes,
+            "peak_bytes": self._peak_bytes,
+            "budget_bytes": self._budget,
+            "peak_over_budget_bytes": max(0, self._peak_bytes - self._budget),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "evictions": self._evictions,
+            "rehydrate_ms_mean": sum(samples) / len(samples) * 1e3 if samples else 0.0,
+            "rehydrate_ms_p99": samples[min(len(samples) - 1, int(0.99 * len(samples)))] * 1e3 if samples else 0.0,
+            "rehydrate_ms_max": self._rehydrate_max * 1e3,
+        }
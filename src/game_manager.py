@@ -1,68 +1,287 @@
-from action import (
-    Action,
-    IncomeAction,
-    ForeignAidAction,
-    CoupAction,
-    AssassinateAction,
-    TaxAction,
-    StealAction,
-    ExchangeAction,
-    Challenge,
-    Block,
-)
-from player import Player, HumanPlayer, AIPlayer
+from action import Action, Challenge, Block
+from player import Player
 
-from typing import List, Optional
+from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple, Union
+import copy
 import json
 from pathlib import Path
-from Deck import Deck
+from cards import card_character
+from Deck import Deck, piles_to_dict
+from events import GameListener
+from persistence import FlushPolicy, StateWriter, encode_json
+from journal import GameJournal
+from snapshot import SnapshotReader, write_game
+from moves import available_actions, legal_move_mask
+from outcomes import NO_BLOCK, NO_CHALLENGE, NO_TARGET, Outcome, OutcomeKind, line_text
+from metrics import TurnClock, TurnMetrics
+from zobrist import turn_key
+from decisions import (
+    ACTION, TARGET, CHALLENGE, BLOCK, BLOCKING_CHARACTER, LOSE_INFLUENCE, YES_NO,
+    Decision, DecisionProvider,
+)
+
+
+def _encode_state(state: Dict) -> str:
+    """JSON de uma cópia de ``GameManager._state_dict`` (roda na thread do escritor)."""
+    names = [p["name"] for p in state["players"]]
+    return encode_json(dict(
+        state,
+        history=[line_text(line, names) for line in state["history"]],
+        deck=piles_to_dict(*state["deck"]),
+    ))
 
 
 class GameManager:
-    def __init__(self, players: List[Player], state_file: str = "data/estado_jogo.json", load_existing: bool = False):
+    def __init__(
+        self,
+        players: List[Player],
+        state_file: Optional[str] = "data/estado_jogo.json",
+        load_existing: bool = False,
+        deck: Optional[Deck] = None,
+        flush_policy: Optional[FlushPolicy] = None,
+        journal: bool = False,
+        snapshot_every: int = 50,
+        metrics: Optional[TurnMetrics] = None,
+        listeners: Sequence[GameListener] = (),
+    ):
+        """
+        Args:
+            players: Jogadores da mesa, na ordem dos turnos.
+            state_file: Arquivo de estado do jogo. Com ``None`` nada é
+                gravado em disco (útil para simulações sem interface).
+            load_existing: Carrega o estado salvo em ``state_file``.
+            deck: Baralho a usar; por padrão cria um ``Deck()`` persistido.
+            flush_policy: Grava estado e baralho em segundo plano segundo
+                esta política; com ``None`` cada gravação é síncrona.
+            journal: Em vez de regravar o estado inteiro a cada turno,
+                acrescenta um registro por turno (com os deltas do
+                baralho) a um diário ao lado de ``state_file`` e grava
+                snapshots completos periodicamente.
+            snapshot_every: Turnos entre snapshots no modo diário.
+            metrics: Coleta tempos por fase e contadores de cada turno.
+            listeners: Observadores dos eventos públicos da partida
+                (``events.py``), como os ``BeliefTracker`` das IAs.
+        """
         self._players = players
         self._turn_index = 0
-        self._history: List[str] = []
-        self._deck = Deck()
+        self._history: List[Union[Outcome, str]] = []
+        self._metrics = metrics
+        self._listeners: List[GameListener] = []
+        self._flush_policy = flush_policy
+        self._deck = deck if deck is not None else Deck(flush_policy=flush_policy)
         self._state_file = state_file
+        self._writer: Optional[StateWriter] = None
+        if state_file is not None:
+            self._writer = StateWriter(state_file, self._state_dict, flush_policy, _encode_state)
+        self._journal: Optional[GameJournal] = None
+        self._journal_seq = 0
+        # Pilha de desfazer: (turno, tamanho do histórico, [(jogador, estado)])
+        self._undo: List[Tuple[int, int, List[Tuple[Player, tuple]]]] = []
+        if journal and state_file is not None:
+            self._journal = GameJournal(
+                str(Path(state_file).with_suffix(".journal")), snapshot_every
+            )
+            self._deck.begin_journal()
 
-        if load_existing and Path(self._state_file).exists():
+        if load_existing and state_file is not None and Path(self._state_file).exists():
             self.load_state()
         else:
+            self._bind_seats()
             for p in self._players:
                 p.coins = 2
                 drawn = self._deck.draw(2)
                 for card in drawn:
-                    p.add_character(card["character"])
-            self.save_state()
+                    p.add_character(card_character(card))
+            if self._journal is not None:
+                self._write_snapshot()
+            else:
+                self.save_state()
+        for listener in listeners:
+            self.subscribe(listener)
+
+    def play_turn(self) -> Outcome:
+        """Executa um turno completo com desafios e bloqueios.
+
+        As decisões são respondidas pelos ganchos síncronos dos jogadores;
+        para aguardá-las de um provedor assíncrono use ``play_turn_async``.
+        """
+        try:
+            next(self._turn(sync=True))
+        except StopIteration as stop:
+            return stop.value
+        raise RuntimeError("Turno síncrono pediu uma decisão externa")
+
+    async def play_turn_async(self, provider: DecisionProvider) -> Outcome:
+        """Como ``play_turn``, mas aguardando cada decisão de ``provider``.
+
+        Enquanto um jogador pensa, o laço de eventos fica livre para outras
+        mesas. Para muitas mesas por processo, use ``state_file=None`` ou
+        uma ``flush_policy``, para que a gravação não bloqueie o laço.
+        """
+        steps = self._turn(sync=False)
+        try:
+            decision = next(steps)
+            while True:
+                decision = steps.send(await provider.decide(decision))
+        except StopIteration as stop:
+            return stop.value
+
+    async def play_async(self, provider: DecisionProvider, max_turns: Optional[int] = None) -> Optional[Player]:
+        """Joga até o fim (ou ``max_turns``) e devolve o vencedor."""
+        turns = 0
+        while not self.is_game_over and (max_turns is None or turns < max_turns):
+            await self.play_turn_async(provider)
+            turns += 1
+        return self.winner
 
-    def play_turn(self) -> str:
-        """Executa um turno completo com desafios e bloqueios."""
+    # Núcleo do turno. Cada escolha é um ``Decision`` produzido pelo gerador
+    # e respondido via ``send``; com ``sync=True`` o próprio núcleo chama os
+    # ganchos do jogador e nunca suspende, sem alocar um ``Decision`` por
+    # pergunta (é o caminho quente das simulações).
+    def _turn(self, sync: bool) -> Generator[Decision, Any, Outcome]:
         player = self.current_player
-        action = player.choose_action(self.get_available_actions(player), self._players)
+        mark = self._turn_mark()
+        clock = self._metrics.start_turn(self._players) if self._metrics is not None else None
+        options = self.get_available_actions(player)
+        if sync:
+            action = player.choose_action(options, self._players)
+        else:
+            action = yield Decision(ACTION, player, options, options[0], None, None, None, self._players)
+        if clock is not None:
+            clock.lap("choose_action")
 
         target = None
-        if isinstance(action, (AssassinateAction, StealAction, CoupAction)):
-            target = self._choose_target(player)
-            if not target:
-                return "Nenhum alvo válido encontrado"
+        if action.needs_target:
+            valid_targets = [p for p in self._players if p != player and p.is_alive]
+            if not valid_targets:
+                return NO_TARGET
+            if sync:
+                target = player.choose_target(valid_targets)
+            else:
+                target = yield Decision(TARGET, player, valid_targets, valid_targets[0],
+                                        action, player, None, self._players)
+            if clock is not None:
+                clock.lap("choose_target")
 
+        challenge = None
         if action.requirement:
-            challenge_result = self._handle_challenge(player, action, target)
-            if "desafiou corretamente" in challenge_result:
-                self.next_turn()
+            challenge_result = yield from self._challenge_phase(sync, player, action, target)
+            if clock is not None:
+                clock.lap("challenge")
+            kind = challenge_result.kind
+            if kind is OutcomeKind.CHALLENGE_SUCCEEDED:
+                self._end_turn(mark, player, action, target, "succeeded", clock=clock)
                 return challenge_result
+            if kind is OutcomeKind.CHALLENGE_FAILED:
+                challenge = "failed"
 
+        block = None
         if action.blockable_by:
-            block_result = self._handle_block(player, action, target)
-            if "bloqueou a ação" in block_result:
-                self.next_turn()
+            block_result = yield from self._block_phase(sync, player, action, target)
+            if clock is not None:
+                clock.lap("block")
+            kind = block_result.kind
+            if kind is OutcomeKind.BLOCKED:
+                self._end_turn(mark, player, action, target, challenge, "blocked", clock)
                 return block_result
+            if kind is OutcomeKind.INVALID_BLOCK:
+                block = "invalid"
 
-        result = player.perform_action(action, target, self)
+        if target is None:
+            result = player.perform_action(action, target, self)
+        else:
+            hand = tuple(target.characters)
+            result = player.perform_action(action, target, self)
+            if len(target.characters) < len(hand):
+                yield from self._settle_loss(sync, target, hand)
+        if clock is not None:
+            clock.lap("perform_action")
+        if self._listeners and result is not None and result.kind is OutcomeKind.EXCHANGE:
+            for listener in self._listeners:
+                listener.on_exchange(player)
+        self._end_turn(mark, player, action, target, challenge, block, clock)
+        return result
+
+    @property
+    def metrics(self) -> Optional[TurnMetrics]:
+        return self._metrics
+
+    def _turn_mark(self) -> Optional[tuple]:
+        """Estado mínimo antes do turno, para o registro do diário (O(P))."""
+        if self._journal is None:
+            return None
+        return len(self._history), [(p.coins, len(p.characters)) for p in self._players]
+
+    def _end_turn(
+        self,
+        mark: Optional[tuple],
+        player: Player,
+        action: Action,
+        target: Optional[Player],
+        challenge: Optional[str] = None,
+        block: Optional[str] = None,
+        clock: Optional[TurnClock] = None,
+    ) -> None:
+        """Passa a vez e persiste o turno (registro no diário ou estado completo)."""
         self.next_turn()
+        if self._journal is None:
+            self.save_state()
+        else:
+            self._append_journal(mark, player, action, target, challenge, block)
+        if clock is not None:
+            clock.lap("persist")
+            clock.finish(challenge, block, sum(1 for p in self._players if p.is_alive))
+
+    def _append_journal(
+        self,
+        mark: tuple,
+        player: Player,
+        action: Action,
+        target: Optional[Player],
+        challenge: Optional[str],
+        block: Optional[str],
+    ) -> None:
+        history_len, before = mark
+        self._journal_seq += 1
+        self._journal.append({
+            "seq": self._journal_seq,
+            "action": action.__class__.__name__,
+            "actor": self._players.index(player),
+            "target": self._players.index(target) if target is not None else None,
+            "challenge": challenge,
+            "block": block,
+            # Jogadores cujas moedas ou cartas mudaram, com o valor final
+            "players": [
+                [i, p.coins, list(p.characters), list(p.revealed)]
+                for i, (p, b) in enumerate(zip(self._players, before))
+                if (p.coins, len(p.characters)) != b
+            ],
+            "history": [self.describe(line) for line in self._history[history_len:]],
+            "turn_index": self._turn_index,
+            "deck": self._deck.take_deltas(),
+        })
+        if self._journal.snapshot_due:
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        """Grava o estado completo de forma síncrona e compacta o diário."""
         self.save_state()
-        return result
+        self._deck.checkpoint()
+        self.flush()
+        self._journal.compact()
+
+    def _apply_record(self, record: Dict) -> None:
+        """Reaplica um registro do diário sobre o estado carregado."""
+        for seat, coins, characters, *revealed in record["players"]:
+            p = self._players[seat]
+            p._coins = coins
+            # Registros antigos não trazem as cartas viradas
+            p.set_cards(characters, revealed[0] if revealed else p.revealed)
+            p._alive = bool(characters)
+        self._deck.apply_deltas(record.get("deck", ()))
+        self._history.extend(record["history"])
+        self._turn_index = record["turn_index"]
+        self._journal_seq = record["seq"]
 
     @property
     def current_player(self) -> Player:
@@ -73,9 +292,29 @@ class GameManager:
         return self._players
 
     @property
-    def history(self) -> List[str]:
+    def history(self) -> List[Union[Outcome, str]]:
+        """Histórico da partida: ``Outcome`` das jogadas (ou ``str``, se veio
+        de um arquivo). Use ``describe(linha)`` para o texto."""
         return self._history
 
+    def describe(self, line: Union[Outcome, str]) -> str:
+        """Texto de um resultado ou linha do histórico, com os nomes dos assentos."""
+        return line_text(line, [p.name for p in self._players])
+
+    @property
+    def alive_players(self) -> List[Player]:
+        return [p for p in self._players if p.is_alive]
+
+    @property
+    def is_game_over(self) -> bool:
+        """O jogo termina quando resta no máximo um jogador vivo."""
+        return len(self.alive_players) <= 1
+
+    @property
+    def winner(self) -> Optional[Player]:
+        alive = self.alive_players
+        return alive[0] if len(alive) == 1 else None
+
     def next_turn(self) -> None:
         """Avança para o próximo jogador vivo."""
         if not any(p.is_alive for p in self._players):
@@ -84,112 +323,328 @@ class GameManager:
         while not self._players[self._turn_index].is_alive:
             self._turn_index = (self._turn_index + 1) % len(self._players)
 
-    def get_available_actions(self, player: Player) -> List[Action]:
-        actions = [
-            IncomeAction(), ForeignAidAction(), TaxAction(),
-            AssassinateAction(), StealAction(), ExchangeAction(), CoupAction()
-        ]
-        return [a for a in actions if player.coins >= a.cost]
+    def get_available_actions(self, player: Player) -> Sequence[Action]:
+        """Ações que o jogador pode pagar (tupla compartilhada de ``moves.ACTIONS``)."""
+        return available_actions(player.coins)
+
+    def opponent_mask(self, player: Player) -> int:
+        """Bitmask dos assentos dos oponentes vivos de ``player``."""
+        mask = 0
+        for seat, p in enumerate(self._players):
+            if p is not player and p.is_alive:
+                mask |= 1 << seat
+        return mask
+
+    def legal_moves(self, player: Player) -> int:
+        """Bitmask das jogadas legais de ``player`` (codificação de ``moves``)."""
+        return legal_move_mask(player.coins, self.opponent_mask(player), len(self._players))
 
-    def add_to_history(self, message: str) -> None:
+    def add_to_history(self, message: Union[Outcome, str]) -> None:
         self._history.append(message)
 
-    def _handle_challenge(self, player: Player, action: Action, target: Player = None) -> str:
-        """Gerencia a fase de desafio."""
-        challenger = self._get_challenger(player)
-        if challenger:
-            challenge = Challenge(challenger, action, target)
-            return challenge.resolve(self)
-        return "Nenhum desafio foi feito"
-
-    def _handle_block(self, player: Player, action: Action, target: Player = None) -> str:
-        """Gerencia a fase de bloqueio."""
-        blocker = self._get_blocker(player, action, target)
-        if blocker:
-            blocking_character = blocker.choose_blocking_character(action)
-            block = Block(blocker, action, blocking_character)
-            return block.resolve(self)
-        return "Nenhum bloqueio foi feito"
-
-    def _get_challenger(self, current_player: Player) -> Optional[Player]:
-        """Pergunta aos outros jogadores se desejam desafiar."""
-        for player in self._players:
-            if player is current_player or not player.is_alive:
+    def subscribe(self, listener: GameListener) -> None:
+        """Inscreve ``listener`` nos eventos públicos da partida (``events.py``)."""
+        self._listeners.append(listener)
+        listener.on_attach(self)
+
+    def unsubscribe(self, listener: GameListener) -> None:
+        self._listeners.remove(listener)
+
+    def _bind_seats(self) -> None:
+        for seat, p in enumerate(self._players):
+            p.bind_zobrist(seat)
+
+    @property
+    def zobrist(self) -> int:
+        """Hash de Zobrist do estado (vez, jogadores e baralho); ver ``zobrist.py``.
+
+        Jogadores e baralho mantêm as próprias partes a cada mudança, então
+        a consulta só junta ``len(players) + 2`` chaves.
+        """
+        h = turn_key(self._turn_index) ^ self._deck.zobrist
+        for p in self._players:
+            h ^= p.zobrist
+        return h
+
+    def _reattach(self) -> None:
+        # Estado recarregado: jogadores novos ganham as chaves do assento e
+        # os observadores recomeçam do que é público
+        self._bind_seats()
+        for listener in self._listeners:
+            listener.on_attach(self)
+
+    def _challenge_phase(
+        self, sync: bool, player: Player, action: Action, target: Optional[Player] = None
+    ) -> Generator[Decision, Any, Outcome]:
+        """Fase de desafio: pergunta aos outros jogadores, em ordem, se desafiam."""
+        challenger = None
+        window = None if sync else tuple(p for p in self._players if p is not player and p.is_alive)
+        for p in self._players:
+            if p is player or not p.is_alive:
                 continue
-            if isinstance(player, HumanPlayer):
-                answer = input(f"{player.name}, deseja desafiar? (s/n): ").lower()
-                if answer == "s":
-                    return player
-            elif isinstance(player, AIPlayer) and player.wants_to_challenge():
-                return player
-        return None
-
-    def _get_blocker(
-        self, current_player: Player, action: Action, target: Optional[Player]
-    ) -> Optional[Player]:
-        """Verifica se algum jogador deseja bloquear a ação."""
+            if sync:
+                wants = p.wants_to_challenge(action=action, actor=player, target=target, players=self._players)
+            else:
+                wants = yield Decision(CHALLENGE, p, YES_NO, False, action, player, target, self._players, window)
+            if wants:
+                challenger = p
+                break
+        if challenger is None:
+            for listener in self._listeners:
+                listener.on_claim(player, action.requirement)
+            return NO_CHALLENGE
+        hands = ((challenger, tuple(challenger.characters)), (player, tuple(player.characters)))
+        # Quem é conferido é quem alegou o personagem, não o alvo da ação
+        result = Challenge(challenger, action, player).resolve(self)
+        for listener in self._listeners:
+            listener.on_challenge(player, action.requirement, result.kind is OutcomeKind.CHALLENGE_FAILED)
+        for p, hand in hands:
+            if len(p.characters) < len(hand):
+                yield from self._settle_loss(sync, p, hand)
+        return result
+
+    def _block_phase(
+        self, sync: bool, player: Player, action: Action, target: Optional[Player] = None
+    ) -> Generator[Decision, Any, Outcome]:
+        """Fase de bloqueio: o alvo tem a preferência, depois os demais."""
         possible_blockers: List[Player] = []
 
         if target and target.can_block(action):
             possible_blockers.append(target)
 
-        for player in self._players:
+        for p in self._players:
             if (
-                player is not current_player
-                and player is not target
-                and player.is_alive
+                p is not player
+                and p is not target
+                and p.is_alive
             ):
-                if player.can_block(action):
-                    possible_blockers.append(player)
-
-        for player in possible_blockers:
-            if isinstance(player, HumanPlayer):
-                answer = input(f"{player.name}, deseja bloquear? (s/n): ").lower()
-                if answer == "s":
-                    return player
-            elif isinstance(player, AIPlayer) and player.wants_to_block():
-                return player
-        return None
-
-    def _choose_target(self, current_player: Player) -> Optional[Player]:
-        """Seleciona um alvo para ações que requerem"""
-        valid_targets = [p for p in self._players if p != current_player and p.is_alive]
-
-        if not valid_targets:
-            return None
+                if p.can_block(action):
+                    possible_blockers.append(p)
 
-        if isinstance(current_player, HumanPlayer):
-            print("\nEscolha um alvo:")
-            for i, target in enumerate(valid_targets, 1):
-                print(f"{i}. {target.name}")
-            choice = int(input("Sua escolha: ")) - 1
-            return valid_targets[choice]
-        else:
-            import random
-            return random.choice(valid_targets)
+        window = None if sync else tuple(possible_blockers)
+        for blocker in possible_blockers:
+            if sync:
+                wants = blocker.wants_to_block(action=action, actor=player, target=target, players=self._players)
+            else:
+                wants = yield Decision(BLOCK, blocker, YES_NO, False, action, player, target, self._players, window)
+            if not wants:
+                continue
+            if sync:
+                blocking_character = blocker.choose_blocking_character(action)
+            else:
+                blocking_character = yield Decision(
+                    BLOCKING_CHARACTER, blocker, action.blockable_by, action.blockable_by[0],
+                    action, player, target, self._players,
+                )
+            result = Block(blocker, action, blocking_character).resolve(self)
+            if result.kind is OutcomeKind.BLOCKED:
+                for listener in self._listeners:
+                    listener.on_claim(blocker, blocking_character)
+            return result
+        return NO_BLOCK
+
+    def _settle_loss(
+        self, sync: bool, player: Player, before: Tuple[str, ...]
+    ) -> Generator[Decision, Any, None]:
+        """Deixa quem acabou de perder uma influência escolher qual carta entregar.
+
+        As regras viram a última carta da mão (``before`` é a mão de antes,
+        em ordem de personagem); se o jogador tinha cartas diferentes, ele
+        escolhe e a mão é corrigida. A carta virada vai para os observadores.
+        """
+        lost = before[-1]
+        if before[0] != lost:
+            if sync:
+                choice = player.choose_influence_to_lose(before)
+            else:
+                choice = yield Decision(LOSE_INFLUENCE, player, before, lost, None, None, None, self._players)
+            if choice != lost and choice in before:
+                player.replace_lost(lost, choice)
+                lost = choice
+        for listener in self._listeners:
+            listener.on_reveal(player, lost)
+
+    # ------------------------------------------------------------------
+    # Snapshots em memória e desfazer (para busca e simulações)
+    def snapshot(self) -> Tuple:
+        """Estado completo em memória, sem serialização nem disco."""
+        return (
+            self._turn_index,
+            tuple(self._history),
+            tuple(p.snapshot() for p in self._players),
+            self._deck.snapshot(),
+        )
+
+    def restore(self, state: Tuple) -> None:
+        """Volta ao estado devolvido por ``snapshot`` (mesmos jogadores)."""
+        turn_index, history, players, deck = state
+        self._turn_index = turn_index
+        self._history = list(history)
+        for p, pstate in zip(self._players, players):
+            p.restore(pstate)
+        self._deck.restore(deck)
+        self._undo.clear()
+        # Os observadores podem ter visto a linha abandonada
+        for listener in self._listeners:
+            listener.on_attach(self)
+
+    def clone(self) -> 'GameManager':
+        """Cópia independente do jogo, só em memória (sem arquivos)."""
+        twin = copy.copy(self)
+        twin._players = [p.clone() for p in self._players]
+        # Crenças das IAs: cada cópia acompanha os jogadores da cópia
+        seats = dict(zip(self._players, twin._players))
+        twin._listeners = []
+        for original, p in seats.items():
+            tracker = getattr(p, "beliefs", None)
+            if tracker is not None:
+                p.beliefs = tracker.clone(seats)
+                if original.beliefs in self._listeners:
+                    twin._listeners.append(p.beliefs)
+        twin._history = list(self._history)
+        twin._deck = self._deck.clone()
+        twin._state_file = None
+        twin._writer = None
+        twin._journal = None
+        twin._metrics = None  # turnos simulados não entram nas métricas do jogo real
+        twin._undo = []
+        return twin
+
+    def _push_undo(self, *players: Optional[Player]) -> None:
+        """Guarda o que uma jogada pode alterar: só os jogadores envolvidos."""
+        saved = [(p, p.snapshot()) for p in players if p is not None]
+        self._undo.append((self._turn_index, len(self._history), saved))
+
+    def make_action(self, action: Action, target: Optional[Player] = None, advance: bool = True) -> Optional[Outcome]:
+        """Executa a ação do jogador da vez, empilhando como desfazê-la.
+
+        Não há desafio, bloqueio nem persistência; use ``make_challenge`` e
+        ``make_block`` para essas fases e ``unmake`` para voltar.
+        """
+        player = self.current_player
+        self._push_undo(player, target)
+        result = player.perform_action(action, target, self)
+        if advance:
+            self.next_turn()
+        return result
+
+    def make_challenge(self, challenger: Player, action: Action, advance: bool = False) -> Outcome:
+        """Resolve um desafio de ``challenger`` contra o jogador da vez."""
+        player = self.current_player
+        self._push_undo(challenger, player)
+        result = Challenge(challenger, action, player).resolve(self)
+        if advance:
+            self.next_turn()
+        return result
+
+    def make_block(self, blocker: Player, action: Action, blocking_character: str,
+                   advance: bool = False) -> Outcome:
+        """Resolve um bloqueio (só altera o histórico e, opcionalmente, a vez)."""
+        self._push_undo()
+        result = Block(blocker, action, blocking_character).resolve(self)
+        if advance:
+            self.next_turn()
+        return result
+
+    def unmake(self) -> None:
+        """Desfaz a última jogada empilhada por ``make_*`` em O(1)."""
+        turn_index, history_len, saved = self._undo.pop()
+        for p, state in saved:
+            p.restore(state)
+        del self._history[history_len:]
+        self._turn_index = turn_index
+
+    @property
+    def undo_depth(self) -> int:
+        return len(self._undo)
 
     # ------------------------------------------------------------------
     # Persistência de dados
-    def save_state(self) -> None:
-        """Salva o estado atual do jogo em JSON."""
-        data = {
+    def _state_dict(self) -> Dict:
+        """Cópia do estado ao fim do turno, tirada na thread do jogo.
+
+        Os ``Outcome`` não mudam depois de criados, então basta copiar a
+        lista; o texto de cada linha é montado por ``_encode_state`` na
+        thread do escritor. As pilhas do baralho vão na mesma cópia, para
+        que jogo e baralho gravados nunca sejam de turnos diferentes.
+        """
+        return {
             "turn_index": self._turn_index,
-            "history": self._history,
+            "history": tuple(self._history),
             "players": [p.to_dict() for p in self._players],
+            "deck": self._deck.piles(),
             "deck_file": self._deck._json_file,
+            "journal_seq": self._journal_seq,
         }
-        Path(self._state_file).parent.mkdir(parents=True, exist_ok=True)
-        with open(self._state_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def save_state(self) -> None:
+        """Salva o estado atual do jogo em JSON (ou agenda a gravação)."""
+        if self._writer is not None:
+            self._writer.mark_dirty()
+
+    def flush(self) -> None:
+        """Grava imediatamente o estado do jogo e do baralho."""
+        if self._writer is not None:
+            self._writer.flush()
+        self._deck.flush()
+
+    def close(self) -> None:
+        """Encerra as gravações em segundo plano, gravando o pendente."""
+        if self._writer is not None:
+            self._writer.close()
+        if self._journal is not None:
+            self._journal.close()
+        self._deck.close()
+
+    def _binary_path(self, path: Optional[str]) -> str:
+        if path is not None:
+            return path
+        if self._state_file is None:
+            raise ValueError("Informe o caminho do snapshot (jogo sem state_file)")
+        return str(Path(self._state_file).with_suffix(".coup"))
+
+    def save_snapshot(self, path: Optional[str] = None) -> None:
+        """Grava jogo e baralho no formato binário compacto (``snapshot.py``).
+
+        Por padrão usa o ``state_file`` com extensão ``.coup``.
+        """
+        write_game(self, self._binary_path(path))
+
+    def load_snapshot(self, path: Optional[str] = None) -> None:
+        """Carrega jogo e baralho de um snapshot binário."""
+        with SnapshotReader(self._binary_path(path)) as snap:
+            self._turn_index = snap.turn_index
+            self._history = snap.history()
+            self._players = [Player.from_dict(pdata) for pdata in snap.players()]
+            self._journal_seq = snap.journal_seq
+            self._deck.load_dict({"cards": snap.cards(), "discard_pile": snap.discard_pile()})
+        self._reattach()
 
     def load_state(self) -> None:
         """Carrega o estado do jogo se o arquivo existir."""
-        if not Path(self._state_file).exists():
+        if self._state_file is None or not Path(self._state_file).exists():
             return
         with open(self._state_file, "r", encoding="utf-8") as f:
             data = json.load(f)
 
         self._turn_index = data.get("turn_index", 0)
         self._history = data.get("history", [])
-        self._deck = Deck(data.get("deck_file", "deck_state.json"))
+        self._deck.close()
+        self._deck = Deck(data.get("deck_file", "deck_state.json"), self._flush_policy)
+        if "deck" in data:
+            # O baralho salvo junto com o jogo prevalece sobre ``deck_file``,
+            # que pode ser de outro turno se o processo caiu entre as gravações.
+            self._deck.load_dict(data["deck"])
+        if self._journal is not None:
+            self._deck.begin_journal()
         self._players = [Player.from_dict(pdata) for pdata in data.get("players", [])]
+        self._journal_seq = data.get("journal_seq", 0)
+
+        if self._journal is not None:
+            replayed = 0
+            for record in self._journal.records(after_seq=self._journal_seq):
+                self._apply_record(record)
+                replayed += 1
+            if replayed:
+                self._write_snapshot()
+        self._reattach()
@@ -0,0 +1,422 @@
+"""Jogador com busca em árvore Monte Carlo sobre conjuntos de informação.
+
+O ``ISMCTSPlayer`` não vê as cartas dos oponentes. A cada iteração ele
+sorteia uma determinização (mãos plausíveis para os oponentes, tiradas da
+composição do baralho menos a própria mão) e desce uma única árvore
+compartilhada (SO-ISMCTS), usando contagens de disponibilidade no UCB.
+Os oponentes são modelados como o ``AIPlayer``: jogadas uniformes, Coup
+com 80% de chance a partir de 7 moedas, 10% de desafios e 20% de
+bloqueios.
+
+Cada decisão respeita um orçamento de tempo (``time_budget``, segundos)
+e/ou de iterações (``iterations``). ``iterations_per_second`` informa o
+ritmo medido para dimensionar esses orçamentos.
+
+Uso:
+    python -m src.ismcts --games 50 --time-budget 0.05
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from action import Action
+from Deck import CHARACTERS, COPIES_PER_CHARACTER
+from moves import (
+    ACTIONS, ASSASSINATE, COUP, FOREIGN_AID, INCOME, TAX,
+    action_id, decode_move, encode_move, legal_moves,
+)
+from player import Player
+
+COUP_RATE = 0.8
+CHALLENGE_RATE = 0.1
+BLOCK_RATE = 0.2
+MAX_ROLLOUT_TURNS = 200
+
+
+class _SimState:
+    """Estado determinizado usado nas simulações (só listas e inteiros)."""
+
+    __slots__ = ("coins", "hands", "turn")
+
+    def __init__(self, coins: List[int], hands: List[List[str]], turn: int):
+        self.coins = coins
+        self.hands = hands
+        self.turn = turn
+
+    def clone(self) -> "_SimState":
+        return _SimState(list(self.coins), [list(h) for h in self.hands], self.turn)
+
+    @property
+    def num_seats(self) -> int:
+        return len(self.coins)
+
+    def alive(self, seat: int) -> bool:
+        return bool(self.hands[seat])
+
+    def winner(self) -> Optional[int]:
+        """Assento do vencedor, ou ``None`` se o jogo continua."""
+        alive = [s for s in range(len(self.hands)) if self.hands[s]]
+        return alive[0] if len(alive) == 1 else None
+
+    def opponent_mask(self, seat: int) -> int:
+        mask = 0
+        for s, hand in enumerate(self.hands):
+            if hand and s != seat:
+                mask |= 1 << s
+        return mask
+
+    def legal(self) -> Tuple[int, ...]:
+        seat = self.turn
+        return legal_moves(self.coins[seat], self.opponent_mask(seat), len(self.coins))
+
+    def random_move(self, rng: random.Random) -> int:
+        """Jogada no estilo do ``AIPlayer``."""
+        seat = self.turn
+        n = len(self.coins)
+        opponents = self.opponent_mask(seat)
+        if self.coins[seat] >= 7 and rng.random() < COUP_RATE:
+            targets = [s for s in range(n) if opponents >> s & 1]
+            return encode_move(COUP, rng.choice(targets), n)
+        # Primeiro a ação (uniforme), depois o alvo, como no GameManager
+        moves = legal_moves(self.coins[seat], opponents, n)
+        action = rng.choice(sorted({m // n for m in moves}))
+        return rng.choice([m for m in moves if m // n == action])
+
+    def lose_influence(self, seat: int) -> None:
+        if self.hands[seat]:
+            self.hands[seat].pop()
+
+    def play(
+        self,
+        move: int,
+        rng: random.Random,
+        observer: Optional[int] = None,
+        observer_challenges: Optional[bool] = None,
+        observer_blocks: Optional[bool] = None,
+    ) -> None:
+        """Joga um turno completo: desafio, bloqueio, execução e vez.
+
+        ``observer_challenges``/``observer_blocks`` fixam a reação do
+        jogador ``observer``; os demais reagem como o ``AIPlayer``.
+        """
+        n = len(self.coins)
+        actor = self.turn
+        aid, target = decode_move(move, n)
+        action = ACTIONS[aid]
+
+        if action.requirement and not self._challenge(actor, action, rng, observer, observer_challenges):
+            self._next_turn()
+            return
+        if action.blockable_by and self._blocked(actor, action, rng, observer, observer_blocks):
+            self._next_turn()
+            return
+
+        coins = self.coins
+        coins[actor] -= action.cost
+        if aid == INCOME:
+            coins[actor] += 1
+        elif aid == FOREIGN_AID:
+            coins[actor] += 2
+        elif aid == TAX:
+            coins[actor] += 3
+        elif action.needs_target:
+            if aid == COUP or aid == ASSASSINATE:
+                self.lose_influence(target)
+            else:
+                stolen = min(2, coins[target])
+                coins[target] -= stolen
+                coins[actor] += stolen
+        self._next_turn()
+
+    def _challenge(self, actor, action, rng, observer, observer_challenges) -> bool:
+        """Fase de desafio; devolve ``False`` se o ator foi pego blefando."""
+        challenger = None
+        if observer_challenges and observer != actor and self.hands[observer]:
+            challenger = observer
+        else:
+            for s in range(len(self.hands)):
+                if s == actor or not self.hands[s] or s == observer and observer_challenges is False:
+                    continue
+                if rng.random() < CHALLENGE_RATE:
+                    challenger = s
+                    break
+        if challenger is None:
+            return True
+        if action.requirement in self.hands[actor]:
+            self.lose_influence(challenger)
+            return True
+        self.lose_influence(actor)
+        return False
+
+    def _blocked(self, actor, action, rng, observer, observer_blocks) -> bool:
+        if observer_blocks and observer != actor and self.hands[observer]:
+            return True
+        for s, hand in enumerate(self.hands):
+            if s == actor or not hand or s == observer and observer_blocks is False:
+                continue
+            if any(c in action.blockable_by for c in hand) and rng.random() < BLOCK_RATE:
+                return True
+        return False
+
+    def _next_turn(self) -> None:
+        n = len(self.hands)
+        if not any(self.hands):
+            return
+        seat = (self.turn + 1) % n
+        while not self.hands[seat]:
+            seat = (seat + 1) % n
+        self.turn = seat
+
+    def rollout(self, rng: random.Random) -> Optional[int]:
+        """Joga até o fim com a política aleatória; devolve o vencedor."""
+        for _ in range(MAX_ROLLOUT_TURNS):
+            winner = self.winner()
+            if winner is not None:
+                return winner
+            self.play(self.random_move(rng), rng)
+        return self.winner()
+
+
+class _Node:
+    __slots__ = ("move", "player", "parent", "children", "visits", "available", "wins")
+
+    def __init__(self, move: Optional[int] = None, player: Optional[int] = None,
+                 parent: Optional["_Node"] = None):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children: Dict[int, "_Node"] = {}
+        self.visits = 0
+        self.available = 0
+        self.wins = 0.0
+
+
+class ISMCTSPlayer(Player):
+    """Jogador guiado por ISMCTS com orçamento por decisão.
+
+    Args:
+        name: Nome do jogador.
+        time_budget: Segundos de busca por decisão (``None`` = sem limite).
+        iterations: Iterações por decisão (``None`` = sem limite).
+        exploration: Constante de exploração do UCB.
+        seed: Semente do gerador de números aleatórios da busca.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        time_budget: Optional[float] = 0.1,
+        iterations: Optional[int] = None,
+        exploration: float = 0.7,
+        seed: Optional[int] = None,
+    ):
+        super().__init__(name)
+        if time_budget is None and iterations is None:
+            raise ValueError("Defina time_budget e/ou iterations")
+        self._time_budget = time_budget
+        self._iterations = iterations
+        self._exploration = exploration
+        self._rng = random.Random(seed)
+        self._pending_target: Optional[int] = None
+        self._players: List[Player] = []
+        self._total_iterations = 0
+        self._total_time = 0.0
+        self.last_iterations = 0
+
+    # --- Métricas ----------------------------------------------------------
+    @property
+    def iterations_per_second(self) -> float:
+        """Média de iterações por segundo em todas as decisões até agora."""
+        return self._total_iterations / self._total_time if self._total_time else 0.0
+
+    # --- Ganchos do GameManager --------------------------------------------
+    def choose_action(self, available_actions: list, players: list) -> Action:
+        seat = players.index(self)
+        root = self._observe(players, seat)
+        move = self._search(root, seat)
+        aid, target = decode_move(move, len(players))
+        self._pending_target = target
+        return ACTIONS[aid]
+
+    def choose_target(self, valid_targets: List[Player]) -> Player:
+        target = self._pending_target
+        self._pending_target = None
+        if target is not None:
+            for p in valid_targets:
+                if p is self._players[target]:
+                    return p
+        return super().choose_target(valid_targets)
+
+    def wants_to_challenge(self, action=None, actor=None, target=None, players=None) -> bool:
+        if action is None or actor is None or players is None:
+            return False
+        return self._react(action, actor, target, players, "challenge")
+
+    def wants_to_block(self, action=None, actor=None, target=None, players=None) -> bool:
+        if action is None or actor is None or players is None:
+            return False
+        return self._react(action, actor, target, players, "block")
+
+    # --- Busca -------------------------------------------------------------
+    def _observe(self, players: List[Player], seat: int) -> _SimState:
+        """Estado visível: moedas e tamanho das mãos; mãos alheias vazias."""
+        self._players = players
+        hands = [list(p.characters) if p is self else [None] * len(p.characters) for p in players]
+        return _SimState([p.coins for p in players], hands, seat)
+
+    def _determinize(self, state: _SimState, seat: int) -> _SimState:
+        """Sorteia mãos para os oponentes com as cartas que não estão na própria mão
+        nem viradas na mesa."""
+        pool = [c for c in CHARACTERS for _ in range(COPIES_PER_CHARACTER)]
+        for c in state.hands[seat]:
+            pool.remove(c)
+        for p in self._players:
+            for c in p.revealed:
+                pool.remove(c)
+        self._rng.shuffle(pool)
+        det = state.clone()
+        for s, hand in enumerate(det.hands):
+            if s != seat:
+                det.hands[s] = [pool.pop() for _ in hand]
+        return det
+
+    def _budget(self):
+        """Gerador que para quando o orçamento da decisão acaba."""
+        start = time.perf_counter()
+        deadline = start + self._time_budget if self._time_budget is not None else None
+        done = 0
+        while True:
+            if self._iterations is not None and done >= self._iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            yield done
+            done += 1
+        elapsed = time.perf_counter() - start
+        self.last_iterations = done
+        self._total_iterations += done
+        self._total_time += elapsed
+
+    def _search(self, root_state: _SimState, seat: int) -> int:
+        root = _Node()
+        rng = self._rng
+        for _ in self._budget():
+            state = self._determinize(root_state, seat)
+            node = root
+            path = [root]
+            # Seleção/expansão restritas às jogadas legais nesta determinização
+            while state.winner() is None:
+                legal = state.legal()
+                untried = [m for m in legal if m not in node.children]
+                if untried:
+                    move = rng.choice(untried)
+                    child = node.children[move] = _Node(move, state.turn, node)
+                    for m in legal:
+                        if m in node.children:
+                            node.children[m].available += 1
+                    state.play(move, rng)
+                    path.append(child)
+                    break
+                node = self._select(node, legal)
+                state.play(node.move, rng)
+                path.append(node)
+            winner = state.rollout(rng)
+            for n in path:
+                n.visits += 1
+                if n.player is not None and n.player == winner:
+                    n.wins += 1
+        if not root.children:
+            return root_state.random_move(rng)
+        return max(root.children.values(), key=lambda n: n.visits).move
+
+    def _select(self, node: _Node, legal: Tuple[int, ...]) -> _Node:
+        best, best_score = None, -1.0
+        log_c = self._exploration
+        for m in legal:
+            child = node.children[m]
+            child.available += 1
+            score = child.wins / child.visits + log_c * math.sqrt(
+                math.log(max(child.available, 1)) / child.visits
+            )
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _react(self, action: Action, actor: Player, target: Optional[Player],
+               players: List[Player], kind: str) -> bool:
+        """Decide desafio/bloqueio por Monte Carlo plano sobre as duas opções."""
+        seat = players.index(self)
+        root_state = self._observe(players, seat)
+        root_state.turn = players.index(actor)
+        target_seat = players.index(target) if target is not None else None
+        move = encode_move(action_id(action), target_seat, len(players))
+        wins = {True: 0, False: 0}
+        tries = {True: 0, False: 0}
+        for i in self._budget():
+            option = bool(i % 2)
+            state = self._determinize(root_state, seat)
+            if kind == "challenge":
+                state.play(move, self._rng, seat, observer_challenges=option)
+            else:
+                state.play(move, self._rng, seat, observer_blocks=option)
+            tries[option] += 1
+            if state.rollout(self._rng) == seat:
+                wins[option] += 1
+        if not tries[True] or not tries[False]:
+            return False
+        return wins[True] / tries[True] > wins[False] / tries[False]
+
+
+# --- Medição -----------------------------------------------------------------
+def benchmark(games: int = 20, time_budget: Optional[float] = 0.05,
+              iterations: Optional[int] = None, num_players: int = 4, seed: int = 0) -> Dict:
+    """Joga ``ISMCTSPlayer`` (assento 1) contra ``AIPlayer``s e mede o ritmo."""
+    from Deck import Deck
+    from game_manager import GameManager
+    from player import AIPlayer
+
+    random.seed(seed)
+    wins = 0
+    total_iterations = 0
+    total_time = 0.0
+    for g in range(games):
+        bot = ISMCTSPlayer("ISMCTS", time_budget=time_budget, iterations=iterations, seed=seed + g)
+        players = [bot] + [AIPlayer(f"Bot {i}") for i in range(1, num_players)]
+        game = GameManager(players, state_file=None, deck=Deck(None))
+        for _ in range(1000):
+            if game.is_game_over:
+                break
+            game.play_turn()
+        wins += game.winner is bot
+        total_iterations += bot._total_iterations
+        total_time += bot._total_time
+    return {
+        "games": games,
+        "win_rate": wins / games,
+        "iterations_per_s": total_iterations / total_time if total_time else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Mede o ISMCTSPlayer contra AIPlayers.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--time-budget", type=float, default=0.05)
+    parser.add_argument("--iterations", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    budget = None if args.iterations and args.time_budget <= 0 else args.time_budget
+    result = benchmark(args.games, budget, args.iterations, args.players, args.seed)
+    print(f"Partidas: {result['games']}")
+    print(f"Vitórias do ISMCTS: {result['win_rate']:.1%} (aleatório: {1 / args.players:.1%})")
+    print(f"Iterações/s: {result['iterations_per_s']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
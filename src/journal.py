@@ -0,0 +1,78 @@
+"""Diário append-only de turnos para o GameManager.
+
+Cada turno vira uma linha JSON compacta no arquivo do diário, então
+gravar um turno custa O(1) independentemente do tamanho da partida. Um
+snapshot completo é gravado a cada ``snapshot_every`` turnos e o diário
+é compactado (truncado) logo depois. Para recuperar um jogo basta ler o
+último snapshot e reaplicar os registros com ``seq`` maior que o dele.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, Optional, TextIO
+
+
+class GameJournal:
+    """Arquivo de registros de turno, um JSON por linha."""
+
+    def __init__(self, path: str, snapshot_every: int = 50, fsync: bool = False):
+        """
+        Args:
+            path: Arquivo do diário.
+            snapshot_every: Turnos entre snapshots completos (compactação).
+            fsync: Força cada registro até o disco, não só até o sistema
+                operacional. Mais lento, mas sobrevive a queda de energia.
+        """
+        self._path = path
+        self._snapshot_every = snapshot_every
+        self._fsync = fsync
+        self._file: Optional[TextIO] = None
+        self._since_snapshot = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def snapshot_due(self) -> bool:
+        """Indica se já passaram ``snapshot_every`` turnos desde o último snapshot."""
+        return self._since_snapshot >= self._snapshot_every
+
+    def append(self, record: Dict) -> None:
+        """Acrescenta um registro ao fim do diário."""
+        if self._file is None:
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+        self._since_snapshot += 1
+
+    def records(self, after_seq: int = -1) -> Iterator[Dict]:
+        """Lê os registros com ``seq`` maior que ``after_seq``.
+
+        Uma última linha incompleta (gravação interrompida) é ignorada.
+        """
+        if not Path(self._path).exists():
+            return
+        with open(self._path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if record.get("seq", -1) > after_seq:
+                    yield record
+
+    def compact(self) -> None:
+        """Descarta os registros já cobertos pelo snapshot mais recente."""
+        self.close()
+        with open(self._path, "w", encoding="utf-8"):
+            pass
+        self._since_snapshot = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
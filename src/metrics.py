@@ -0,0 +1,169 @@
+"""Instrumentação opcional dos turnos do GameManager.
+
+``TurnMetrics`` acumula, por fase do turno, histogramas de duração e
+contadores de eventos (desafios, bloqueios, eliminações). Passe uma
+instância para ``GameManager(metrics=...)``; sem ela o turno não mede
+nada. Com ``sample_rate < 1`` só uma fração dos turnos é cronometrada,
+mas os contadores continuam contando todos.
+
+Os dados saem como dicionário/JSON (``to_dict``/``to_json``) ou no
+formato texto do Prometheus (``to_prometheus``).
+"""
+import bisect
+import json
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PHASES = ("choose_action", "choose_target", "challenge", "block", "perform_action", "persist", "turn")
+COUNTERS = (
+    "turns",
+    "challenges_raised",
+    "challenges_won",   # o desafiante acertou (o ator blefava)
+    "challenges_lost",
+    "blocks_raised",
+    "blocks_succeeded",
+    "blocks_invalid",
+    "eliminations",
+)
+# Limites superiores dos buckets, em segundos
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0,
+)
+
+
+class Histogram:
+    """Histograma com limites fixos (``bounds``), no formato do Prometheus."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # o último é +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        rows = []
+        for bound, n in zip(list(self.bounds) + [float("inf")], self.counts):
+            total += n
+            rows.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return rows
+
+
+class TurnClock:
+    """Cronômetro de um turno; ``lap`` fecha a fase atual."""
+
+    __slots__ = ("_metrics", "_sampled", "_start", "_last", "_alive_before")
+
+    def __init__(self, metrics: "TurnMetrics", sampled: bool, alive_before: int):
+        self._metrics = metrics
+        self._sampled = sampled
+        self._alive_before = alive_before
+        self._start = self._last = time.perf_counter() if sampled else 0.0
+
+    def lap(self, phase: str) -> None:
+        if self._sampled:
+            now = time.perf_counter()
+            self._metrics.observe(phase, now - self._last)
+            self._last = now
+
+    def finish(self, challenge: Optional[str], block: Optional[str], alive_after: int) -> None:
+        """Fecha o turno e atualiza os contadores."""
+        m = self._metrics
+        if self._sampled:
+            m.observe("turn", time.perf_counter() - self._start)
+        m.incr("turns")
+        if challenge is not None:
+            m.incr("challenges_raised")
+            m.incr("challenges_won" if challenge == "succeeded" else "challenges_lost")
+        if block is not None:
+            m.incr("blocks_raised")
+            m.incr("blocks_succeeded" if block == "blocked" else "blocks_invalid")
+        if alive_after < self._alive_before:
+            m.incr("eliminations", self._alive_before - alive_after)
+
+
+class TurnMetrics:
+    """Contadores e histogramas por fase do turno.
+
+    Args:
+        sample_rate: Fração dos turnos cronometrados (0 a 1).
+        buckets: Limites superiores dos buckets dos histogramas, em segundos.
+        seed: Semente do sorteio de amostragem (não usa o ``random`` global,
+            para não alterar o andamento das partidas).
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        seed: Optional[int] = None,
+    ):
+        self._sample_rate = sample_rate
+        self._buckets = tuple(buckets)
+        self._rng = random.Random(seed)
+        self.reset()
+
+    def reset(self) -> None:
+        self._counters: Dict[str, int] = {name: 0 for name in COUNTERS}
+        self._phases: Dict[str, Histogram] = {p: Histogram(self._buckets) for p in PHASES}
+
+    def start_turn(self, players: Sequence) -> TurnClock:
+        sampled = self._sample_rate >= 1.0 or self._rng.random() < self._sample_rate
+        return TurnClock(self, sampled, sum(1 for p in players if p.is_alive))
+
+    def observe(self, phase: str, seconds: float) -> None:
+        self._phases[phase].observe(seconds)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        self._counters[name] += amount
+
+    # --- Leitura -----------------------------------------------------------
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+    def phase_summary(self, phase: str) -> Dict[str, float]:
+        """Contagem, soma e média (em segundos) de uma fase."""
+        h = self._phases[phase]
+        return {"count": h.count, "sum": h.sum, "mean": h.sum / h.count if h.count else 0.0}
+
+    def to_dict(self) -> Dict:
+        return {
+            "sample_rate": self._sample_rate,
+            "counters": dict(self._counters),
+            "phases": {
+                name: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "buckets": dict(h.cumulative()),
+                }
+                for name, h in self._phases.items()
+            },
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix: str = "coup") -> str:
+        """Exposição no formato texto do Prometheus."""
+        lines = []
+        for name, value in self._counters.items():
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        metric = f"{prefix}_turn_phase_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        for phase, h in self._phases.items():
+            for le, total in h.cumulative():
+                lines.append(f'{metric}_bucket{{phase="{phase}",le="{le}"}} {total}')
+            lines.append(f'{metric}_sum{{phase="{phase}"}} {h.sum!r}')
+            lines.append(f'{metric}_count{{phase="{phase}"}} {h.count}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,106 @@
+"""Registro único das ações e codificação inteira das jogadas.
+
+As ações não guardam estado, então basta uma instância de cada
+(flyweight) em ``ACTIONS``. Uma jogada é um inteiro denso
+``action_id * num_seats + assento_do_alvo``; ações sem alvo usam o
+assento 0. As jogadas legais vêm de uma tabela pré-calculada indexada
+por (faixa de moedas, máscara de oponentes vivos), sem alocar nada por
+chamada.
+"""
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple, Type
+
+from action import (
+    Action,
+    IncomeAction,
+    ForeignAidAction,
+    TaxAction,
+    AssassinateAction,
+    StealAction,
+    ExchangeAction,
+    CoupAction,
+)
+
+# Mesma ordem que ``GameManager.get_available_actions`` sempre usou
+ACTIONS: Tuple[Action, ...] = (
+    IncomeAction(), ForeignAidAction(), TaxAction(), AssassinateAction(),
+    StealAction(), ExchangeAction(), CoupAction(),
+)
+INCOME, FOREIGN_AID, TAX, ASSASSINATE, STEAL, EXCHANGE, COUP = range(len(ACTIONS))
+NUM_ACTIONS = len(ACTIONS)
+
+_IDS: Dict[Type[Action], int] = {type(a): i for i, a in enumerate(ACTIONS)}
+
+# Custos que mudam o conjunto de ações disponíveis (3 e 7)
+COST_THRESHOLDS: Tuple[int, ...] = tuple(sorted({a.cost for a in ACTIONS if a.cost > 0}))
+NUM_BUCKETS = len(COST_THRESHOLDS) + 1
+_BUCKET_OF = tuple(sum(c >= t for t in COST_THRESHOLDS) for c in range(COST_THRESHOLDS[-1] + 1))
+
+AVAILABLE_BY_BUCKET: Tuple[Tuple[Action, ...], ...] = tuple(
+    tuple(a for a in ACTIONS if a.cost <= ((0,) + COST_THRESHOLDS)[b]) for b in range(NUM_BUCKETS)
+)
+
+
+def action_id(action: Action) -> int:
+    """Índice da ação em ``ACTIONS``."""
+    return _IDS[type(action)]
+
+
+def coins_bucket(coins: int) -> int:
+    """Faixa de moedas: 0 (< 3), 1 (3 a 6) ou 2 (7 ou mais)."""
+    return _BUCKET_OF[min(coins, COST_THRESHOLDS[-1])]
+
+
+def available_actions(coins: int) -> Tuple[Action, ...]:
+    """Ações que um jogador com ``coins`` moedas pode pagar (tupla compartilhada)."""
+    return AVAILABLE_BY_BUCKET[_BUCKET_OF[min(coins, COST_THRESHOLDS[-1])]]
+
+
+def encode_move(action: int, target_seat: Optional[int], num_seats: int) -> int:
+    """Codifica (ação, alvo) num inteiro em ``range(NUM_ACTIONS * num_seats)``."""
+    return action * num_seats + (target_seat if target_seat is not None else 0)
+
+
+def decode_move(move: int, num_seats: int) -> Tuple[int, Optional[int]]:
+    """Inverso de ``encode_move``; o alvo é ``None`` para ações sem alvo."""
+    action, seat = divmod(move, num_seats)
+    return action, (seat if ACTIONS[action].needs_target else None)
+
+
+def move_count(num_seats: int) -> int:
+    """Tamanho do espaço de jogadas para uma mesa de ``num_seats``."""
+    return NUM_ACTIONS * num_seats
+
+
+@lru_cache(maxsize=None)
+def _tables(num_seats: int) -> Tuple[Tuple[Tuple[int, ...], ...], Tuple[Tuple[Tuple[int, ...], ...], ...]]:
+    masks = []
+    lists = []
+    for bucket in range(NUM_BUCKETS):
+        bucket_masks = []
+        bucket_lists = []
+        for opponents in range(1 << num_seats):
+            moves = []
+            for action in AVAILABLE_BY_BUCKET[bucket]:
+                aid = _IDS[type(action)]
+                if not action.needs_target:
+                    moves.append(encode_move(aid, None, num_seats))
+                    continue
+                for seat in range(num_seats):
+                    if opponents >> seat & 1:
+                        moves.append(encode_move(aid, seat, num_seats))
+            bucket_lists.append(tuple(moves))
+            bucket_masks.append(sum(1 << m for m in moves))
+        masks.append(tuple(bucket_masks))
+        lists.append(tuple(bucket_lists))
+    return tuple(masks), tuple(lists)
+
+
+def legal_move_mask(coins: int, opponent_mask: int, num_seats: int) -> int:
+    """Bitmask das jogadas legais (bit ``m`` ligado = jogada ``m`` permitida)."""
+    return _tables(num_seats)[0][coins_bucket(coins)][opponent_mask]
+
+
+def legal_moves(coins: int, opponent_mask: int, num_seats: int) -> Sequence[int]:
+    """Jogadas legais como tupla pré-calculada, em ordem crescente."""
+    return _tables(num_seats)[1][coins_bucket(coins)][opponent_mask]
@@ -0,0 +1,140 @@
+"""Resultados tipados das jogadas, com mensagens formatadas só sob demanda.
+
+``Action.execute``, ``Challenge.resolve``, ``Block.resolve`` e o turno do
+``GameManager`` devolvem um ``Outcome``: o tipo do resultado
+(``OutcomeKind``) e quem participou (os assentos dos jogadores), o
+personagem e as moedas envolvidas. O motor decide o que fazer pelo
+``kind``; o texto só é montado quando alguém o pede (``message`` com os
+nomes dos assentos, ou ``GameManager.describe``): a interface, o
+console, os arquivos de estado.
+
+As entradas do histórico também são ``Outcome`` (ou ``str``, quando vêm
+de um arquivo), então uma partida sem interface nem persistência nunca
+formata texto. Os textos ficam em ``MESSAGES``; trocar a tabela (ou
+passá-la para ``message``) troca o idioma, e os nomes só entram na hora
+de formatar.
+"""
+from enum import IntEnum
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    from action import Action
+
+
+class OutcomeKind(IntEnum):
+    # Ações
+    INCOME = 0
+    FOREIGN_AID = 1
+    COUP = 2
+    ASSASSINATED = 3
+    ALREADY_ELIMINATED = 4
+    TAX = 5
+    STEAL = 6
+    EXCHANGE = 7
+    NO_TARGET = 8
+    # Desafios
+    NO_CHALLENGE = 9
+    CHALLENGE_FAILED = 10
+    CHALLENGE_SUCCEEDED = 11
+    # Bloqueios
+    NO_BLOCK = 12
+    BLOCKED = 13
+    INVALID_BLOCK = 14
+    # Linhas do histórico
+    COUP_RECORD = 15
+    CHALLENGE_RECORD = 16
+    BLOCK_RECORD = 17
+
+
+_K = OutcomeKind
+
+# Campos disponíveis: actor, target, character, amount, action
+MESSAGES: Dict[OutcomeKind, str] = {
+    _K.INCOME: "{actor} ganhou 1 moeda",
+    _K.FOREIGN_AID: "{actor} recebeu 2 moedas de ajuda externa",
+    _K.COUP: "{actor} aplicou um golpe de estado em {target}",
+    _K.ASSASSINATED: "{actor} assassinou {target}!\n(Pode ser bloqueado pela Condessa)",
+    _K.ALREADY_ELIMINATED: "{target} já está eliminado",
+    _K.TAX: "{actor} coletou impostos como Duque (+3 moedas)",
+    _K.STEAL: "{actor} roubou {amount} moedas de {target}!\n(Pode ser bloqueado pelo Capitão ou Embaixador)",
+    _K.EXCHANGE: "{actor} usou o Embaixador para trocar cartas",
+    _K.NO_TARGET: "Nenhum alvo válido encontrado",
+    _K.NO_CHALLENGE: "Nenhum desafio foi feito",
+    _K.CHALLENGE_FAILED: ("{actor} falhou no desafio e perdeu uma influência!\n"
+                         "{target} realmente tinha {character}."),
+    _K.CHALLENGE_SUCCEEDED: ("{actor} desafiou corretamente! {target} "
+                            "não tinha {character} e perdeu uma influência."),
+    _K.NO_BLOCK: "Nenhum bloqueio foi feito",
+    _K.BLOCKED: "{actor} bloqueou a ação com {character}!\nA ação {action} foi cancelada.",
+    _K.INVALID_BLOCK: "{character} não pode bloquear esta ação!",
+    _K.COUP_RECORD: "{actor} realizou Coup em {target}",
+    _K.CHALLENGE_RECORD: "{actor} desafiou {target} corretamente",
+    _K.BLOCK_RECORD: "{actor} bloqueou a ação com {character}",
+}
+
+
+class Outcome:
+    """Resultado de uma jogada.
+
+    ``actor`` é quem agiu (o desafiante num desafio, quem bloqueia num
+    bloqueio) e ``target`` quem sofreu a jogada, ambos pelo assento
+    (índice em ``GameManager.players``).
+    """
+
+    __slots__ = ("kind", "actor", "target", "character", "amount", "action")
+
+    def __init__(
+        self,
+        kind: OutcomeKind,
+        actor: Optional[int] = None,
+        target: Optional[int] = None,
+        character: Optional[str] = None,
+        amount: int = 0,
+        action: Optional["Action"] = None,
+    ):
+        self.kind = kind
+        self.actor = actor
+        self.target = target
+        self.character = character
+        self.amount = amount
+        self.action = action
+
+    def message(
+        self,
+        names: Optional[Sequence[str]] = None,
+        messages: Optional[Dict[OutcomeKind, str]] = None,
+    ) -> str:
+        """Texto do resultado (por padrão com ``MESSAGES``).
+
+        ``names`` dá o nome de cada assento; sem ele os jogadores aparecem
+        como ``assento N``.
+        """
+        template = (messages or MESSAGES)[self.kind]
+        return template.format(
+            actor=_seat_name(self.actor, names), target=_seat_name(self.target, names),
+            character=self.character, amount=self.amount,
+            action=self.action.__class__.__name__ if self.action is not None else None,
+        )
+
+    def __str__(self) -> str:
+        return self.message()
+
+    def __repr__(self) -> str:
+        return f"Outcome({self.kind.name}, {self.actor!r}, {self.target!r})"
+
+
+def _seat_name(seat: Optional[int], names: Optional[Sequence[str]]) -> Optional[str]:
+    if seat is None:
+        return None
+    return names[seat] if names is not None else f"assento {seat}"
+
+
+def line_text(line: Union[Outcome, str], names: Sequence[str]) -> str:
+    """Texto de uma linha do histórico (``Outcome`` ou texto vindo de um arquivo)."""
+    return line.message(names) if isinstance(line, Outcome) else line
+
+
+# Resultados sem participantes: uma instância só
+NO_CHALLENGE = Outcome(_K.NO_CHALLENGE)
+NO_BLOCK = Outcome(_K.NO_BLOCK)
+NO_TARGET = Outcome(_K.NO_TARGET)
@@ -0,0 +1,226 @@
+"""Persistência write-behind: o estado é marcado como sujo e gravado depois.
+
+Ao fim de cada mutação o jogo chama ``StateWriter.mark_dirty``, que tira
+uma cópia do estado ali mesmo, na thread do jogo; codificar essa cópia e
+gravá-la em disco acontece numa thread em segundo plano conforme a
+``FlushPolicy``. O arquivo só recebe estados tirados nesses pontos, nunca
+um meio-termo de uma alteração em curso.
+Toda gravação é atômica (arquivo temporário + ``os.replace``), então um
+arquivo de estado nunca fica pela metade; só o ``fsync`` é opcional
+(``FlushPolicy(fsync=True)``). Sem política, cada mutação grava na hora.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+class FlushPolicy:
+    """Define quando o estado pendente é gravado.
+
+    Args:
+        every_n: Grava a cada ``every_n`` mutações.
+        interval_ms: Grava no máximo ``interval_ms`` depois da primeira
+            mutação pendente.
+        on_shutdown: Grava o que estiver pendente ao fechar o escritor ou
+            ao encerrar o interpretador.
+        fsync: Força cada gravação para o disco (``os.fsync``) antes do
+            rename; mais lento, mas sobrevive a uma queda do sistema.
+
+    Sem ``every_n`` nem ``interval_ms`` o estado só é gravado em
+    ``flush()``/``close()`` (ou no encerramento, se ``on_shutdown``).
+    """
+
+    def __init__(
+        self,
+        every_n: Optional[int] = None,
+        interval_ms: Optional[int] = None,
+        on_shutdown: bool = True,
+        fsync: bool = False,
+    ):
+        self.every_n = every_n
+        self.interval_ms = interval_ms
+        self.on_shutdown = on_shutdown
+        self.fsync = fsync
+
+    def __repr__(self) -> str:
+        return (f"FlushPolicy(every_n={self.every_n}, interval_ms={self.interval_ms}, "
+                f"on_shutdown={self.on_shutdown}, fsync={self.fsync})")
+
+
+def atomic_write_text(path: str, text: str, fsync: bool = False) -> None:
+    """Grava ``text`` em ``path`` via arquivo temporário e rename."""
+    atomic_write_bytes(path, text.encode("utf-8"), fsync)
+
+
+def atomic_write_bytes(path: str, data: bytes, fsync: bool = False) -> None:
+    """Grava ``data`` em ``path`` via arquivo temporário e rename (com ``fsync``, durável)."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    mode = target.stat().st_mode & 0o777 if target.exists() else 0o644
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        os.chmod(tmp, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def encode_json(data: Any) -> str:
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+# Escritores vivos, para gravar o pendente quando o processo termina.
+_live_writers: "weakref.WeakSet[StateWriter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_on_exit() -> None:
+    for writer in list(_live_writers):
+        writer.close()
+
+
+class StateWriter:
+    """Grava o estado devolvido por ``snapshot`` em ``path``.
+
+    Sem política (``policy=None``) cada ``mark_dirty`` grava na hora, de
+    forma síncrona (sem ``fsync``). Com política, as gravações saem de uma
+    thread própria. As duas são atômicas.
+
+    ``snapshot`` roda dentro de ``mark_dirty``, na thread que altera o
+    estado, e deve devolver uma cópia (barata) do estado, não referências
+    às listas que o jogo continua modificando; ``encode`` transforma essa
+    cópia em texto na thread do escritor.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        snapshot: Callable[[], Any],
+        policy: Optional[FlushPolicy] = None,
+        encode: Callable[[Any], str] = encode_json,
+    ):
+        self._path = path
+        self._snapshot = snapshot
+        self._policy = policy
+        self._encode = encode
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending = 0
+        self._state: Any = None  # última cópia de ``snapshot`` ainda não gravada
+        self._dirty_since: Optional[float] = None
+        self._closed = False
+        self._writes = 0
+        self._thread: Optional[threading.Thread] = None
+
+        if policy is not None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"StateWriter({Path(path).name})", daemon=True
+            )
+            self._thread.start()
+            if policy.on_shutdown:
+                _live_writers.add(self)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def pending(self) -> int:
+        """Mutações ainda não gravadas."""
+        return self._pending
+
+    @property
+    def writes(self) -> int:
+        """Quantas vezes o arquivo foi regravado."""
+        return self._writes
+
+    def mark_dirty(self) -> None:
+        """Registra uma mutação e copia o estado; a gravação segue a política configurada."""
+        state = self._snapshot()
+        if self._policy is None:
+            self._state = state
+            self._pending += 1
+            self._write()
+            return
+        with self._cond:
+            self._state = state
+            self._pending += 1
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            if self._policy.every_n and self._pending >= self._policy.every_n:
+                self._cond.notify()
+            elif self._pending == 1 and self._policy.interval_ms is not None:
+                self._cond.notify()
+
+    def flush(self) -> None:
+        """Grava imediatamente o que estiver pendente."""
+        with self._cond:
+            if not self._pending:
+                return
+        self._write()
+
+    def close(self) -> None:
+        """Para a thread e grava o pendente se a política pedir."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        _live_writers.discard(self)
+        if self._policy is None or self._policy.on_shutdown:
+            self.flush()
+
+    # ------------------------------------------------------------------
+    def _due_in(self) -> Optional[float]:
+        """Segundos até a próxima gravação (0 = já), ou None se não há prazo."""
+        if not self._pending:
+            return None
+        policy = self._policy
+        if policy.every_n and self._pending >= policy.every_n:
+            return 0.0
+        if policy.interval_ms is not None:
+            deadline = self._dirty_since + policy.interval_ms / 1000
+            return max(0.0, deadline - time.monotonic())
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    due = self._due_in()
+                    if due == 0.0:
+                        break
+                    self._cond.wait(due)
+                if self._closed:
+                    return
+            self._write()
+
+    def _write(self) -> None:
+        with self._io_lock:
+            with self._cond:
+                state, self._state = self._state, None
+                self._pending = 0
+                self._dirty_since = None
+            if state is None:
+                return
+            try:
+                fsync = self._policy is not None and self._policy.fsync
+                atomic_write_text(self._path, self._encode(state), fsync)
+                self._writes += 1
+            except Exception as e:
+                print(f"Erro ao salvar {self._path}: {e}")
@@ -1,14 +1,38 @@
-from action import Action, CoupAction
-from typing import List, Dict, Type
+from action import Action
+from beliefs import hand_distribution, unseen_cards
+from cards import SHIFT, character_bit, names, pack
+from moves import ACTIONS, COUP
+from outcomes import Outcome
+from zobrist import SeatKeys, seat_keys
+from typing import TYPE_CHECKING, Iterable, List, Dict, Optional, Tuple, Type
 
+import copy
 import random
 
+if TYPE_CHECKING:
+    from beliefs import BeliefTracker
+    from endgame import Tablebase
+
 class Player:
+    """Jogador: moedas e mão.
+
+    A mão e as cartas viradas (influências perdidas, visíveis a todos) são
+    inteiros com a contagem de cada personagem (``cards.py``);
+    ``characters`` e ``revealed`` os mostram como nomes, em ordem de
+    personagem.
+    """
+
+    __slots__ = ("_name", "_coins", "_hand", "_revealed", "_alive", "_zkeys", "_zhash")
+
     def __init__(self, name: str):
         self._name = name
         self._coins = 0
-        self._characters: List[str] = []
+        self._hand = 0
+        self._revealed = 0
         self._alive = True
+        # Chaves de Zobrist do assento (``zobrist.py``), ligadas pelo GameManager
+        self._zkeys: Optional[SeatKeys] = None
+        self._zhash = 0
     
     @property
     def name(self) -> str:
@@ -20,27 +44,88 @@ class Player:
     
     @coins.setter
     def coins(self, value: int) -> None:
-        self._coins = max(0, value)
+        value = max(0, value)
+        keys = self._zkeys
+        if keys is not None:
+            self._zhash ^= keys.coin(self._coins) ^ keys.coin(value)
+        self._coins = value
     
     @property
-    def characters(self) -> list:
-        return self._characters
+    def characters(self) -> Tuple[str, ...]:
+        return names(self._hand)
+
+    @property
+    def revealed(self) -> Tuple[str, ...]:
+        """Cartas viradas para cima (influências perdidas)."""
+        return names(self._revealed)
+
+    @property
+    def hand(self) -> int:
+        """Mão empacotada (contagem por personagem, ver ``cards.py``)."""
+        return self._hand
     
     @property
     def is_alive(self) -> bool:
         return self._alive
 
+    @property
+    def zobrist(self) -> int:
+        """Hash de Zobrist do assento (moedas, mão e viradas); 0 antes de ``bind_zobrist``."""
+        return self._zhash
+
+    @property
+    def seat(self) -> Optional[int]:
+        """Assento na mesa (índice em ``GameManager.players``); None antes de ``bind_zobrist``."""
+        return self._zkeys.seat if self._zkeys is not None else None
+
+    def bind_zobrist(self, seat: int) -> None:
+        """Liga o jogador às chaves de ``seat`` e calcula o hash (feito pelo ``GameManager``)."""
+        self._zkeys = seat_keys(seat)
+        self._rehash()
+
+    def _rehash(self) -> None:
+        keys = self._zkeys
+        if keys is not None:
+            self._zhash = keys.player(self._coins, self._hand, self._revealed)
+
     def add_character(self, character: str) -> None:
         """Adiciona uma nova carta de personagem ao jogador"""
-        self._characters.append(character)
+        shift = SHIFT[character]
+        self._hand += 1 << shift
+        keys = self._zkeys
+        if keys is not None:
+            # Chave da n-ésima cópia do personagem (``SeatKeys.hand``)
+            self._zhash ^= keys.hand[(shift << 2) + (self._hand >> shift & 15)]
+
+    def set_cards(self, characters: Iterable[str], revealed: Iterable[str] = ()) -> None:
+        """Troca a mão e as cartas viradas (ao carregar um estado salvo)."""
+        self._hand = pack(characters)
+        self._revealed = pack(revealed)
+        self._rehash()
     
     def lose_influence(self) -> None:
-        if self.characters:
-            self._characters.pop()
-            if not self.characters:
+        """Vira a última carta da mão (a do maior personagem)."""
+        if self._hand:
+            shift = (self._hand.bit_length() - 1) & ~3  # ``cards.last_bit``
+            keys = self._zkeys
+            if keys is not None:
+                i = shift << 2
+                self._zhash ^= (keys.hand[i + (self._hand >> shift & 15)]
+                                ^ keys.revealed[i + (self._revealed >> shift & 15) + 1])
+            bit = 1 << shift
+            self._hand -= bit
+            self._revealed += bit
+            if not self._hand:
                 self._alive = False
+
+    def replace_lost(self, lost: str, instead: str) -> None:
+        """A última influência perdida foi ``instead``, não ``lost``: corrige a mão."""
+        lost_bit, instead_bit = character_bit(lost), character_bit(instead)
+        self._hand += lost_bit - instead_bit
+        self._revealed += instead_bit - lost_bit
+        self._rehash()
     
-    def perform_action(self, action: Action, target=None, game_manager=None) -> None:
+    def perform_action(self, action: Action, target=None, game_manager=None) -> Optional[Outcome]:
         """Executa uma ação descontando o custo."""
         if self.coins >= action.cost:
             self.coins -= action.cost
@@ -48,31 +133,47 @@ class Player:
 
     def has_character(self, character_name: str) -> bool:
         """Verifica se o jogador tem um determinado personagem"""
-        # Em uma implementação real, isso verificaria as cartas do jogador
-        # Aqui vamos simular que tem 50% de chance para testes
-        import random
-        return random.choice([True, False])
+        return self._hand >> SHIFT[character_name] & 15 != 0
 
     def choose_blocking_character(self, action: Action) -> str:
         """Escolhe um personagem para bloquear uma ação, se possível"""
-        for character in self._characters:
+        for character in self.characters:
             if character in action.blockable_by:
                 return character
         return action.blockable_by[0] if action.blockable_by else ""
 
-    def wants_to_challenge(self) -> bool:
+    def choose_target(self, valid_targets: List['Player']) -> 'Player':
+        """Escolhe o alvo de uma ação entre os oponentes vivos."""
+        return random.choice(valid_targets)
+
+    def choose_influence_to_lose(self, options: Tuple[str, ...]) -> str:
+        """Escolhe a carta entregue ao perder uma influência (padrão: a última)."""
+        return options[-1]
+
+    # Os ganchos de reação recebem o contexto da jogada: a ação, quem a
+    # declarou, o alvo (se houver) e a mesa inteira. Jogadores simples
+    # podem ignorá-lo.
+    def wants_to_challenge(
+        self,
+        action: Optional[Action] = None,
+        actor: Optional['Player'] = None,
+        target: Optional['Player'] = None,
+        players: Optional[List['Player']] = None,
+    ) -> bool:
         return False
 
-    def wants_to_block(self) -> bool:
+    def wants_to_block(
+        self,
+        action: Optional[Action] = None,
+        actor: Optional['Player'] = None,
+        target: Optional['Player'] = None,
+        players: Optional[List['Player']] = None,
+    ) -> bool:
         return False
     
     def can_block(self, action: Action) -> bool:
         """Verifica se o jogador pode bloquear uma ação"""
-        # Verifica se tem algum personagem que pode bloquear esta ação
-        for character in action.blockable_by:
-            if self.has_character(character):
-                return True
-        return False
+        return self._hand & action.block_mask != 0
 
     # --- Persistência -----------------------------------------------------
     def to_dict(self) -> Dict:
@@ -80,22 +181,45 @@ class Player:
         return {
             "name": self._name,
             "coins": self._coins,
-            "characters": self._characters,
+            "characters": list(self.characters),
+            "revealed": list(self.revealed),
             "alive": self._alive,
             "type": self.__class__.__name__,
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, any]) -> 'Player':
-        """Cria um jogador a partir de um dicionário salvo."""
-        player_class: Type[Player] = HumanPlayer if data.get("type") == "HumanPlayer" else AIPlayer
+        """Cria um jogador a partir de um dicionário salvo.
+
+        Chamado numa subclasse (``RemotePlayer.from_dict``), cria uma
+        instância dela; em ``Player`` escolhe entre humano e IA pelo tipo.
+        """
+        if data.get("type") == "HumanPlayer":
+            player_class: Type[Player] = HumanPlayer
+        else:
+            player_class = AIPlayer if cls is Player else cls
         player = player_class(data.get("name", "Jogador"))
         player._coins = data.get("coins", 0)
-        player._characters = data.get("characters", [])
+        player.set_cards(data.get("characters", []), data.get("revealed", []))
         player._alive = data.get("alive", True)
         return player
 
+    # --- Snapshots em memória ---------------------------------------------
+    def snapshot(self) -> Tuple[int, int, int, bool, int]:
+        """Estado mutável do jogador (moedas, mão, viradas, vivo, hash) como tupla imutável."""
+        return self._coins, self._hand, self._revealed, self._alive, self._zhash
+
+    def restore(self, state: Tuple[int, int, int, bool, int]) -> None:
+        """Volta ao estado devolvido por ``snapshot``."""
+        self._coins, self._hand, self._revealed, self._alive, self._zhash = state
+
+    def clone(self) -> 'Player':
+        """Cópia independente do jogador (mesma classe, mesma configuração)."""
+        return copy.copy(self)
+
 class HumanPlayer(Player):
+    __slots__ = ()
+
     def choose_action(self, available_actions: list, players: list) -> Action:
         """Solicita ao usuário qual ação deseja executar."""
         print("\nEscolha uma ação:")
@@ -104,30 +228,100 @@ class HumanPlayer(Player):
         choice = int(input("Sua escolha: ")) - 1
         return available_actions[choice]
 
-    def wants_to_challenge(self) -> bool:
-        answer = input("Deseja desafiar? (s/n): ").lower()
+    def choose_target(self, valid_targets: List['Player']) -> 'Player':
+        """Solicita ao usuário o alvo da ação."""
+        print("\nEscolha um alvo:")
+        for i, target in enumerate(valid_targets, 1):
+            print(f"{i}. {target.name}")
+        choice = int(input("Sua escolha: ")) - 1
+        return valid_targets[choice]
+
+    def choose_influence_to_lose(self, options: Tuple[str, ...]) -> str:
+        """Solicita ao usuário a carta que vai perder."""
+        print(f"\n{self.name}, escolha a carta que vai perder:")
+        for i, character in enumerate(options, 1):
+            print(f"{i}. {character}")
+        choice = int(input("Sua escolha: ")) - 1
+        return options[choice]
+
+    def wants_to_challenge(self, action=None, actor=None, target=None, players=None) -> bool:
+        answer = input(f"{self.name}, deseja desafiar? (s/n): ").lower()
         return answer == 's'
 
-    def wants_to_block(self) -> bool:
-        answer = input("Deseja bloquear? (s/n): ").lower()
+    def wants_to_block(self, action=None, actor=None, target=None, players=None) -> bool:
+        answer = input(f"{self.name}, deseja bloquear? (s/n): ").lower()
         return answer == 's'
 
 class AIPlayer(Player):
+    """IA simples; com um ``BeliefTracker`` (``beliefs.py``) desafia só o que
+    é improvável e bloqueia pelo que sabe do ator em vez de decidir ao
+    acaso, e com uma ``Tablebase``
+    (``endgame.py``) escolhe as ações do mano a mano pela tabela de finais."""
+
+    __slots__ = ("beliefs", "endgame")
+
+    # Desafia declarações com chance menor que esta
+    CHALLENGE_BELOW = 0.3
+    # Não bloqueia por outro jogador declarações com chance maior que esta
+    BLOCK_BELOW = 0.9
+
+    def __init__(self, name: str, beliefs: Optional['BeliefTracker'] = None,
+                 endgame: Optional['Tablebase'] = None):
+        super().__init__(name)
+        self.beliefs = beliefs
+        self.endgame = endgame
+
     def choose_action(self, available_actions: list, players: list) -> Action:
         """Escolhe uma ação de maneira simples."""
         from random import choice
 
+        if self.endgame is not None:
+            action = self._endgame_action(players)
+            if action is not None and action in available_actions:
+                return action
+
         if self.coins >= 7 and random.random() < 0.8:
-            return CoupAction()
+            return ACTIONS[COUP]
 
         return choice(available_actions)
 
-    def wants_to_challenge(self) -> bool:
-        return random.random() < 0.1
+    def _endgame_action(self, players: list) -> Optional[Action]:
+        """Ação da tabela de finais, ponderando as mãos possíveis do oponente."""
+        alive = [p for p in players if p.is_alive]
+        if len(alive) != 2 or self not in alive or len(self.characters) > 2:
+            return None
+        opponent = alive[1] if alive[0] is self else alive[0]
+        if self.beliefs is not None:
+            hands = self.beliefs.hand_distribution(opponent)
+        else:
+            hands = hand_distribution(unseen_cards(players, self), len(opponent.characters))
+        best = self.endgame.choose(self._hand, hands, self._coins, opponent.coins)
+        return ACTIONS[best] if best is not None else None
+
+    def wants_to_challenge(self, action=None, actor=None, target=None, players=None) -> bool:
+        if self.beliefs is None or action is None or actor is None:
+            return random.random() < 0.1
+        return self.beliefs.probability(actor, action.requirement) < self.CHALLENGE_BELOW
+
+    def wants_to_block(self, action=None, actor=None, target=None, players=None) -> bool:
+        if self.beliefs is None or action is None or actor is None:
+            return random.random() < 0.2
+        if target is self:
+            return True  # quem é perguntado tem a carta: defender-se sempre vale
+        if not action.requirement:
+            return random.random() < 0.2
+        # Bloquear por outro declara nosso personagem à mesa; contra uma
+        # declaração quase certa o ator repete a ação depois de qualquer jeito
+        return self.beliefs.probability(actor, action.requirement) < self.BLOCK_BELOW
 
-    def wants_to_block(self) -> bool:
-        return random.random() < 0.2
+    def clone(self) -> 'AIPlayer':
+        """Cópia independente; o ``BeliefTracker`` também é copiado, com a cópia
+        como observadora (``GameManager.clone`` troca os demais jogadores)."""
+        twin = copy.copy(self)
+        if self.beliefs is not None:
+            twin.beliefs = self.beliefs.clone({self: twin})
+        return twin
 
     def choose_blocking_character(self, action: Action) -> str:
-        options = [c for c in self._characters if c in action.blockable_by]
+        options = [c for c in self.characters if c in action.blockable_by]
         return random.choice(options) if options else ""
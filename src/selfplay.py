@@ -0,0 +1,627 @@
+"""Treino por auto-jogo de políticas aprendidas para as IAs.
+
+O ``PolicyPlayer`` troca as probabilidades fixas do ``AIPlayer`` (Coup
+com 80%, desafio com 10%, bloqueio com 20%) por uma política linear
+(softmax) em NumPy, treinada jogando contra si mesma:
+
+- Cada decisão (ação com alvo, desafiar ou não, bloquear ou não) é uma
+  jogada num espaço único: as de ``moves.encode_move`` mais quatro
+  respostas sim/não. A observação é um vetor fixo visto do assento de
+  quem decide (assentos relativos, só o que é público mais a própria mão)
+  e a máscara diz quais jogadas são legais ali.
+- Processos trabalhadores jogam partidas com a política publicada mais
+  recente e gravam as trajetórias (observação, máscara, jogada, resultado)
+  em shards binários, avisando o aprendiz por uma fila limitada.
+- O aprendiz lê cada shard via ``mmap``, faz um passo de gradiente de
+  política (REINFORCE: +1 para o vencedor, -1/(P-1) para os demais, soma
+  zero por partida) e publica pesos novos a cada ``publish_every``
+  passos, num arquivo gravado atomicamente que os trabalhadores releem
+  entre shards.
+
+Os trabalhadores não compartilham nada além do arquivo de pesos, então a
+taxa de amostras cresce com o número de processos até o aprendiz (um
+produto de matrizes por shard) virar o gargalo; ``--scaling`` mede isso.
+
+Uso:
+    python -m src.selfplay --samples 2000000 --workers 8 --output data/policy.bin
+    python -m src.selfplay --samples 2000000 --workers 8 --games-per-shard 64 --concurrent 64
+    python -m src.selfplay --scaling 1,2,4,8 --samples 200000
+    python -m src.selfplay --evaluate 2000 --output data/policy.bin
+"""
+import argparse
+import mmap
+import multiprocessing
+import os
+import queue
+import random
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from action import Action
+from cards import CHARACTERS, HAND_BITS
+from Deck import Deck
+from game_manager import GameManager
+from moves import ACTIONS, NUM_ACTIONS, action_id, decode_move, legal_move_mask, legal_moves, move_count
+from persistence import atomic_write_bytes
+from player import AIPlayer, Player
+
+# Tipos de decisão (parte da observação)
+ACT, CHALLENGE, BLOCK = range(3)
+MAX_COINS = 12  # escala das moedas na observação
+
+
+def num_moves(num_seats: int) -> int:
+    """Ações com alvo (``moves.move_count``) mais não/sim de desafio e de bloqueio."""
+    return move_count(num_seats) + 4
+
+
+def num_features(num_seats: int) -> int:
+    """Por assento relativo: moedas, cartas ocultas, viradas (5) e vivo; depois
+    a própria mão, o tipo de decisão, a ação declarada, quem a declarou e se
+    quem decide é o alvo."""
+    return num_seats * (3 + len(CHARACTERS)) + len(CHARACTERS) + 3 + NUM_ACTIONS + num_seats + 1
+
+
+def action_moves(players: Sequence[Player], seat: int) -> Tuple[int, Sequence[int]]:
+    """Máscara e lista das ações legais de ``players[seat]``, com alvos em assentos relativos."""
+    n = len(players)
+    opponents = 0
+    for r in range(1, n):
+        if players[(seat + r) % n].is_alive:
+            opponents |= 1 << r
+    coins = players[seat].coins
+    return legal_move_mask(coins, opponents, n), legal_moves(coins, opponents, n)
+
+
+def reaction_moves(kind: int, num_seats: int) -> Tuple[int, int]:
+    """Jogadas "não" e "sim" de uma reação (``CHALLENGE`` ou ``BLOCK``)."""
+    no = move_count(num_seats) + 2 * (kind - CHALLENGE)
+    return no, no + 1
+
+
+def raw_observation(players: Sequence[Player], seat: int, kind: int, action: Optional[Action] = None,
+                    actor: Optional[Player] = None, target: Optional[Player] = None) -> Tuple[int, ...]:
+    """Inteiros que ``featurize`` transforma na observação de ``players[seat]``.
+
+    Por assento relativo: moedas, cartas ocultas, viradas (empacotadas) e
+    vivo; depois a própria mão (empacotada), ``kind``, a ação declarada,
+    quem a declarou (assento relativo; -1 se nada) e se o alvo é quem decide.
+    """
+    n = len(players)
+    row: List[int] = []
+    for r in range(n):
+        p = players[(seat + r) % n]
+        # Soma das contagens de 4 bits da mão: 16 ≡ 1 (mod 15)
+        row += (p._coins, p._hand % 15, p._revealed, p._alive)
+    row += (players[seat]._hand, kind,
+            action_id(action) if action is not None else -1,
+            (players.index(actor) - seat) % n if actor is not None else -1,
+            target is players[seat])
+    return tuple(row)
+
+
+_SHIFTS = HAND_BITS * np.arange(len(CHARACTERS))
+
+
+def featurize(raw: Sequence[Sequence[int]], num_seats: int) -> np.ndarray:
+    """Observações [B, ``num_features``] de um lote de ``raw_observation``, vetorizado."""
+    rows = np.asarray(raw, dtype=np.int64).reshape(-1, 4 * num_seats + 5)
+    b = len(rows)
+    c = len(CHARACTERS)
+    seats = rows[:, :4 * num_seats].reshape(b, num_seats, 4)
+    block = np.empty((b, num_seats, 3 + c), dtype=np.float32)
+    block[:, :, 0] = np.minimum(seats[:, :, 0], MAX_COINS) / MAX_COINS
+    block[:, :, 1] = seats[:, :, 1] / 2
+    block[:, :, 2:2 + c] = (seats[:, :, 2, None] >> _SHIFTS & 15) / 2
+    block[:, :, 2 + c] = seats[:, :, 3]
+    out = np.zeros((b, num_features(num_seats)), dtype=np.float32)
+    base = num_seats * (3 + c)
+    out[:, :base] = block.reshape(b, base)
+    tail = rows[:, 4 * num_seats:]
+    out[:, base:base + c] = tail[:, 0, None] >> _SHIFTS & 15
+    base += c
+    index = np.arange(b)
+    out[index, base + tail[:, 1]] = 1.0
+    for column, offset in ((2, base + 3), (3, base + 3 + NUM_ACTIONS)):
+        present = tail[:, column] >= 0
+        out[index[present], offset + tail[present, column]] = 1.0
+    out[:, -1] = tail[:, 4]
+    return out
+
+
+def observe(players: Sequence[Player], seat: int, kind: int, action: Optional[Action] = None,
+            actor: Optional[Player] = None, target: Optional[Player] = None) -> np.ndarray:
+    """Observação de ``players[seat]`` para uma decisão do tipo ``kind``.
+
+    Mesmo resultado que ``featurize`` sobre ``raw_observation``, mas em
+    Python puro, que para uma decisão só é mais rápido que montar arrays.
+    """
+    n = len(players)
+    features: List[float] = []
+    for r in range(n):
+        p = players[(seat + r) % n]
+        revealed = p._revealed
+        features.append(min(p._coins, MAX_COINS) / MAX_COINS)
+        features.append(p._hand % 15 / 2)  # cartas ocultas, como em ``raw_observation``
+        features.extend((revealed >> (HAND_BITS * c) & 15) / 2 for c in range(len(CHARACTERS)))
+        features.append(1.0 if p._alive else 0.0)
+    hand = players[seat]._hand
+    features.extend(hand >> (HAND_BITS * c) & 15 for c in range(len(CHARACTERS)))
+    context = [0.0] * (3 + NUM_ACTIONS + n + 1)
+    context[kind] = 1.0
+    if action is not None:
+        context[3 + action_id(action)] = 1.0
+    if actor is not None:
+        context[3 + NUM_ACTIONS + (players.index(actor) - seat) % n] = 1.0
+    if target is players[seat]:
+        context[-1] = 1.0
+    features.extend(context)
+    return np.array(features, dtype=np.float32)
+
+
+def resolve_action(move: int, players: Sequence[Player], seat: int) -> Tuple[Action, Optional[Player]]:
+    """Ação e alvo (jogador) de uma jogada de ``action_moves``."""
+    n = len(players)
+    aid, rel = decode_move(move, n)
+    return ACTIONS[aid], (players[(seat + rel) % n] if rel is not None else None)
+
+
+# --- Política ------------------------------------------------------------------
+POLICY_MAGIC = b"CPPL"
+POLICY_FORMAT = 1
+# magic, formato, assentos, atributos, jogadas, versão da política
+POLICY_HEADER = struct.Struct("<4sHHIII")
+
+
+class LinearPolicy:
+    """Softmax linear sobre as jogadas legais: ``logits = obs @ weights + bias``.
+
+    Args:
+        num_seats: Tamanho da mesa (fixa o formato da observação e das jogadas).
+        version: Número da publicação (cresce a cada ``publish``).
+    """
+
+    __slots__ = ("num_seats", "weights", "bias", "version")
+
+    def __init__(self, num_seats: int, weights: Optional[np.ndarray] = None,
+                 bias: Optional[np.ndarray] = None, version: int = 0):
+        self.num_seats = num_seats
+        shape = (num_features(num_seats), num_moves(num_seats))
+        self.weights = weights if weights is not None else np.zeros(shape, dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(shape[1], dtype=np.float32)
+        self.version = version
+
+    def choose(self, obs: np.ndarray, moves: Sequence[int]) -> int:
+        """Sorteia uma jogada entre ``moves`` (legais) pela softmax."""
+        if len(moves) == 1:
+            return moves[0]
+        idx = list(moves)  # uma tupla indexaria várias dimensões
+        logits = obs @ self.weights[:, idx] + self.bias[idx]
+        weights = np.exp(logits - logits.max())
+        r = random.random() * float(weights.sum())
+        for move, w in zip(moves, weights.tolist()):
+            r -= w
+            if r <= 0:
+                return move
+        return moves[-1]
+
+    def update(self, obs: np.ndarray, masks: np.ndarray, moves: np.ndarray, returns: np.ndarray,
+               lr: float = 0.05, entropy: float = 0.01) -> Dict[str, float]:
+        """Um passo de REINFORCE (com bônus de entropia) sobre um lote."""
+        logits = obs @ self.weights + self.bias
+        logits = np.where(masks, logits, -np.inf)
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        rows = np.arange(len(moves))
+        logp = np.where(masks, np.log(np.maximum(probs, 1e-12)), 0.0)
+        h = -(probs * logp).sum(axis=1)
+        # d/dlogits de ret * log p(jogada) + entropy * H
+        grad = -probs * returns[:, None]
+        grad[rows, moves] += returns
+        grad -= entropy * probs * (logp + h[:, None])
+        grad /= len(moves)
+        self.weights += lr * (obs.T @ grad).astype(np.float32)
+        self.bias += lr * grad.sum(axis=0).astype(np.float32)
+        return {"entropy": float(h.mean()), "logp": float(logp[rows, moves].mean())}
+
+    def to_bytes(self) -> bytes:
+        f, m = self.weights.shape
+        return (POLICY_HEADER.pack(POLICY_MAGIC, POLICY_FORMAT, self.num_seats, f, m, self.version)
+                + self.weights.astype("<f4").tobytes() + self.bias.astype("<f4").tobytes())
+
+    def publish(self, path: str) -> None:
+        """Grava a política atomicamente (quem lê nunca vê um arquivo pela metade)."""
+        atomic_write_bytes(path, self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "LinearPolicy":
+        data = Path(path).read_bytes()
+        magic, fmt, seats, f, m, version = POLICY_HEADER.unpack_from(data, 0)
+        if magic != POLICY_MAGIC:
+            raise ValueError(f"Arquivo não é uma política do Coup: {path}")
+        if fmt != POLICY_FORMAT:
+            raise ValueError(f"Formato de política não suportado: {fmt}")
+        if (f, m) != (num_features(seats), num_moves(seats)):
+            raise ValueError(f"Política com formato de observação diferente: {path}")
+        offset = POLICY_HEADER.size
+        weights = np.frombuffer(data, "<f4", f * m, offset).reshape(f, m).copy()
+        bias = np.frombuffer(data, "<f4", m, offset + 4 * f * m).copy()
+        return cls(seats, weights, bias, version)
+
+
+def published_version(path: str) -> int:
+    """Versão da política em ``path`` lendo só o cabeçalho (-1 se não existe)."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(POLICY_HEADER.size)
+    except FileNotFoundError:
+        return -1
+    return POLICY_HEADER.unpack(header)[5] if len(header) == POLICY_HEADER.size else -1
+
+
+# --- Jogador ----------------------------------------------------------------------
+class PolicyPlayer(AIPlayer):
+    """IA que decide ação, alvo, desafios e bloqueios pela ``LinearPolicy``.
+
+    Com ``record=True`` guarda cada decisão em ``trajectory`` como
+    (observação, bitmask das jogadas legais, jogada).
+    """
+
+    __slots__ = ("policy", "trajectory", "_record", "_target")
+
+    def __init__(self, name: str, policy: LinearPolicy, record: bool = False):
+        super().__init__(name)
+        self.policy = policy
+        self.trajectory: List[Tuple[np.ndarray, int, int]] = []
+        self._record = record
+        self._target: Optional[Player] = None
+
+    @property
+    def recording(self) -> bool:
+        return self._record
+
+    def remember(self, obs: np.ndarray, mask: int, move: int) -> None:
+        """Anota uma decisão na trajetória (se gravando); usado também pelo ``PolicyBatcher``."""
+        if self._record:
+            self.trajectory.append((obs, mask, move))
+
+    def _decide(self, obs: np.ndarray, mask: int, moves: Sequence[int]) -> int:
+        move = self.policy.choose(obs, moves)
+        self.remember(obs, mask, move)
+        return move
+
+    def choose_action(self, available_actions: list, players: list) -> Action:
+        seat = players.index(self)
+        mask, moves = action_moves(players, seat)
+        move = self._decide(observe(players, seat, ACT), mask, moves)
+        action, self._target = resolve_action(move, players, seat)
+        return action
+
+    def choose_target(self, valid_targets: List[Player]) -> Player:
+        target, self._target = self._target, None
+        return target if target in valid_targets else random.choice(valid_targets)
+
+    def _yes_no(self, kind: int, action, actor, target, players) -> bool:
+        if action is None or players is None:
+            return super().wants_to_challenge() if kind == CHALLENGE else super().wants_to_block()
+        no, yes = reaction_moves(kind, len(players))
+        obs = observe(players, players.index(self), kind, action, actor, target)
+        return self._decide(obs, 1 << no | 1 << yes, (no, yes)) == yes
+
+    def wants_to_challenge(self, action=None, actor=None, target=None, players=None) -> bool:
+        return self._yes_no(CHALLENGE, action, actor, target, players)
+
+    def wants_to_block(self, action=None, actor=None, target=None, players=None) -> bool:
+        return self._yes_no(BLOCK, action, actor, target, players)
+
+
+# --- Shards de trajetórias -------------------------------------------------------
+SHARD_MAGIC = b"CPSP"
+SHARD_FORMAT = 1
+# magic, formato, assentos, atributos, jogadas, amostras, partidas, versão da política
+SHARD_HEADER = struct.Struct("<4sHHIIIII")
+
+
+def _mask_bytes(num_seats: int) -> int:
+    return (num_moves(num_seats) + 7) // 8
+
+
+def encode_shard(num_seats: int, steps: List[Tuple[np.ndarray, int, int, float]],
+                 games: int, policy_version: int) -> bytes:
+    """Shard com ``steps`` (observação, máscara, jogada, retorno).
+
+    Layout: cabeçalho | observações float32 [N, F] | máscaras em bits
+    [N, ceil(M / 8)] | jogadas uint16 [N] | retornos float32 [N].
+    """
+    f, m, mb = num_features(num_seats), num_moves(num_seats), _mask_bytes(num_seats)
+    n = len(steps)
+    obs = np.empty((n, f), dtype="<f4")
+    masks = bytearray(n * mb)
+    moves = np.empty(n, dtype="<u2")
+    returns = np.empty(n, dtype="<f4")
+    for i, (o, mask, move, ret) in enumerate(steps):
+        obs[i] = o
+        masks[i * mb:(i + 1) * mb] = mask.to_bytes(mb, "little")
+        moves[i] = move
+        returns[i] = ret
+    header = SHARD_HEADER.pack(SHARD_MAGIC, SHARD_FORMAT, num_seats, f, m, n, games, policy_version)
+    return header + obs.tobytes() + bytes(masks) + moves.tobytes() + returns.tobytes()
+
+
+def read_shard(path: str) -> Dict:
+    """Lê um shard via ``mmap``; as máscaras voltam como matriz booleana [N, M]."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, fmt, seats, f_, m, n, games, version = SHARD_HEADER.unpack_from(data, 0)
+        if magic != SHARD_MAGIC:
+            raise ValueError(f"Arquivo não é um shard de auto-jogo: {path}")
+        if fmt != SHARD_FORMAT:
+            raise ValueError(f"Formato de shard não suportado: {fmt}")
+        mb = (m + 7) // 8
+        offset = SHARD_HEADER.size
+        obs = np.frombuffer(data, "<f4", n * f_, offset).reshape(n, f_).copy()
+        offset += 4 * n * f_
+        # Só cópias saem daqui: o mmap não fecha com views vivas
+        masks = np.unpackbits(np.frombuffer(data, np.uint8, n * mb, offset).reshape(n, mb),
+                              axis=1, count=m, bitorder="little").astype(bool)
+        offset += n * mb
+        moves = np.frombuffer(data, "<u2", n, offset).astype(np.intp)
+        offset += 2 * n
+        returns = np.frombuffer(data, "<f4", n, offset).copy()
+    return {"num_seats": seats, "samples": n, "games": games, "policy_version": version,
+            "obs": obs, "masks": masks, "moves": moves, "returns": returns}
+
+
+def play_games(policy: LinearPolicy, games: int, max_turns: int = 1000, concurrent: int = 1
+               ) -> Tuple[List[Tuple[np.ndarray, int, int, float]], int]:
+    """Joga ``games`` partidas da política contra si mesma; devolve os passos com retorno.
+
+    Com ``concurrent > 1`` as partidas andam juntas e as decisões são
+    avaliadas em lote (``batcher.PolicyBatcher``).
+    """
+    num_seats = policy.num_seats
+    loss = -1.0 / (num_seats - 1)
+
+    def players_for_game() -> List[Player]:
+        return [PolicyPlayer(f"Bot {i + 1}", policy, record=True) for i in range(num_seats)]
+
+    results: List[Tuple[List[Player], Optional[Player]]] = []
+    if concurrent > 1:
+        import asyncio
+        from batcher import PolicyBatcher, play_concurrent
+
+        batcher = PolicyBatcher(policy, max_batch=concurrent, seed=random.getrandbits(32))
+        results = asyncio.run(play_concurrent(batcher, players_for_game, games, concurrent, max_turns))
+    else:
+        for _ in range(games):
+            players = players_for_game()
+            game = GameManager(players, state_file=None, deck=Deck(None))
+            turns = 0
+            while not game.is_game_over and turns < max_turns:
+                game.play_turn()
+                turns += 1
+            results.append((players, game.winner))
+    steps: List[Tuple[np.ndarray, int, int, float]] = []
+    for players, winner in results:
+        for p in players:
+            ret = 0.0 if winner is None else (1.0 if p is winner else loss)
+            steps.extend((obs, mask, move, ret) for obs, mask, move in p.trajectory)
+    return steps, games
+
+
+# --- Trabalhadores e aprendiz --------------------------------------------------------
+def _worker(worker_id: int, directory: str, policy_path: str, games_per_shard: int, concurrent: int,
+            seed: int, shards: "multiprocessing.Queue", stop: "multiprocessing.Event") -> None:
+    """Joga com a política publicada mais recente e grava shards até ``stop``."""
+    random.seed(seed)
+    policy: Optional[LinearPolicy] = None
+    seq = 0
+    while not stop.is_set():
+        if policy is None or published_version(policy_path) != policy.version:
+            policy = LinearPolicy.load(policy_path)
+        start = time.perf_counter()
+        steps, games = play_games(policy, games_per_shard, concurrent=concurrent)
+        path = os.path.join(directory, f"shard-{worker_id:03d}-{seq:06d}.bin")
+        atomic_write_bytes(path, encode_shard(policy.num_seats, steps, games, policy.version))
+        seq += 1
+        message = (path, len(steps), time.perf_counter() - start)
+        while not stop.is_set():
+            try:
+                shards.put(message, timeout=0.2)
+                break
+            except queue.Full:
+                continue
+
+
+def train(
+    output: str,
+    samples: int,
+    workers: int = 1,
+    num_players: int = 4,
+    games_per_shard: int = 20,
+    concurrent: int = 1,
+    publish_every: int = 4,
+    lr: float = 0.05,
+    entropy: float = 0.01,
+    seed: Optional[int] = None,
+    shard_dir: Optional[str] = None,
+    keep_shards: bool = False,
+    resume: bool = False,
+    verbose: bool = False,
+) -> Dict:
+    """Treina uma política por auto-jogo até consumir ``samples`` amostras.
+
+    Os pesos ficam em ``output`` (republicados a cada ``publish_every``
+    shards aprendidos). Com ``resume`` continua da política já gravada.
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    if resume and os.path.exists(output):
+        policy = LinearPolicy.load(output)
+        if policy.num_seats != num_players:
+            raise ValueError(f"A política em {output} é para {policy.num_seats} jogadores")
+    else:
+        policy = LinearPolicy(num_players)
+    policy.publish(output)
+
+    owned_dir = shard_dir is None
+    directory = tempfile.mkdtemp(prefix="coup-selfplay-") if owned_dir else shard_dir
+    os.makedirs(directory, exist_ok=True)
+    context = multiprocessing.get_context("spawn")
+    shards = context.Queue(maxsize=2 * workers)
+    stop = context.Event()
+    procs = [
+        context.Process(target=_worker, daemon=True,
+                        args=(i, directory, output, games_per_shard, concurrent, seed + i, shards, stop))
+        for i in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+
+    consumed = games = updates = lag = 0
+    play_time = 0.0
+    last: Dict[str, float] = {}
+    start = time.perf_counter()
+    try:
+        while consumed < samples:
+            try:
+                path, n, elapsed = shards.get(timeout=1.0)
+            except queue.Empty:
+                if not any(proc.is_alive() for proc in procs):
+                    raise RuntimeError("Todos os trabalhadores terminaram antes do fim do treino")
+                continue
+            shard = read_shard(path)
+            if not keep_shards:
+                os.remove(path)
+            if n:
+                last = policy.update(shard["obs"], shard["masks"], shard["moves"],
+                                     shard["returns"], lr, entropy)
+            consumed += n
+            games += shard["games"]
+            play_time += elapsed
+            lag += policy.version - shard["policy_version"]
+            updates += 1
+            if updates % publish_every == 0:
+                policy.version += 1
+                policy.publish(output)
+            if verbose and updates % (publish_every * 10) == 0:
+                rate = consumed / (time.perf_counter() - start)
+                print(f"{consumed} amostras, {rate:.0f}/s, política v{policy.version}, "
+                      f"entropia {last.get('entropy', 0.0):.3f}", flush=True)
+    finally:
+        stop.set()
+        for proc in procs:
+            proc.join(timeout=30)
+            if proc.is_alive():
+                proc.terminate()
+        shards.cancel_join_thread()
+        if owned_dir and not keep_shards:
+            for leftover in Path(directory).glob("shard-*.bin"):
+                leftover.unlink()
+            os.rmdir(directory)
+    policy.version += 1
+    policy.publish(output)
+    elapsed = time.perf_counter() - start
+    return {
+        "samples": consumed,
+        "games": games,
+        "workers": workers,
+        "updates": updates,
+        "policy_version": policy.version,
+        "elapsed_s": elapsed,
+        "samples_per_s": consumed / elapsed if elapsed else 0.0,
+        # Ritmo de um trabalhador sozinho, sem contar espera na fila
+        "worker_samples_per_s": consumed / play_time if play_time else 0.0,
+        "mean_policy_lag": lag / updates if updates else 0.0,
+        "entropy": last.get("entropy", 0.0),
+        "seed": seed,
+    }
+
+
+def evaluate(policy_path: str, games: int, max_turns: int = 1000, seed: Optional[int] = None) -> Dict:
+    """Política no primeiro assento contra ``AIPlayer`` nos demais."""
+    if seed is not None:
+        random.seed(seed)
+    policy = LinearPolicy.load(policy_path)
+    wins = [0] * policy.num_seats
+    unfinished = 0
+    for _ in range(games):
+        players: List[Player] = [PolicyPlayer("Política", policy)]
+        players += [AIPlayer(f"Bot {i + 1}") for i in range(1, policy.num_seats)]
+        game = GameManager(players, state_file=None, deck=Deck(None))
+        turns = 0
+        while not game.is_game_over and turns < max_turns:
+            game.play_turn()
+            turns += 1
+        if game.winner is None:
+            unfinished += 1
+        else:
+            wins[players.index(game.winner)] += 1
+    finished = games - unfinished
+    return {"games": games, "unfinished": unfinished,
+            "win_rate": [w / finished if finished else 0.0 for w in wins]}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Treino de políticas por auto-jogo.")
+    parser.add_argument("--output", default="data/policy.bin", help="arquivo de pesos publicado")
+    parser.add_argument("--samples", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--games-per-shard", type=int, default=20)
+    parser.add_argument("--concurrent", type=int, default=1,
+                        help="partidas simultâneas por trabalhador, com decisões em lote (src/batcher.py)")
+    parser.add_argument("--publish-every", type=int, default=4)
+    parser.add_argument("--lr", type=float, default=0.05)
+    parser.add_argument("--entropy", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--shard-dir", help="diretório dos shards (padrão: temporário)")
+    parser.add_argument("--keep-shards", action="store_true")
+    parser.add_argument("--resume", action="store_true", help="continua a política de --output")
+    parser.add_argument("--scaling", help="mede amostras/s para estes números de trabalhadores (ex.: 1,2,4)")
+    parser.add_argument("--evaluate", type=int, default=0,
+                        help="joga N partidas da política de --output contra AIPlayer e sai")
+    args = parser.parse_args(argv)
+
+    if args.evaluate:
+        report = evaluate(args.output, args.evaluate, seed=args.seed)
+        print(f"Partidas: {report['games']} ({report['unfinished']} sem vencedor)")
+        for seat, rate in enumerate(report["win_rate"]):
+            label = "política" if seat == 0 else "AIPlayer"
+            print(f"  Assento {seat + 1} ({label}): {rate:.2%} de vitórias")
+        return
+
+    if args.scaling:
+        base = None
+        for workers in (int(w) for w in args.scaling.split(",")):
+            with tempfile.TemporaryDirectory() as tmp:
+                report = train(os.path.join(tmp, "policy.bin"), args.samples, workers, args.players,
+                               args.games_per_shard, args.concurrent, args.publish_every, args.lr,
+                               args.entropy, args.seed)
+            rate = report["samples_per_s"]
+            base = base or rate / workers
+            print(f"{workers} trabalhador(es): {rate:.0f} amostras/s "
+                  f"(eficiência {rate / (base * workers):.0%})", flush=True)
+        return
+
+    report = train(args.output, args.samples, args.workers, args.players, args.games_per_shard,
+                   args.concurrent, args.publish_every, args.lr, args.entropy, args.seed,
+                   args.shard_dir, args.keep_shards, args.resume, verbose=True)
+    print(f"Amostras: {report['samples']} de {report['games']} partidas")
+    print(f"Tempo: {report['elapsed_s']:.2f}s com {report['workers']} trabalhador(es)")
+    print(f"Amostras/s: {report['samples_per_s']:.0f} "
+          f"(por trabalhador, jogando: {report['worker_samples_per_s']:.0f})")
+    print(f"Política v{report['policy_version']} em {args.output} "
+          f"(atraso médio {report['mean_policy_lag']:.2f} versão(ões))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,909 @@
+"""Servidor TCP assíncrono com várias mesas de Coup num só processo.
+
+Protocolo: uma mensagem JSON por linha, nos dois sentidos.
+
+Cliente -> servidor:
+    {"type": "join", "name": "Ana", "table": "t1"}   # "table" é opcional
+    {"type": "decide", "id": 7, "choice": 0}         # índice em "options"
+
+Servidor -> cliente:
+    {"type": "joined", "table": "t1", "seat": 2}
+    {"type": "decision", "id": 7, "kind": "challenge", "options": [true, false],
+     "deadline_ms": 5000}                            # só com prazo
+    {"type": "closed", "id": 7}                      # a decisão não vale mais
+    {"type": "state", "view": {...}}                 # ``views.seat_view``
+    {"type": "game_over", "winner": "Ana"}
+    {"type": "error", "message": "..."}
+
+Cada mesa começa quando os assentos humanos enchem; os demais assentos
+são IAs. Um assento cujo cliente cai passa a ser jogado pela IA. Com
+``--policy`` as IAs de todas as mesas jogam pela política aprendida
+(``selfplay.py``), com as decisões avaliadas em lote (``batcher.py``).
+
+Com ``turn_timeout``, uma decisão sem resposta no prazo usa a padrão
+(Renda na ação do turno). Com ``reaction_timeout``, as janelas de
+desafio e de bloqueio perguntam a todos os que podem reagir ao mesmo
+tempo: a primeira aceitação vence e as outras perguntas são fechadas;
+sem aceitação até o prazo, ninguém reage. Os prazos de todas as mesas
+ficam numa só ``TimerWheel`` (``timers.py``).
+
+Com ``data_dir``, uma mesa sem nenhum cliente hiberna no fim do turno:
+vira um snapshot binário (``<mesa>.coup``) e sai da memória. Um ``join``
+com o id da mesa e o nome de um dos assentos humanos a retoma.
+
+Cada conexão tem uma fila de saída limitada. O escritor só volta a
+esvaziá-la depois do ``drain()`` da escrita anterior, então um cliente
+lento enche a própria fila, e quando ela transborda a conexão é
+encerrada. As outras mesas nunca esperam por ele.
+
+Uso:
+    python -m src.server --port 7777
+    python -m src.server --load-test --clients 2000
+    python -m src.server --load-test --clients 2000 --humans 1 --policy data/policy.bin
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import os
+import random
+import re
+import socket
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from action import Action
+from decisions import CHALLENGE, LOSE_INFLUENCE, Decision, DecisionProvider, decide_with_hooks
+from Deck import Deck
+from game_cache import GameCache
+from game_manager import GameManager
+from player import AIPlayer, Player
+from snapshot import SnapshotReader
+from timers import TimerWheel
+from views import seat_view
+
+DEFAULT_OUTBOUND = 64
+# Ids de mesa viram nomes de arquivo dos snapshots
+TABLE_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+class RemotePlayer(AIPlayer):
+    """Assento de um cliente remoto; sem cliente, a IA decide por ele."""
+
+    __slots__ = ()
+
+
+def _encode(message: Dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _label(option: Any, players: List[Player]) -> Any:
+    """Opção de decisão em forma serializável."""
+    if isinstance(option, Action):
+        return option.__class__.__name__
+    if isinstance(option, Player):
+        return players.index(option)
+    return option
+
+
+class Connection:
+    """Um cliente conectado, com fila de saída limitada."""
+
+    def __init__(self, server: "CoupServer", reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, max_outbound: int):
+        self._server = server
+        self._reader = reader
+        self._writer = writer
+        self._outbound: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(max_outbound)
+        self.table: Optional["Table"] = None
+        self.seat: Optional[int] = None
+        self.closed = False
+
+    def send(self, message: Dict) -> None:
+        """Enfileira sem bloquear; se a fila transbordar, derruba o cliente."""
+        if self.closed:
+            return
+        try:
+            self._outbound.put_nowait(_encode(message))
+        except asyncio.QueueFull:
+            self._server.stats["overflow_disconnects"] += 1
+            self.close()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self.table is not None:
+            self.table.leave(self)
+        # Acorda o escritor; se a fila estiver cheia, ele encerra pelo cancelamento
+        try:
+            self._outbound.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+        self._writer.close()
+
+    async def _write_loop(self) -> None:
+        try:
+            while True:
+                data = await self._outbound.get()
+                # Junta o que já estiver na fila numa escrita só
+                batch = [data]
+                while not self._outbound.empty():
+                    batch.append(self._outbound.get_nowait())
+                if None in batch or self.closed:
+                    return
+                self._writer.write(b"".join(batch))
+                await self._writer.drain()
+                self._server.stats["messages_out"] += len(batch)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.close()
+
+    async def serve(self) -> None:
+        writer_task = asyncio.create_task(self._write_loop())
+        try:
+            while not self.closed:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    self.send({"type": "error", "message": "JSON inválido"})
+                    continue
+                self._server.stats["messages_in"] += 1
+                self._server.handle(self, message)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self.close()
+            writer_task.cancel()
+
+
+class _Evicted(Exception):
+    """A partida saiu do cache enquanto esperava a ação de um humano."""
+
+
+def load_game(path: str) -> GameManager:
+    """Recria a partida de um snapshot, com os assentos remotos de volta."""
+    with SnapshotReader(path) as snap:
+        saved = snap.players()
+    game = GameManager([], state_file=None, deck=Deck(None))
+    game.load_snapshot(path)
+    players = game.players
+    for i, data in enumerate(saved):
+        if data["type"] == RemotePlayer.__name__:
+            players[i] = RemotePlayer.from_dict(players[i].to_dict())
+    return game
+
+
+class Table(DecisionProvider):
+    """Uma mesa: o ``GameManager`` e quem está em cada assento.
+
+    A própria mesa é o provedor de decisões da partida: decisões de
+    assentos com cliente viram mensagens ``decision`` e esperam o
+    ``decide`` correspondente; as demais usam os ganchos da IA. Numa
+    janela de reação (``Decision.window``) a primeira pergunta abre a
+    janela inteira em paralelo (``_open_window``) e as seguintes só
+    repetem o vencedor.
+
+    Com o cache do servidor, a mesa anota as respostas do turno e
+    estaciona a partida enquanto espera um humano, se o turno ainda não
+    mudou nada (antes de um desafio ser aceito ou de alguém perder uma
+    carta). Se o cache a despejar, o turno em curso é descartado e a mesa
+    "dorme" só com as conexões; quando a resposta chega, a partida é
+    recarregada e o turno recomeça repetindo as respostas anotadas.
+    """
+
+    def __init__(self, server: "CoupServer", table_id: str, players: int, humans: int, max_turns: int):
+        self._server = server
+        self.table_id = table_id
+        self._num_players = players
+        self._humans = humans
+        self._max_turns = max_turns
+        self._names: List[str] = []
+        self._seats: Dict[int, str] = {}  # assentos remotos -> nome
+        self._connections: Dict[int, Connection] = {}
+        self._pending: Dict[int, tuple] = {}  # assento -> (id, decision, futuro)
+        self._ids = itertools.count(1)
+        self._started = False
+        self._turns = 0
+        # Respostas do turno em curso, (tipo, índice da opção), enquanto ele
+        # não mudou o estado; ao acordar são repetidas via ``_replay``
+        self._turn_log: Optional[List[Tuple[str, Any]]] = None
+        self._replay: "collections.deque[Tuple[str, Any]]" = collections.deque()
+        self._sleeping: Optional[Tuple[int, int, str]] = None  # (assento, id, tipo) esperado
+        self._window: Optional[Tuple[tuple, Optional[Player]]] = None  # (janela, vencedor)
+        self.game: Optional[GameManager] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def resume(cls, server: "CoupServer", table_id: str, path: str, max_turns: int) -> "Table":
+        """Recria uma mesa hibernada a partir do snapshot em ``path``.
+
+        A partida só volta a andar quando algum assento humano reconecta.
+        """
+        game = load_game(path)
+        names = [p.name for p in game.players if isinstance(p, RemotePlayer)]
+        table = cls(server, table_id, len(game.players), len(names), max_turns)
+        table._names = names
+        table._adopt(game)
+        return table
+
+    @property
+    def open_seats(self) -> int:
+        return 0 if self._started else self._humans - len(self._names)
+
+    @property
+    def connected(self) -> int:
+        return len(self._connections)
+
+    @property
+    def sleeping(self) -> bool:
+        """A partida foi despejada do cache e espera a decisão de um humano."""
+        return self._sleeping is not None
+
+    def can_join(self, name: str) -> bool:
+        return self.open_seats > 0 or self._free_seat(name) is not None
+
+    def _free_seat(self, name: str) -> Optional[int]:
+        """Assento humano de ``name`` sem cliente (para reconectar)."""
+        for seat, seat_name in self._seats.items():
+            if seat_name == name and seat not in self._connections:
+                return seat
+        return None
+
+    def join(self, conn: Connection, name: str) -> None:
+        if self._started:
+            seat = self._free_seat(name)
+            self._connections[seat] = conn
+            conn.table, conn.seat = self, seat
+            conn.send({"type": "joined", "table": self.table_id, "seat": seat})
+            if self.game is None:
+                return  # dormindo: o estado chega no fim do próximo turno
+            if self.task is None:
+                self.task = asyncio.create_task(self._run())
+            else:
+                conn.send({"type": "state", "view": seat_view(self.game, seat)})
+            return
+        seat = len(self._names)
+        self._names.append(name)
+        self._connections[seat] = conn
+        conn.table, conn.seat = self, seat
+        conn.send({"type": "joined", "table": self.table_id, "seat": seat})
+        if self.open_seats == 0:
+            self._start()
+
+    def leave(self, conn: Connection) -> None:
+        seat = conn.seat
+        if self._connections.get(seat) is conn:
+            del self._connections[seat]
+        if self._sleeping is not None and self._sleeping[0] == seat:
+            # Sem cliente, a IA responde: a partida acorda
+            self._sleeping = None
+            self.task = asyncio.create_task(self._wake(None))
+            return
+        pending = self._pending.pop(seat, None)
+        if pending is not None and not pending[2].done():
+            # Sem cliente, a IA (ou o provedor das IAs) responde a decisão pendente
+            if self._server.cache is not None:
+                self._server.cache.unpark(self.table_id)
+            asyncio.create_task(self._decide_for_bot(pending[1], pending[2]))
+
+    async def _decide_for_bot(self, decision: Decision, future: asyncio.Future) -> None:
+        try:
+            choice = await self._server.decide_for_bot(decision)
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            return
+        if not future.done():
+            future.set_result(choice)
+
+    def _start(self) -> None:
+        players: List[Player] = [RemotePlayer(name) for name in self._names]
+        players += [AIPlayer(f"Bot {i + 1}") for i in range(self._num_players - len(players))]
+        self._adopt(GameManager(players, state_file=None, deck=Deck(None)))
+        self.task = asyncio.create_task(self._run())
+
+    def _adopt(self, game: GameManager) -> None:
+        self.game = game
+        self._started = True
+        self._seats = {i: p.name for i, p in enumerate(game.players) if isinstance(p, RemotePlayer)}
+        if self._server.cache is not None:
+            self._server.cache.add(self.table_id, game, self._evicted)
+
+    def _evicted(self, table_id: str) -> None:
+        """O cache despejou a partida, parada num turno que ainda não mudou nada."""
+        for seat, (decision_id, decision, future) in list(self._pending.items()):
+            self._sleeping = (seat, decision_id, decision.kind)
+            del self._pending[seat]
+            if not future.done():
+                future.set_exception(_Evicted())
+        self.game = None
+
+    async def _wake(self, answer: Optional[Tuple[str, Any]]) -> None:
+        replay = collections.deque(self._turn_log or ())
+        if answer is not None:
+            replay.append(answer)
+        self.game = await self._server.cache.load(self.table_id, self._evicted)
+        self._replay = replay
+        await self._run()
+
+    def _broadcast_state(self) -> None:
+        for seat, conn in list(self._connections.items()):
+            conn.send({"type": "state", "view": seat_view(self.game, seat)})
+
+    def _hibernate(self) -> None:
+        if self._server.cache is not None:
+            self._server.cache.remove(self.table_id)
+        self.game.save_snapshot(self._server.snapshot_path(self.table_id))
+        self.task = None
+        self._server.hibernated(self)
+
+    async def _run(self) -> None:
+        game = self.game
+        cache = self._server.cache
+        self._broadcast_state()
+        try:
+            while not game.is_game_over and self._turns < self._max_turns:
+                if not self._connections and self._server.data_dir is not None:
+                    self._hibernate()
+                    return
+                if cache is not None:
+                    self._turn_log = []
+                await game.play_turn_async(self)
+                self._turns += 1
+                self._server.stats["turns"] += 1
+                if cache is not None:
+                    cache.touch(self.table_id)
+                self._broadcast_state()
+        except _Evicted:
+            self.task = None
+            return
+        winner = game.winner
+        for conn in list(self._connections.values()):
+            conn.send({"type": "game_over", "winner": winner.name if winner is not None else None})
+        self._server.finish(self)
+
+    @staticmethod
+    def _pick(decision: Decision, choice: Any) -> Any:
+        options = decision.options
+        valid = isinstance(choice, int) and 0 <= choice < len(options)
+        return options[choice] if valid else decision.default
+
+    async def decide(self, decision: Decision) -> Any:
+        # A perda de carta vem depois de uma mudança de estado (desafio ou
+        # ação executada): dali em diante o turno não pode ser descartado
+        if decision.kind == LOSE_INFLUENCE:
+            self._turn_log = None
+        if self._turn_log is None:
+            self._replay.clear()
+            return await self._ask(decision)
+        if self._replay and self._replay[0][0] == decision.kind:
+            value = self._pick(decision, self._replay.popleft()[1])
+        else:
+            self._replay.clear()
+            value = await self._ask(decision)
+        log = self._turn_log
+        if log is not None:
+            if (decision.kind == CHALLENGE and value) or value not in decision.options:
+                self._turn_log = None  # o desafio aceito vai mudar o estado
+            else:
+                log.append((decision.kind, decision.options.index(value)))
+        return value
+
+    def _send_decision(self, conn: Connection, decision_id: int, decision: Decision,
+                       timeout: Optional[float]) -> None:
+        message = {
+            "type": "decision",
+            "id": decision_id,
+            "kind": decision.kind,
+            "options": [_label(o, self.game.players) for o in decision.options],
+        }
+        if timeout is not None:
+            message["deadline_ms"] = int(timeout * 1e3)
+        conn.send(message)
+
+    async def _ask(self, decision: Decision) -> Any:
+        if decision.window is not None:
+            return await self._react(decision)
+        seat = self.game.players.index(decision.player)
+        conn = self._connections.get(seat)
+        if conn is None or conn.closed:
+            return await self._server.decide_for_bot(decision)
+        decision_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[seat] = (decision_id, decision, future)
+        timeout = self._server.turn_timeout
+        self._send_decision(conn, decision_id, decision, timeout)
+        timer = None
+        if timeout is not None:
+            timer = self._server.timers.call_later(timeout, self._expire, seat, decision_id)
+        # Enquanto o turno não mudou nada, a partida em memória é todo o estado
+        cache = self._server.cache if self._turn_log is not None else None
+        if cache is not None:
+            cache.park(self.table_id)
+        try:
+            return decision.validate(await future)
+        except _Evicted:
+            timer = None  # o prazo continua valendo com a mesa dormindo
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if self._pending.get(seat, (None,))[0] == decision_id:
+                del self._pending[seat]
+            if cache is not None:
+                cache.unpark(self.table_id)
+
+    def _expire(self, seat: int, decision_id: int) -> None:
+        """Prazo vencido: a decisão fica com a resposta padrão."""
+        sleeping = self._sleeping
+        if sleeping is not None and sleeping[:2] == (seat, decision_id):
+            self._timed_out(seat, decision_id)
+            self._sleeping = None
+            self.task = asyncio.create_task(self._wake((sleeping[2], None)))
+            return
+        pending = self._pending.get(seat)
+        if pending is None or pending[0] != decision_id or pending[2].done():
+            return
+        self._timed_out(seat, decision_id)
+        pending[2].set_result(pending[1].default)
+
+    def _timed_out(self, seat: int, decision_id: int) -> None:
+        self._server.stats["timeouts"] += 1
+        conn = self._connections.get(seat)
+        if conn is not None:
+            conn.send({"type": "closed", "id": decision_id})
+
+    async def _react(self, decision: Decision) -> bool:
+        window = self._window
+        if window is None or window[0] is not decision.window:
+            # Os anteriores da janela já foram respondidos (repetição do turno)
+            members = decision.window[decision.window.index(decision.player):]
+            window = self._window = (decision.window, await self._open_window(decision, members))
+        return decision.player is window[1]
+
+    async def _open_window(self, decision: Decision, members: Tuple[Player, ...]) -> Optional[Player]:
+        """Pergunta a todos de ``members`` ao mesmo tempo; devolve quem aceitou primeiro.
+
+        As IAs (e assentos sem cliente) respondem na hora, na ordem da
+        janela; os humanos recebem a pergunta juntos e o primeiro ``True``
+        fecha a janela. Sem aceitação até o prazo, ninguém reage.
+        """
+        players = self.game.players
+        humans: List[Tuple[int, Connection, Decision]] = []
+        for p in members:
+            asked = Decision(decision.kind, p, decision.options, decision.default, decision.action,
+                             decision.actor, decision.target, decision.players, decision.window)
+            seat = players.index(p)
+            conn = self._connections.get(seat)
+            if conn is None or conn.closed:
+                if await self._server.decide_for_bot(asked):
+                    return p
+            else:
+                humans.append((seat, conn, asked))
+        if not humans:
+            return None
+
+        loop = asyncio.get_running_loop()
+        closed = loop.create_future()
+        waiting = len(humans)
+
+        def answered(player: Player, future: asyncio.Future) -> None:
+            nonlocal waiting
+            waiting -= 1
+            if closed.done():
+                return
+            if not future.cancelled() and future.exception() is None and future.result() is True:
+                closed.set_result(player)
+            elif waiting == 0:
+                closed.set_result(None)
+
+        timeout = self._server.reaction_timeout
+        asked_ids = []
+        for seat, conn, asked in humans:
+            decision_id = next(self._ids)
+            future = loop.create_future()
+            future.add_done_callback(lambda f, p=asked.player: answered(p, f))
+            self._pending[seat] = (decision_id, asked, future)
+            asked_ids.append((seat, conn, decision_id, future))
+            self._send_decision(conn, decision_id, asked, timeout)
+        timer = None
+        if timeout is not None:
+            timer = self._server.timers.call_later(timeout, self._close_window, closed)
+        try:
+            return await closed
+        finally:
+            if timer is not None:
+                timer.cancel()
+            for seat, conn, decision_id, future in asked_ids:
+                if self._pending.get(seat, (None,))[0] == decision_id:
+                    del self._pending[seat]
+                if not future.done():
+                    future.cancel()
+                    conn.send({"type": "closed", "id": decision_id})
+
+    def _close_window(self, closed: asyncio.Future) -> None:
+        if not closed.done():
+            self._server.stats["timeouts"] += 1
+            closed.set_result(None)
+
+    def answer(self, conn: Connection, decision_id: Any, choice: Any) -> None:
+        sleeping = self._sleeping
+        if sleeping is not None and sleeping[:2] == (conn.seat, decision_id):
+            self._sleeping = None
+            self.task = asyncio.create_task(self._wake((sleeping[2], choice)))
+            return
+        pending = self._pending.get(conn.seat)
+        if pending is None or pending[0] != decision_id or pending[2].done():
+            conn.send({"type": "error", "message": "Decisão inexistente ou já respondida"})
+            return
+        _, decision, future = pending
+        if self._turn_log is not None and decision.window is None and self._server.cache is not None:
+            self._server.cache.wake(self.table_id)
+        future.set_result(self._pick(decision, choice))
+
+
+class CoupServer:
+    """Aceita conexões e distribui os clientes pelas mesas.
+
+    Args:
+        players: Assentos por mesa.
+        humans: Assentos de clientes por mesa (o resto são IAs).
+        max_turns: Turnos no máximo por partida.
+        max_outbound: Mensagens na fila de saída de cada conexão.
+        data_dir: Pasta dos snapshots das mesas hibernadas; com ``None``
+            as mesas nunca hibernam.
+        cache_budget: Bytes (estimados) de partidas em memória; acima
+            disso as mesas paradas há mais tempo vão para ``data_dir``
+            (``game_cache.py``). Com ``None`` todas ficam em memória. O
+            orçamento é flexível: mesas ativas nunca são despejadas.
+        cache_idle: Segundos que uma mesa precisa esperar um humano antes
+            de poder ser despejada.
+        turn_timeout: Segundos para cada decisão de um humano fora das
+            janelas de reação; com ``None`` espera para sempre.
+        reaction_timeout: Segundos de cada janela de desafio ou de
+            bloqueio; com ``None`` espera todos responderem.
+        bots: Provedor das decisões das IAs e dos assentos sem cliente
+            (por exemplo um ``batcher.PolicyBatcher`` compartilhado por
+            todas as mesas); com ``None`` valem os ganchos do jogador.
+    """
+
+    def __init__(self, players: int = 4, humans: int = 4, max_turns: int = 1000,
+                 max_outbound: int = DEFAULT_OUTBOUND, data_dir: Optional[str] = None,
+                 cache_budget: Optional[int] = None, turn_timeout: Optional[float] = None,
+                 reaction_timeout: Optional[float] = None, bots: Optional[DecisionProvider] = None,
+                 cache_idle: float = 1.0):
+        self._players = players
+        self._humans = min(humans, players)
+        self._max_turns = max_turns
+        self._max_outbound = max_outbound
+        self.data_dir = data_dir
+        if data_dir is not None:
+            os.makedirs(data_dir, exist_ok=True)
+        if cache_budget is not None and data_dir is None:
+            raise ValueError("cache_budget precisa de data_dir")
+        self.cache: Optional[GameCache] = None
+        if cache_budget is not None:
+            self.cache = GameCache(cache_budget, self.snapshot_path, load_game, cache_idle)
+        self.turn_timeout = turn_timeout
+        self.reaction_timeout = reaction_timeout
+        self.bots = bots
+        self.timers = TimerWheel()
+        self._tables: Dict[str, Table] = {}
+        self._connections: "set[Connection]" = set()
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.stats = {"connections": 0, "messages_in": 0, "messages_out": 0,
+                      "turns": 0, "tables_finished": 0, "overflow_disconnects": 0,
+                      "hibernated": 0, "resumed": 0, "timeouts": 0}
+
+    @property
+    def tables(self) -> Dict[str, Table]:
+        return self._tables
+
+    async def decide_for_bot(self, decision: Decision) -> Any:
+        """Decisão de uma IA (ou de um assento sem cliente)."""
+        if self.bots is None:
+            return decide_with_hooks(decision)
+        return decision.validate(await self.bots.decide(decision))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Começa a escutar e devolve a porta (útil com ``port=0``)."""
+        self._server = await asyncio.start_server(self._accept, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for conn in list(self._connections):
+            conn.close()
+        if self._server is not None:
+            await self._server.wait_closed()
+        for table in list(self._tables.values()):
+            if table.task is not None:
+                table.task.cancel()
+        self.timers.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    async def adopt(self, sock: socket.socket, data: bytes = b"") -> None:
+        """Atende um cliente aceito em outro processo (ver ``shard.py``).
+
+        ``data`` são os bytes que já tinham sido lidos do socket.
+        """
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        protocol = asyncio.StreamReaderProtocol(reader)
+        transport, _ = await loop.create_connection(lambda: protocol, sock=sock)
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        await self._accept(reader, writer)
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats["connections"] += 1
+        conn = Connection(self, reader, writer, self._max_outbound)
+        self._connections.add(conn)
+        try:
+            await conn.serve()
+        finally:
+            self._connections.discard(conn)
+
+    def handle(self, conn: Connection, message: Dict) -> None:
+        kind = message.get("type")
+        if kind == "join":
+            if conn.table is not None:
+                conn.send({"type": "error", "message": "Já está numa mesa"})
+                return
+            table_id = message.get("table")
+            if table_id is not None and not (isinstance(table_id, str) and TABLE_ID.match(table_id)):
+                conn.send({"type": "error", "message": "Id de mesa inválido"})
+                return
+            name = str(message.get("name") or "Jogador")
+            table = self._table_for(table_id, name)
+            if table is None:
+                conn.send({"type": "error", "message": "Mesa cheia ou já iniciada"})
+                return
+            table.join(conn, name)
+        elif kind == "decide":
+            if conn.table is None:
+                conn.send({"type": "error", "message": "Entre numa mesa primeiro"})
+                return
+            conn.table.answer(conn, message.get("id"), message.get("choice"))
+        else:
+            conn.send({"type": "error", "message": f"Mensagem desconhecida: {kind}"})
+
+    def _table_for(self, table_id: Optional[str], name: str) -> Optional[Table]:
+        """Mesa pedida (retomada ou criada se não existir) ou a primeira com vaga."""
+        if table_id is None:
+            table_id = next((t.table_id for t in self._tables.values() if t.open_seats > 0), None)
+            if table_id is None:
+                table_id = f"t{next(self._ids)}"
+        table = self._tables.get(table_id)
+        if table is None:
+            path = self.snapshot_path(table_id)
+            if path is not None and os.path.exists(path):
+                table = Table.resume(self, table_id, path, self._max_turns)
+                self.stats["resumed"] += 1
+            else:
+                table = Table(self, table_id, self._players, self._humans, self._max_turns)
+            self._tables[table_id] = table
+        return table if table.can_join(name) else None
+
+    def snapshot_path(self, table_id: str) -> Optional[str]:
+        """Arquivo do snapshot da mesa hibernada (``None`` sem ``data_dir``)."""
+        if self.data_dir is None:
+            return None
+        return os.path.join(self.data_dir, f"{table_id}.coup")
+
+    def hibernated(self, table: Table) -> None:
+        self.stats["hibernated"] += 1
+        self._tables.pop(table.table_id, None)
+
+    def finish(self, table: Table) -> None:
+        self.stats["tables_finished"] += 1
+        self._tables.pop(table.table_id, None)
+        if self.cache is not None:
+            self.cache.remove(table.table_id)
+        path = self.snapshot_path(table.table_id)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+
+# --- Cliente local -------------------------------------------------------------
+class CoupClient:
+    """Cliente de teste: entra numa mesa e responde as decisões sozinho.
+
+    ``latencies`` guarda, para cada decisão enviada, o tempo até chegar a
+    próxima atualização de estado. O estado é publicado no fim de cada
+    turno, então, com clientes que demoram a responder, a medida inclui a
+    espera pelas decisões dos outros assentos no mesmo turno.
+    """
+
+    def __init__(self, name: str, table: Optional[str] = None, seed: Optional[int] = None,
+                 think_ms: float = 0.0):
+        self.name = name
+        self.table = table
+        self._think_ms = think_ms
+        self._rng = random.Random(seed)
+        self.latencies: List[float] = []
+        self.seat: Optional[int] = None
+        self.view: Optional[Dict] = None
+        self.winner: Optional[str] = None
+        self.finished = False
+
+    def choose(self, message: Dict) -> int:
+        return self._rng.randrange(len(message["options"]))
+
+    async def run(self, host: str, port: int) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        join = {"type": "join", "name": self.name}
+        if self.table is not None:
+            join["table"] = self.table
+        writer.write(_encode(join))
+        sent_at: Optional[float] = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                message = json.loads(line)
+                kind = message["type"]
+                if kind == "decision":
+                    if self._think_ms:
+                        await asyncio.sleep(self._rng.random() * self._think_ms / 1e3)
+                    writer.write(_encode({"type": "decide", "id": message["id"],
+                                          "choice": self.choose(message)}))
+                    await writer.drain()
+                    sent_at = time.perf_counter()
+                elif kind == "state":
+                    self.view = message["view"]
+                    if sent_at is not None:
+                        self.latencies.append(time.perf_counter() - sent_at)
+                        sent_at = None
+                elif kind == "joined":
+                    self.seat = message["seat"]
+                elif kind == "game_over":
+                    self.winner = message["winner"]
+                    self.finished = True
+                    return
+        finally:
+            writer.close()
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def load_test(clients: int, players: int = 4, humans: int = 4,
+                    max_outbound: int = DEFAULT_OUTBOUND, think_ms: float = 0.0, seed: int = 0,
+                    cache_budget: Optional[int] = None, turn_timeout: Optional[float] = None,
+                    reaction_timeout: Optional[float] = None,
+                    bots: Optional[DecisionProvider] = None, cache_idle: float = 1.0) -> Dict:
+    """Sobe um servidor local e ``clients`` clientes simulados contra ele.
+
+    Com ``think_ms`` cada cliente espera até esse tempo antes de responder
+    (ritmo de gente); com 0 é um teste de saturação. Com ``cache_budget``
+    as partidas despejadas vão para uma pasta temporária. Os prazos
+    (``turn_timeout``, ``reaction_timeout``), ``bots`` e ``cache_idle``
+    valem como no servidor.
+    """
+    random.seed(seed)
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = CoupServer(players, humans, max_outbound=max_outbound,
+                            data_dir=data_dir if cache_budget is not None else None,
+                            cache_budget=cache_budget, turn_timeout=turn_timeout,
+                            reaction_timeout=reaction_timeout, bots=bots, cache_idle=cache_idle)
+        return await _drive_clients(server, clients, think_ms, seed)
+
+
+async def _drive_clients(server: CoupServer, clients: int, think_ms: float, seed: int) -> Dict:
+    port = await server.start()
+    bots = [CoupClient(f"Cliente {i}", seed=seed + i, think_ms=think_ms) for i in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(c.run("127.0.0.1", port) for c in bots), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    await server.close()
+    latencies = [x for c in bots for x in c.latencies]
+    return {
+        "clients": clients,
+        "finished": sum(c.finished for c in bots),
+        "elapsed_s": elapsed,
+        "decisions": len(latencies),
+        "p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "cache": server.cache.stats() if server.cache is not None else None,
+        "bots": getattr(server.bots, "stats", None),
+        **server.stats,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Servidor de mesas de Coup.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--players", type=int, default=4, help="assentos por mesa")
+    parser.add_argument("--humans", type=int, default=4, help="assentos de clientes por mesa")
+    parser.add_argument("--max-outbound", type=int, default=DEFAULT_OUTBOUND,
+                        help="mensagens na fila de saída de cada conexão")
+    parser.add_argument("--data-dir", default=None, help="pasta das mesas hibernadas e despejadas")
+    parser.add_argument("--cache-mb", type=float, default=None,
+                        help="memória das partidas residentes (precisa de --data-dir, "
+                             "exceto no teste de carga)")
+    parser.add_argument("--cache-idle-ms", type=float, default=1000.0,
+                        help="espera mínima de uma mesa antes de poder ir para o disco")
+    parser.add_argument("--turn-timeout", type=float, default=None,
+                        help="segundos para cada decisão (depois vale a padrão: Renda na ação)")
+    parser.add_argument("--reaction-timeout", type=float, default=None,
+                        help="segundos de cada janela de desafio ou bloqueio")
+    parser.add_argument("--policy", default=None,
+                        help="pesos de python -m src.selfplay: as IAs jogam por eles, em lote (requer NumPy)")
+    parser.add_argument("--max-batch", type=int, default=256, help="decisões por lote com --policy")
+    parser.add_argument("--max-wait-ms", type=float, default=1.0,
+                        help="espera máxima de uma decisão por companhia no lote com --policy")
+    parser.add_argument("--load-test", action="store_true", help="roda o teste de carga local")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--think-ms", type=float, default=0.0,
+                        help="atraso máximo das respostas dos clientes simulados")
+    args = parser.parse_args(argv)
+    cache_budget = int(args.cache_mb * 2**20) if args.cache_mb is not None else None
+    bots = None
+    if args.policy is not None:
+        from batcher import PolicyBatcher
+        from selfplay import LinearPolicy
+
+        bots = PolicyBatcher(LinearPolicy.load(args.policy), args.max_batch, args.max_wait_ms / 1e3)
+
+    if args.load_test:
+        report = asyncio.run(load_test(args.clients, args.players, args.humans,
+                                        args.max_outbound, args.think_ms, cache_budget=cache_budget,
+                                        turn_timeout=args.turn_timeout,
+                                        reaction_timeout=args.reaction_timeout, bots=bots,
+                                        cache_idle=args.cache_idle_ms / 1e3))
+        print(f"Clientes: {report['clients']} ({report['finished']} terminaram) "
+              f"em {report['elapsed_s']:.2f}s")
+        print(f"Decisões: {report['decisions']}  turnos: {report['turns']}")
+        print(f"Decisão -> atualização: p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+        print(f"Desconexões por fila cheia: {report['overflow_disconnects']}")
+        print(f"Prazos vencidos: {report['timeouts']}")
+        cache = report["cache"]
+        if cache is not None:
+            print(f"Cache: pico {cache['peak_bytes'] / 2**20:.1f} MB "
+                  f"({cache['peak_over_budget_bytes'] / 2**20:.1f} MB acima do orçamento), "
+                  f"acertos {cache['hit_rate']:.1%}, "
+                  f"despejos {cache['evictions']}, recarga média {cache['rehydrate_ms_mean']:.2f} ms "
+                  f"(p99 {cache['rehydrate_ms_p99']:.2f} ms)")
+        batches = report["bots"]
+        if batches is not None:
+            print(f"Lotes da política: {batches['batches']}, média {batches['mean_batch']:.1f} decisões, "
+                  f"fila média {batches['queue_latency_mean_s'] * 1e3:.2f} ms")
+        return
+
+    async def serve() -> None:
+        server = CoupServer(args.players, args.humans, max_outbound=args.max_outbound,
+                            data_dir=args.data_dir, cache_budget=cache_budget,
+                            turn_timeout=args.turn_timeout, reaction_timeout=args.reaction_timeout,
+                            bots=bots, cache_idle=args.cache_idle_ms / 1e3)
+        port = await server.start(args.host, args.port)
+        print(f"Servidor do Coup em {args.host}:{port}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,629 @@
+"""Hospedagem das mesas em vários processos, roteadas pelo id da mesa.
+
+Um processo de frente aceita as conexões TCP, lê só a primeira mensagem
+(o ``join``) e escolhe o shard da mesa por hashing consistente
+(``HashRing``). O socket do cliente é então passado ao processo do shard
+(``SCM_RIGHTS`` num socketpair Unix), que roda um ``CoupServer`` e fala
+direto com o cliente dali em diante: a frente não toca em mais nenhum
+byte da partida, e os turnos das IAs rodam em paralelo, um GIL por shard.
+
+Cada shard é dono das suas partidas e dos snapshots das mesas hibernadas
+(``<data_dir>/shard-<n>/<mesa>.coup``). Quando o anel muda
+(``add_shard``/``retire_shard``, ou outro ``--shards`` ao reiniciar), as
+mesas hibernadas que mudaram de dono migram: o shard antigo libera a
+mesa, o arquivo é movido para a pasta do novo dono e ele é avisado.
+Mesas em andamento continuam onde estão e migram quando hibernarem.
+
+Só funciona no Linux (passagem de descritores por ``SOCK_SEQPACKET``).
+
+Uso:
+    python -m src.shard --port 7777 --shards 4
+    python -m src.shard --load-test --shards 4 --clients 2000
+"""
+import argparse
+import asyncio
+import bisect
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from server import DEFAULT_OUTBOUND, TABLE_ID, CoupClient, CoupServer, Table, _encode, _percentile
+
+MAX_MESSAGE = 1 << 16
+MAX_JOIN = 4096      # bytes lidos de um cliente antes de rotear
+CLIENT = b"C"        # prefixo da mensagem que leva o socket de um cliente
+
+# Respostas de ``release``
+RELEASED = "released"
+BUSY = "busy"        # a mesa está em andamento neste shard
+GONE = "gone"        # a mesa não existe mais (terminou)
+
+
+class HashRing:
+    """Anel de hashing consistente com ``replicas`` pontos virtuais por nó.
+
+    Ao entrar ou sair um nó, só as chaves dos arcos dele mudam de dono.
+    """
+
+    def __init__(self, nodes: Iterable[int] = (), replicas: int = 64):
+        self._replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[int] = []
+        self._nodes: Set[int] = set()
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+    @property
+    def nodes(self) -> List[int]:
+        return sorted(self._nodes)
+
+    def add(self, node: int) -> None:
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for replica in range(self._replicas):
+            point = self._hash(f"{node}:{replica}")
+            i = bisect.bisect(self._points, point)
+            self._points.insert(i, point)
+            self._owners.insert(i, node)
+
+    def remove(self, node: int) -> None:
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def node_for(self, key: str) -> int:
+        if not self._points:
+            raise LookupError("Anel sem nós")
+        i = bisect.bisect(self._points, self._hash(key))
+        return self._owners[i % len(self._points)]
+
+
+class _Channel:
+    """Uma ponta do socketpair ``SOCK_SEQPACKET`` entre a frente e um shard.
+
+    O laço só guarda um ``add_writer`` por descritor, então quem envia com
+    a fila do outro lado cheia espera a vez num lock.
+    """
+
+    def __init__(self, sock: socket.socket):
+        sock.setblocking(False)
+        self.sock = sock
+        self._lock = asyncio.Lock()
+
+    async def send(self, data: bytes, fds: Sequence[int] = ()) -> None:
+        """Envia uma mensagem (e descritores)."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                try:
+                    socket.send_fds(self.sock, [data], list(fds))
+                    return
+                except BlockingIOError:
+                    ready = loop.create_future()
+                    loop.add_writer(self.sock, lambda: ready.done() or ready.set_result(None))
+                    try:
+                        await ready
+                    finally:
+                        loop.remove_writer(self.sock)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+# --- Processo do shard ---------------------------------------------------------
+class _ShardServer(CoupServer):
+    """``CoupServer`` de um shard: avisa a frente das mesas que saem da memória."""
+
+    def __init__(self, notify, **options):
+        super().__init__(**options)
+        self._notify = notify
+        self._released: Set[str] = set()
+
+    def handle(self, conn, message: Dict) -> None:
+        # Um cliente roteado antes da migração terminar não pode recriar a mesa aqui
+        if message.get("type") == "join" and message.get("table") in self._released:
+            conn.send({"type": "error", "message": "A mesa mudou de shard; conecte de novo"})
+            return
+        super().handle(conn, message)
+
+    def hibernated(self, table: Table) -> None:
+        super().hibernated(table)
+        self._notify({"event": "hibernated", "table": table.table_id})
+
+    def finish(self, table: Table) -> None:
+        super().finish(table)
+        self._notify({"event": "finished", "table": table.table_id})
+
+    def release(self, table_id: str) -> str:
+        """Solta uma mesa hibernada para a frente mover o snapshot."""
+        if table_id in self.tables:
+            return BUSY
+        if os.path.exists(self.snapshot_path(table_id)):
+            self._released.add(table_id)
+            return RELEASED
+        return GONE
+
+    def adopt_table(self, table_id: str) -> None:
+        """O snapshot de ``table_id`` acabou de chegar na pasta deste shard."""
+        self._released.discard(table_id)
+
+
+def _worker_main(shard_id: int, sock: socket.socket, data_dir: str, options: Dict) -> None:
+    try:
+        asyncio.run(_serve_shard(sock, data_dir, options))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve_shard(sock: socket.socket, data_dir: str, options: Dict) -> None:
+    loop = asyncio.get_running_loop()
+    channel = _Channel(sock)
+    tasks: Set[asyncio.Task] = set()
+    done = asyncio.Event()
+
+    def spawn(coro) -> None:
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    server = _ShardServer(lambda message: spawn(channel.send(_encode(message))),
+                          data_dir=data_dir, **options)
+
+    async def reply(message: Dict) -> None:
+        op = message.get("op")
+        if op == "release":
+            result = {"status": server.release(message["table"])}
+        elif op == "adopt":
+            server.adopt_table(message["table"])
+            result = {}
+        elif op == "stats":
+            result = {"stats": server.stats, "tables": len(server.tables),
+                      "cache": server.cache.stats() if server.cache is not None else None}
+        else:
+            result = {}
+        result["rid"] = message.get("rid")
+        await channel.send(_encode(result))
+        if op == "stop":
+            done.set()
+
+    def on_readable() -> None:
+        try:
+            data, fds, _, _ = socket.recv_fds(channel.sock, MAX_MESSAGE, 1)
+        except BlockingIOError:
+            return
+        if not data:  # a frente morreu
+            done.set()
+            return
+        if data[:1] == CLIENT and fds:
+            spawn(server.adopt(socket.socket(fileno=fds[0]), data[1:]))
+            return
+        for fd in fds:
+            os.close(fd)
+        spawn(reply(json.loads(data)))
+
+    loop.add_reader(channel.sock, on_readable)
+    await done.wait()
+    loop.remove_reader(channel.sock)
+    await server.close()
+    channel.close()
+
+
+# --- Processo de frente --------------------------------------------------------
+class _Shard:
+    """Um processo de shard visto pela frente."""
+
+    def __init__(self, shard_id: int, process: multiprocessing.Process,
+                 channel: _Channel, directory: str):
+        self.shard_id = shard_id
+        self.process = process
+        self.channel = channel
+        self.directory = directory
+        self.listener: Optional[asyncio.Task] = None
+        self._replies: Dict[int, asyncio.Future] = {}
+        self._rids = itertools.count(1)
+
+    def path(self, table_id: str) -> str:
+        return os.path.join(self.directory, f"{table_id}.coup")
+
+    async def request(self, op: str, **fields) -> Dict:
+        rid = next(self._rids)
+        reply = self._replies[rid] = asyncio.get_running_loop().create_future()
+        await self.channel.send(_encode({"op": op, "rid": rid, **fields}))
+        return await reply
+
+    async def hand_off(self, sock: socket.socket, data: bytes) -> None:
+        await self.channel.send(CLIENT + data, [sock.fileno()])
+
+    def resolve(self, message: Dict) -> None:
+        reply = self._replies.pop(message["rid"], None)
+        if reply is not None and not reply.done():
+            reply.set_result(message)
+
+    def fail(self) -> None:
+        for reply in self._replies.values():
+            if not reply.done():
+                reply.set_exception(ConnectionError(f"Shard {self.shard_id} encerrado"))
+        self._replies.clear()
+
+
+class ShardRouter:
+    """Frente: aceita clientes e entrega cada um ao shard da sua mesa.
+
+    Args:
+        shards: Processos de shard iniciais (padrão: um por núcleo).
+        data_dir: Pasta com uma subpasta de snapshots por shard.
+        replicas: Pontos virtuais de cada shard no anel.
+        players, humans, max_turns, max_outbound, cache_budget,
+        turn_timeout, reaction_timeout: Repassados ao ``CoupServer`` de cada
+            shard (o orçamento do cache vale por shard).
+    """
+
+    def __init__(self, shards: Optional[int] = None, data_dir: str = "data/shards",
+                 replicas: int = 64, players: int = 4, humans: int = 4,
+                 max_turns: int = 1000, max_outbound: int = DEFAULT_OUTBOUND,
+                 cache_budget: Optional[int] = None, turn_timeout: Optional[float] = None,
+                 reaction_timeout: Optional[float] = None):
+        self._initial = shards or os.cpu_count() or 1
+        self._data_dir = data_dir
+        self._humans = min(humans, players)
+        self._options = {"players": players, "humans": humans, "max_turns": max_turns,
+                         "max_outbound": max_outbound, "cache_budget": cache_budget,
+                         "turn_timeout": turn_timeout, "reaction_timeout": reaction_timeout}
+        self._ring = HashRing(replicas=replicas)
+        self._shards: Dict[int, _Shard] = {}
+        self._shard_ids = itertools.count()
+        # Mesas em andamento -> shard onde estão (pode não ser o dono no anel)
+        self._placement: Dict[str, int] = {}
+        self._moving: Dict[str, asyncio.Event] = {}
+        self._retiring: Set[int] = set()
+        self._lobby: Optional[str] = None
+        self._lobby_seats = 0
+        self._run_id = f"{int(time.time()):x}"
+        self._table_ids = itertools.count(1)
+        self._listener: Optional[socket.socket] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._context = multiprocessing.get_context("spawn")
+        self.stats = {"connections": 0, "routed": 0, "migrations": 0}
+
+    @property
+    def shards(self) -> List[int]:
+        return sorted(self._shards)
+
+    def route(self, table_id: str) -> int:
+        """Shard que atende ``table_id`` agora."""
+        placed = self._placement.get(table_id)
+        return placed if placed is not None else self._ring.node_for(table_id)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Sobe os shards e começa a escutar; devolve a porta."""
+        os.makedirs(self._data_dir, exist_ok=True)
+        for _ in range(self._initial):
+            shard = await self._spawn()
+            self._ring.add(shard.shard_id)
+        # Snapshots de uma execução com outro número de shards vão para o dono certo
+        await self.rebalance()
+        self._listener = socket.create_server((host, port), backlog=1024)
+        self._listener.setblocking(False)
+        self._spawn_task(self._accept_loop())
+        return self._listener.getsockname()[1]
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.close()
+        for task in list(self._tasks):
+            task.cancel()
+        for shard_id in list(self._shards):
+            await self._stop_shard(shard_id)
+
+    async def add_shard(self) -> int:
+        """Sobe mais um shard e migra para ele as mesas hibernadas que ganhou."""
+        shard = await self._spawn()
+        self._ring.add(shard.shard_id)
+        await self.rebalance()
+        return shard.shard_id
+
+    async def retire_shard(self, shard_id: int) -> Dict[str, int]:
+        """Tira o shard do anel; o processo para quando suas mesas saírem dele."""
+        self._ring.remove(shard_id)
+        self._retiring.add(shard_id)
+        return await self.rebalance()
+
+    async def rebalance(self) -> Dict[str, int]:
+        """Migra as mesas hibernadas que estão fora do dono no anel.
+
+        Devolve quantas foram movidas e quantas mesas em andamento ficaram
+        para depois (migram quando hibernarem).
+        """
+        moved = 0
+        for entry in sorted(os.listdir(self._data_dir)):
+            if not entry.startswith("shard-"):
+                continue
+            try:
+                shard_id = int(entry[len("shard-"):])
+            except ValueError:
+                continue
+            directory = os.path.join(self._data_dir, entry)
+            for name in os.listdir(directory):
+                table_id = name[:-len(".coup")]
+                if not name.endswith(".coup") or self._ring.node_for(table_id) == shard_id:
+                    continue
+                # Sem processo (pasta de outra execução) o arquivo só é movido
+                source = self._shards.get(shard_id)
+                moved += await self._migrate(table_id, os.path.join(directory, name), source)
+        deferred = sum(1 for t, s in self._placement.items() if self._ring.node_for(t) != s)
+        await self._stop_retired()
+        return {"moved": moved, "deferred": deferred}
+
+    async def shard_stats(self) -> Dict:
+        """Contadores da frente e de cada shard, com os totais."""
+        shards = {}
+        for shard_id, shard in list(self._shards.items()):
+            reply = await shard.request("stats")
+            shards[shard_id] = dict(reply["stats"], tables=reply["tables"], cache=reply["cache"])
+        totals = {key: sum(s[key] for s in shards.values())
+                  for key in ("turns", "tables_finished", "hibernated", "resumed")}
+        return {**self.stats, **totals, "shards": shards}
+
+    # --- Shards --------------------------------------------------------------
+    async def _spawn(self) -> _Shard:
+        shard_id = next(self._shard_ids)
+        directory = os.path.join(self._data_dir, f"shard-{shard_id}")
+        os.makedirs(directory, exist_ok=True)
+        front, back = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        process = self._context.Process(target=_worker_main, name=f"coup-shard-{shard_id}",
+                                        args=(shard_id, back, directory, self._options), daemon=True)
+        process.start()
+        back.close()
+        shard = _Shard(shard_id, process, _Channel(front), directory)
+        shard.listener = self._spawn_task(self._listen(shard))
+        self._shards[shard_id] = shard
+        await shard.request("stats")  # espera o processo subir
+        return shard
+
+    async def _stop_shard(self, shard_id: int) -> None:
+        shard = self._shards.pop(shard_id)
+        self._retiring.discard(shard_id)
+        try:
+            await asyncio.wait_for(shard.request("stop"), 5.0)
+        except (ConnectionError, asyncio.TimeoutError):
+            shard.process.terminate()
+        if shard.listener is not None:
+            shard.listener.cancel()
+        await asyncio.get_running_loop().run_in_executor(None, shard.process.join, 5.0)
+        shard.channel.close()
+
+    async def _stop_retired(self) -> None:
+        busy = set(self._placement.values())
+        for shard_id in list(self._retiring):
+            directory = self._shards[shard_id].directory
+            if shard_id not in busy and not any(n.endswith(".coup") for n in os.listdir(directory)):
+                await self._stop_shard(shard_id)
+
+    async def _listen(self, shard: _Shard) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                data = await loop.sock_recv(shard.channel.sock, MAX_MESSAGE)
+                if not data:
+                    return
+                message = json.loads(data)
+                if "rid" in message:
+                    shard.resolve(message)
+                else:
+                    self._on_event(shard, message)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            shard.fail()
+
+    def _on_event(self, shard: _Shard, message: Dict) -> None:
+        table_id = message["table"]
+        if self._placement.get(table_id) == shard.shard_id:
+            del self._placement[table_id]
+        if message["event"] == "hibernated" and self._ring.node_for(table_id) != shard.shard_id:
+            self._spawn_task(self._migrate(table_id, shard.path(table_id), shard))
+        elif shard.shard_id in self._retiring:
+            self._spawn_task(self._stop_retired())
+
+    async def _migrate(self, table_id: str, path: str, source: Optional[_Shard]) -> bool:
+        if table_id in self._moving:
+            return False
+        # Joins desta mesa esperam a migração terminar
+        self._moving[table_id] = moving = asyncio.Event()
+        try:
+            if source is not None:
+                reply = await source.request("release", table=table_id)
+                if reply["status"] != RELEASED:
+                    return False
+            target = self._shards[self._ring.node_for(table_id)]
+            os.replace(path, target.path(table_id))
+            await target.request("adopt", table=table_id)
+            self.stats["migrations"] += 1
+        finally:
+            del self._moving[table_id]
+            moving.set()
+        if source is not None and source.shard_id in self._retiring:
+            await self._stop_retired()
+        return True
+
+    # --- Clientes ------------------------------------------------------------
+    def _spawn_task(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _accept_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            sock, _ = await loop.sock_accept(self._listener)
+            self.stats["connections"] += 1
+            self._spawn_task(self._route(sock))
+
+    def _lobby_table(self) -> str:
+        """Mesa nova a cada ``humans`` clientes que entram sem pedir mesa."""
+        if self._lobby is None or self._lobby_seats >= self._humans:
+            self._lobby = f"t{self._run_id}-{next(self._table_ids)}"
+            self._lobby_seats = 0
+        self._lobby_seats += 1
+        return self._lobby
+
+    async def _route(self, sock: socket.socket) -> None:
+        loop = asyncio.get_running_loop()
+        buffer = b""
+        try:
+            while True:
+                while b"\n" not in buffer:
+                    chunk = await loop.sock_recv(sock, MAX_JOIN)
+                    if not chunk or len(buffer) > MAX_JOIN:
+                        return
+                    buffer += chunk
+                line, _, buffer = buffer.partition(b"\n")
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict) or message.get("type") != "join":
+                    await loop.sock_sendall(sock, _encode({"type": "error", "message": "Entre numa mesa primeiro"}))
+                    continue
+                table_id = message.get("table")
+                if table_id is None:
+                    message["table"] = table_id = self._lobby_table()
+                elif not (isinstance(table_id, str) and TABLE_ID.match(table_id)):
+                    await loop.sock_sendall(sock, _encode({"type": "error", "message": "Id de mesa inválido"}))
+                    continue
+                while table_id in self._moving:
+                    await self._moving[table_id].wait()
+                shard_id = self.route(table_id)
+                self._placement[table_id] = shard_id
+                await self._shards[shard_id].hand_off(sock, _encode(message) + buffer)
+                self.stats["routed"] += 1
+                return
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            sock.close()  # o shard tem a própria cópia do descritor
+
+
+# --- Teste de carga ------------------------------------------------------------
+def _client_batch(port: int, first: int, count: int, seed: int, think_ms: float) -> Tuple[List[float], int]:
+    """Roda ``count`` clientes num processo (para não disputar CPU com a frente)."""
+    async def run() -> Tuple[List[float], int]:
+        clients = [CoupClient(f"Cliente {first + i}", seed=seed + first + i, think_ms=think_ms)
+                   for i in range(count)]
+        await asyncio.gather(*(c.run("127.0.0.1", port) for c in clients), return_exceptions=True)
+        return [x for c in clients for x in c.latencies], sum(c.finished for c in clients)
+
+    return asyncio.run(run())
+
+
+async def load_test(shards: int, clients: int, client_procs: int = 2, players: int = 4,
+                    humans: int = 4, think_ms: float = 0.0, seed: int = 0) -> Dict:
+    """Sobe a frente com ``shards`` shards e ``clients`` clientes simulados.
+
+    Os clientes rodam em ``client_procs`` processos separados; o relatório
+    traz turnos/s somados de todos os shards e a latência p50/p99.
+    """
+    loop = asyncio.get_running_loop()
+    with tempfile.TemporaryDirectory() as data_dir:
+        router = ShardRouter(shards, data_dir, players=players, humans=humans)
+        port = await router.start()
+        sizes = [clients // client_procs + (i < clients % client_procs) for i in range(client_procs)]
+        firsts = list(itertools.accumulate([0] + sizes[:-1]))
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(client_procs, mp_context=context) as pool:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, _client_batch, port, first, size, seed, think_ms)
+                for first, size in zip(firsts, sizes) if size
+            ))
+            elapsed = time.perf_counter() - start
+        stats = await router.shard_stats()
+        await router.close()
+    latencies = [x for batch, _ in results for x in batch]
+    return {
+        "shards": shards,
+        "clients": clients,
+        "finished": sum(n for _, n in results),
+        "elapsed_s": elapsed,
+        "turns": stats["turns"],
+        "turns_per_s": stats["turns"] / elapsed,
+        "p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "per_shard_turns": {k: v["turns"] for k, v in stats["shards"].items()},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Mesas de Coup distribuídas em vários processos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1,
+                        help="processos de shard (padrão: um por núcleo)")
+    parser.add_argument("--data-dir", default="data/shards", help="pasta dos snapshots dos shards")
+    parser.add_argument("--players", type=int, default=4, help="assentos por mesa")
+    parser.add_argument("--humans", type=int, default=4, help="assentos de clientes por mesa")
+    parser.add_argument("--max-outbound", type=int, default=DEFAULT_OUTBOUND,
+                        help="mensagens na fila de saída de cada conexão")
+    parser.add_argument("--cache-mb", type=float, default=None,
+                        help="memória das partidas residentes em cada shard")
+    parser.add_argument("--turn-timeout", type=float, default=None,
+                        help="segundos para cada decisão (depois vale a padrão: Renda na ação)")
+    parser.add_argument("--reaction-timeout", type=float, default=None,
+                        help="segundos de cada janela de desafio ou bloqueio")
+    parser.add_argument("--load-test", action="store_true", help="roda o teste de carga local")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--client-procs", type=int, default=2,
+                        help="processos para os clientes simulados")
+    parser.add_argument("--think-ms", type=float, default=0.0,
+                        help="atraso máximo das respostas dos clientes simulados")
+    args = parser.parse_args(argv)
+
+    if args.load_test:
+        report = asyncio.run(load_test(args.shards, args.clients, args.client_procs,
+                                       args.players, args.humans, args.think_ms))
+        print(f"Shards: {report['shards']}  clientes: {report['clients']} "
+              f"({report['finished']} terminaram) em {report['elapsed_s']:.2f}s")
+        print(f"Turnos: {report['turns']} ({report['turns_per_s']:.0f}/s); "
+              f"por shard: {report['per_shard_turns']}")
+        print(f"Decisão -> atualização: p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+        return
+
+    async def serve() -> None:
+        cache_budget = int(args.cache_mb * 2**20) if args.cache_mb is not None else None
+        router = ShardRouter(args.shards, args.data_dir, players=args.players, humans=args.humans,
+                             max_outbound=args.max_outbound, cache_budget=cache_budget,
+                             turn_timeout=args.turn_timeout, reaction_timeout=args.reaction_timeout)
+        port = await router.start(args.host, args.port)
+        print(f"Frente do Coup em {args.host}:{port} com {len(router.shards)} shards")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await router.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
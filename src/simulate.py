@@ -0,0 +1,197 @@
+"""Simulação em lote de partidas entre IAs, sem pygame e sem I/O em disco.
+
+Com ``--beliefs N`` os ``N`` primeiros assentos usam um ``BeliefTracker``
+para decidir desafios, e com ``--endgame`` esses assentos (ou só o
+primeiro) jogam o mano a mano pela tabela de finais; o relatório de
+vitórias mostra o efeito.
+
+Uso:
+    python -m src.simulate --games 100000 --workers 8 --players 4
+    python -m src.simulate --games 20000 --beliefs 1
+    python -m src.simulate --games 20000 --beliefs 1 --endgame data/endgame.tb
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Os módulos de src/ usam imports planos (``from player import ...``).
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from beliefs import BeliefTracker
+from Deck import Deck
+from endgame import Tablebase
+from game_manager import GameManager
+from metrics import TurnMetrics
+from player import AIPlayer
+
+# O baralho padrão (15 cartas) só dá duas cartas a cada um até 6 jogadores
+MIN_PLAYERS, MAX_PLAYERS = 2, 6
+
+
+def play_game(
+    num_players: int = 4,
+    max_turns: int = 1000,
+    metrics: Optional[TurnMetrics] = None,
+    beliefs: int = 0,
+    endgame: Optional[Tablebase] = None,
+) -> Tuple[Optional[int], int]:
+    """Joga uma partida completa só com IAs.
+
+    Os ``beliefs`` primeiros assentos acompanham as cartas dos oponentes
+    com um ``BeliefTracker``; com ``endgame``, esses assentos (ou o
+    primeiro) consultam a tabela de finais.
+
+    Returns:
+        Tupla (assento do vencedor ou ``None`` se atingiu ``max_turns``, turnos jogados).
+    """
+    players = [AIPlayer(f"Bot {i + 1}") for i in range(num_players)]
+    for p in players[:beliefs]:
+        p.beliefs = BeliefTracker(p)
+    if endgame is not None:
+        for p in players[:max(beliefs, 1)]:
+            p.endgame = endgame
+    game = GameManager(players, state_file=None, deck=Deck(None), metrics=metrics,
+                       listeners=[p.beliefs for p in players[:beliefs]])
+    turns = 0
+    while not game.is_game_over and turns < max_turns:
+        game.play_turn()
+        turns += 1
+    winner = game.winner
+    return (players.index(winner) if winner is not None else None), turns
+
+
+def run_batch(games: int, num_players: int, max_turns: int, seed: int, beliefs: int = 0,
+              endgame: Optional[str] = None) -> Dict:
+    """Joga ``games`` partidas em sequência e agrega os resultados."""
+    table = Tablebase(endgame) if endgame is not None else None
+    random.seed(seed)
+    wins = [0] * num_players
+    turns = 0
+    unfinished = 0
+    for _ in range(games):
+        winner, played = play_game(num_players, max_turns, beliefs=beliefs, endgame=table)
+        turns += played
+        if winner is None:
+            unfinished += 1
+        else:
+            wins[winner] += 1
+    if table is not None:
+        table.close()
+    return {"games": games, "turns": turns, "wins": wins, "unfinished": unfinished}
+
+
+def _merge(total: Dict, part: Dict) -> None:
+    total["games"] += part["games"]
+    total["turns"] += part["turns"]
+    total["unfinished"] += part["unfinished"]
+    total["wins"] = [a + b for a, b in zip(total["wins"], part["wins"])]
+
+
+def simulate(
+    games: int,
+    workers: int = 1,
+    num_players: int = 4,
+    max_turns: int = 1000,
+    chunk_size: int = 1000,
+    seed: Optional[int] = None,
+    beliefs: int = 0,
+    endgame: Optional[str] = None,
+) -> Dict:
+    """Distribui as partidas em lotes por um pool de processos.
+
+    Cada lote recebe uma semente própria; sem ``seed`` a semente base é
+    sorteada, e com ela os resultados são reprodutíveis.
+    """
+    if not MIN_PLAYERS <= num_players <= MAX_PLAYERS:
+        raise ValueError(f"num_players precisa estar entre {MIN_PLAYERS} e {MAX_PLAYERS}")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    chunks: List[int] = [chunk_size] * (games // chunk_size)
+    if games % chunk_size:
+        chunks.append(games % chunk_size)
+    args = [(n, num_players, max_turns, seed + i, beliefs, endgame) for i, n in enumerate(chunks)]
+
+    total = {"games": 0, "turns": 0, "wins": [0] * num_players, "unfinished": 0}
+    start = time.perf_counter()
+    if workers <= 1:
+        for a in args:
+            _merge(total, run_batch(*a))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(run_batch, *zip(*args)):
+                _merge(total, part)
+    elapsed = time.perf_counter() - start
+
+    finished = total["games"] - total["unfinished"]
+    total.update({
+        "seed": seed,
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "games_per_s": total["games"] / elapsed if elapsed else 0.0,
+        "turns_per_s": total["turns"] / elapsed if elapsed else 0.0,
+        "win_rate": [w / finished if finished else 0.0 for w in total["wins"]],
+    })
+    return total
+
+
+def _print_report(report: Dict) -> None:
+    print(f"Partidas: {report['games']} ({report['unfinished']} sem vencedor)")
+    print(f"Turnos: {report['turns']}")
+    print(f"Tempo: {report['elapsed_s']:.2f}s com {report['workers']} processo(s)")
+    print(f"Partidas/s: {report['games_per_s']:.1f}")
+    print(f"Turnos/s: {report['turns_per_s']:.1f}")
+    for seat, rate in enumerate(report["win_rate"]):
+        print(f"  Assento {seat + 1}: {rate:.2%} de vitórias")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Simula partidas de Coup entre IAs.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--players", type=int, default=4, help=f"{MIN_PLAYERS} a {MAX_PLAYERS}")
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--beliefs", type=int, default=0,
+                        help="assentos (a partir do primeiro) que desafiam pelo BeliefTracker")
+    parser.add_argument("--endgame", help="tabela de finais (python -m src.endgame) para esses assentos")
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    parser.add_argument("--metrics", choices=("json", "prometheus"),
+                        help="joga --games partidas num só processo e imprime as métricas por fase")
+    args = parser.parse_args(argv)
+    if not MIN_PLAYERS <= args.players <= MAX_PLAYERS:
+        parser.error(f"--players precisa estar entre {MIN_PLAYERS} e {MAX_PLAYERS}")
+
+    if args.metrics:
+        if args.seed is not None:
+            random.seed(args.seed)
+        metrics = TurnMetrics()
+        table = Tablebase(args.endgame) if args.endgame else None
+        for _ in range(args.games):
+            play_game(args.players, args.max_turns, metrics, args.beliefs, table)
+        print(metrics.to_json() if args.metrics == "json" else metrics.to_prometheus(), end="")
+        return
+
+    report = simulate(
+        args.games,
+        workers=args.workers,
+        num_players=args.players,
+        max_turns=args.max_turns,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        beliefs=args.beliefs,
+        endgame=args.endgame,
+    )
+    if args.json:
+        print(json.dumps(report))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""Formato binário compacto e versionado para snapshots de jogo e baralho.
+
+Layout (little-endian):
+
+    cabeçalho | jogadores | histórico | cartas | índice de strings | strings
+
+- Jogadores e cartas são registros de tamanho fixo; personagens viram
+  inteiros pequenos (``CHARACTER_CODES``) e as cartas viradas de cada
+  jogador, uma mão empacotada (``cards.py``). A versão 1, sem as viradas,
+  ainda é lida.
+- O histórico também é de registros fixos: cada ``Outcome`` vira tipo,
+  assentos de quem agiu e do alvo, personagem e valor, sem texto; o
+  texto (com os nomes dos assentos) só é montado na exportação
+  (``to_dict``/``export_json``). Linhas que já são texto (vindas de um
+  JSON ou do diário) vão para a tabela de strings e o registro guarda o
+  índice. Nas versões 1 e 2 o histórico era só uma lista de índices de
+  strings; elas ainda são lidas.
+- Nomes e tipos de jogador ficam numa tabela de strings sem repetição.
+- ``SnapshotReader`` abre o arquivo via ``mmap`` e só decodifica o que
+  for pedido, então ler o turno ou um jogador não exige ler o arquivo todo.
+
+O JSON continua disponível para exportação (``export_json``).
+"""
+import mmap
+import struct
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
+
+from cards import CHARACTERS, card_id, names, pack
+from outcomes import Outcome, OutcomeKind, line_text
+from persistence import atomic_write_bytes, encode_json
+
+if TYPE_CHECKING:
+    from Deck import Deck
+    from game_manager import GameManager
+
+MAGIC = b"COUP"
+FORMAT_VERSION = 3
+
+KIND_GAME = 0
+KIND_DECK = 1
+
+CHARACTER_CODES = {name: code for code, name in enumerate(CHARACTERS)}
+NO_CHARACTER = 0xFF
+NO_STRING = 0xFFFFFFFF
+NO_SEAT = 0xFF
+TEXT_RECORD = 0xFF  # registro do histórico que é só texto (valor = índice da string)
+MAX_HAND = 4  # duas cartas + duas compradas durante uma troca
+
+# magic, versão, tipo, reservado, turno, nº jogadores, journal_seq,
+# deck_file, nº strings, nº histórico, nº cartas, nº descarte e offsets
+# das seções de strings, jogadores, histórico e cartas.
+HEADER = struct.Struct("<4sHBBHH10I")
+# nome, tipo, moedas, vivo, nº cartas, cartas, viradas (mão empacotada)
+PLAYER = struct.Struct(f"<IIHBB{MAX_HAND}BI")
+PLAYER_V1 = struct.Struct(f"<IIHBB{MAX_HAND}B")
+# id, personagem, em jogo
+CARD = struct.Struct("<HBB")
+# tipo (``OutcomeKind``), assento de quem agiu, assento do alvo, personagem, valor
+HISTORY = struct.Struct("<BBBBI")  # 8 bytes: ``history`` lê cada registro como um ``Q``
+U32 = struct.Struct("<I")
+
+_KINDS = list(OutcomeKind)
+
+
+class _StringTable:
+    """Tabela de strings sem repetição (interning)."""
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        idx = self._index.get(value)
+        if idx is None:
+            idx = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+    def encode(self) -> bytes:
+        blobs = [s.encode("utf-8") for s in self.strings]
+        offsets = [0]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(blobs)
+
+
+def _encode_card(card: int) -> bytes:
+    # Cartas do baralho e do descarte estão sempre fora de jogo
+    return CARD.pack(card_id(card), card & 7, 0)
+
+
+def _encode_line(line: Union[Outcome, str], strings: _StringTable) -> Optional[bytes]:
+    """Registro de uma linha do histórico, ou None se o ``Outcome`` não cabe nele.
+
+    ``action`` não cabe no registro, nem um personagem fora de ``CHARACTERS``;
+    esses ``Outcome`` são gravados como texto.
+    """
+    if not isinstance(line, Outcome):
+        return HISTORY.pack(TEXT_RECORD, NO_SEAT, NO_SEAT, NO_CHARACTER, strings.add(line))
+    character = NO_CHARACTER if line.character is None else CHARACTER_CODES.get(line.character)
+    if line.action is not None or character is None:
+        return None
+    return HISTORY.pack(
+        line.kind,
+        NO_SEAT if line.actor is None else line.actor,
+        NO_SEAT if line.target is None else line.target,
+        character,
+        line.amount,
+    )
+
+
+def _encode(
+    kind: int,
+    players: List[Dict],
+    history: Sequence,
+    cards: List[int],
+    discard_pile: List[int],
+    turn_index: int = 0,
+    journal_seq: int = 0,
+    deck_file: Optional[str] = None,
+) -> bytes:
+    strings = _StringTable()
+    player_bytes = bytearray()
+    for p in players:
+        chars = [CHARACTER_CODES[c] for c in p["characters"]]
+        if len(chars) > MAX_HAND:
+            raise ValueError(f"Mão com mais de {MAX_HAND} cartas: {p['name']}")
+        chars += [NO_CHARACTER] * (MAX_HAND - len(chars))
+        player_bytes += PLAYER.pack(
+            strings.add(p["name"]), strings.add(p.get("type")),
+            p["coins"], int(p["alive"]), len(p["characters"]), *chars,
+            pack(p.get("revealed", ())),
+        )
+    seat_names = [p["name"] for p in players]
+    records = []
+    for line in history:
+        record = _encode_line(line, strings)
+        if record is None:
+            record = _encode_line(line_text(line, seat_names), strings)
+        records.append(record)
+    history_bytes = b"".join(records)
+    card_bytes = b"".join(_encode_card(c) for c in cards) + b"".join(
+        _encode_card(c) for c in discard_pile
+    )
+    deck_file_idx = strings.add(deck_file)
+    string_bytes = strings.encode()
+
+    players_off = HEADER.size
+    history_off = players_off + len(player_bytes)
+    cards_off = history_off + len(history_bytes)
+    strings_off = cards_off + len(card_bytes)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, kind, 0, turn_index, len(players), journal_seq,
+        deck_file_idx, len(strings.strings), len(history), len(cards), len(discard_pile),
+        strings_off, players_off, history_off, cards_off,
+    )
+    return header + bytes(player_bytes) + history_bytes + card_bytes + string_bytes
+
+
+def encode_game(game: "GameManager") -> bytes:
+    """Snapshot do jogo completo (jogadores, histórico e baralho) em bytes."""
+    deck = game._deck
+    return _encode(
+        KIND_GAME,
+        [p.to_dict() for p in game.players],
+        game.history,
+        deck.cards,
+        deck.discard_pile,
+        turn_index=game._turn_index,
+        journal_seq=game._journal_seq,
+        deck_file=deck._json_file,
+    )
+
+
+def write_game(game: "GameManager", path: str) -> None:
+    """Grava o jogo completo (jogadores, histórico e baralho) em ``path``."""
+    atomic_write_bytes(path, encode_game(game))
+
+
+def write_deck(deck: "Deck", path: str) -> None:
+    """Grava só o baralho em ``path``."""
+    atomic_write_bytes(path, _encode(KIND_DECK, [], [], deck.cards, deck.discard_pile,
+                                     deck_file=deck._json_file))
+
+
+class SnapshotReader:
+    """Leitura preguiçosa de um snapshot via ``mmap``.
+
+    Use como gerenciador de contexto::
+
+        with SnapshotReader("jogo.coup") as snap:
+            print(snap.turn_index, snap.player(0)["name"])
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Snapshot vazio: {path}")
+        (magic, version, self._kind, _, self._turn_index, self._n_players,
+         self._journal_seq, self._deck_file_idx, self._n_strings, self._n_history,
+         self._n_cards, self._n_discard, self._strings_off, self._players_off,
+         self._history_off, self._cards_off) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Arquivo não é um snapshot do Coup: {path}")
+        if version not in (1, 2, FORMAT_VERSION):
+            self.close()
+            raise ValueError(f"Versão de snapshot não suportada: {version}")
+        self._version = version
+        self._player = PLAYER_V1 if version == 1 else PLAYER
+        self._history_size = HISTORY.size if version >= 3 else U32.size
+        self._blob_off = self._strings_off + U32.size * (self._n_strings + 1)
+        self._string_cache: Dict[int, str] = {}
+        self._all_strings: Optional[List[str]] = None
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    # --- Cabeçalho -------------------------------------------------------
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def is_deck_only(self) -> bool:
+        return self._kind == KIND_DECK
+
+    @property
+    def turn_index(self) -> int:
+        return self._turn_index
+
+    @property
+    def journal_seq(self) -> int:
+        return self._journal_seq
+
+    @property
+    def player_count(self) -> int:
+        return self._n_players
+
+    @property
+    def history_length(self) -> int:
+        return self._n_history
+
+    @property
+    def deck_file(self) -> Optional[str]:
+        return self.string(self._deck_file_idx)
+
+    # --- Seções ----------------------------------------------------------
+    def string(self, idx: int) -> Optional[str]:
+        if idx == NO_STRING:
+            return None
+        if self._all_strings is not None:
+            return self._all_strings[idx]
+        value = self._string_cache.get(idx)
+        if value is None:
+            start, end = struct.unpack_from("<2I", self._map, self._strings_off + U32.size * idx)
+            value = self._map[self._blob_off + start:self._blob_off + end].decode("utf-8")
+            self._string_cache[idx] = value
+        return value
+
+    def player(self, i: int) -> Dict:
+        """Jogador ``i`` no mesmo formato de ``Player.to_dict``."""
+        if not 0 <= i < self._n_players:
+            raise IndexError(i)
+        name, ptype, coins, alive, n_chars, *chars = self._player.unpack_from(
+            self._map, self._players_off + self._player.size * i
+        )
+        revealed = chars[MAX_HAND] if len(chars) > MAX_HAND else 0
+        return {
+            "name": self.string(name),
+            "coins": coins,
+            "characters": [CHARACTERS[c] for c in chars[:n_chars]],
+            "revealed": list(names(revealed)),
+            "alive": bool(alive),
+            "type": self.string(ptype),
+        }
+
+    def players(self) -> List[Dict]:
+        return [self.player(i) for i in range(self._n_players)]
+
+    def history_entry(self, i: int) -> Union[Outcome, str]:
+        """Linha ``i`` do histórico: ``Outcome`` (sem texto) ou ``str``."""
+        if not 0 <= i < self._n_history:
+            raise IndexError(i)
+        offset = self._history_off + self._history_size * i
+        if self._version < 3:
+            (idx,) = U32.unpack_from(self._map, offset)
+            return self.string(idx)
+        return self._decode_line(HISTORY.unpack_from(self._map, offset))
+
+    def history(self) -> List[Union[Outcome, str]]:
+        """Histórico como ``GameManager.history``: ``Outcome`` ou ``str`` (versões antigas)."""
+        if self._version < 3:
+            # Índices de uma vez só e a tabela de strings inteira, em vez de
+            # um ``unpack`` por linha
+            indices = struct.unpack_from(f"<{self._n_history}I", self._map, self._history_off)
+            if not indices:
+                return []
+            strings = self._strings()
+            return list(itemgetter(*indices)(strings)) if len(indices) > 1 else [strings[indices[0]]]
+        # Cada registro lido como um inteiro de 8 bytes; registros iguais
+        # (comuns no histórico) viram o mesmo ``Outcome``, decodificado uma vez
+        records = struct.unpack_from(f"<{self._n_history}Q", self._map, self._history_off)
+        decoded = {
+            record: self._decode_line(HISTORY.unpack(record.to_bytes(HISTORY.size, "little")))
+            for record in set(records)
+        }
+        return list(map(decoded.__getitem__, records))
+
+    def history_text(self) -> List[str]:
+        """Histórico em texto, com os nomes dos assentos (para exportação)."""
+        seat_names = [p["name"] for p in self.players()]
+        return [line_text(line, seat_names) for line in self.history()]
+
+    def _decode_line(self, record: tuple) -> Union[Outcome, str]:
+        kind, actor, target, character, value = record
+        if kind == TEXT_RECORD:
+            return self.string(value)
+        return Outcome(
+            _KINDS[kind],
+            None if actor == NO_SEAT else actor,
+            None if target == NO_SEAT else target,
+            None if character == NO_CHARACTER else CHARACTERS[character],
+            value,
+        )
+
+    def _strings(self) -> List[str]:
+        """Todas as strings da tabela, decodificadas uma única vez."""
+        if self._all_strings is None:
+            offsets = struct.unpack_from(f"<{self._n_strings + 1}I", self._map, self._strings_off)
+            blob = self._map[self._blob_off:self._blob_off + offsets[-1]]
+            self._all_strings = [blob[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+        return self._all_strings
+
+    def _card(self, i: int) -> Dict:
+        card_id, code, in_game = CARD.unpack_from(self._map, self._cards_off + CARD.size * i)
+        return {"id": card_id, "character": CHARACTERS[code], "in_game": bool(in_game)}
+
+    def cards(self) -> List[Dict]:
+        return [self._card(i) for i in range(self._n_cards)]
+
+    def discard_pile(self) -> List[Dict]:
+        return [self._card(self._n_cards + i) for i in range(self._n_discard)]
+
+    def to_dict(self) -> Dict:
+        """Estado completo no formato usado pelo JSON de ``save_state``."""
+        return {
+            "turn_index": self._turn_index,
+            "history": self.history_text(),
+            "players": self.players(),
+            "deck_file": self.deck_file,
+            "journal_seq": self._journal_seq,
+            "deck": {"cards": self.cards(), "discard_pile": self.discard_pile()},
+        }
+
+
+def read_deck(path: str) -> Dict:
+    """Lê o baralho de um snapshot (de jogo ou só de baralho)."""
+    with SnapshotReader(path) as snap:
+        return {"cards": snap.cards(), "discard_pile": snap.discard_pile()}
+
+
+def export_json(snapshot_path: str, json_path: str) -> None:
+    """Converte um snapshot binário para JSON legível."""
+    with SnapshotReader(snapshot_path) as snap:
+        data = snap.to_dict()
+    with open(json_path, "w", encoding="utf-8") as f:
+        f.write(encode_json(data))
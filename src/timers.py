@@ -0,0 +1,248 @@
+"""Roda de tempo hierárquica para os prazos de muitas mesas.
+
+Cada decisão com prazo (ação do turno, janela de desafio, janela de
+bloqueio) vira um ``Timer`` numa única ``TimerWheel`` por processo, em vez
+de uma tarefa ``asyncio.sleep`` por prazo. Agendar e cancelar são O(1):
+o timer entra no slot do seu tique de expiração e sai dele pelo próprio
+ponteiro. Uma tarefa só avança a roda a cada tique.
+
+A roda tem ``levels`` níveis de ``slots`` posições. O nível 0 tem um slot
+por tique; cada nível acima cobre ``slots`` vezes o alcance do anterior.
+Quando o nível 0 dá a volta, o slot corrente do nível 1 é redistribuído
+nos níveis de baixo (cascata), e assim por diante.
+
+Uso:
+    python -m src.timers --timers 200000
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Timer:
+    """Um prazo agendado; ``cancel`` o tira da roda."""
+
+    __slots__ = ("expires", "callback", "args", "_slot", "_wheel")
+
+    def __init__(self, wheel: "TimerWheel", expires: int, callback: Callable, args: tuple):
+        self._wheel = wheel
+        self.expires = expires  # em tiques
+        self.callback = callback
+        self.args = args
+        self._slot: Optional[Dict["Timer", None]] = None
+
+    @property
+    def active(self) -> bool:
+        return self._slot is not None
+
+    def cancel(self) -> bool:
+        """Cancela o prazo; ``False`` se ele já venceu ou foi cancelado."""
+        if self._slot is None:
+            return False
+        del self._slot[self]
+        self._slot = None
+        self._wheel._cancelled += 1
+        self._wheel._count -= 1
+        return True
+
+
+class TimerWheel:
+    """Roda de tempo hierárquica dirigida pelo relógio do laço asyncio.
+
+    Args:
+        tick: Resolução, em segundos.
+        slots: Posições por nível (potência de 2).
+        levels: Níveis; o alcance é ``tick * slots ** levels`` (prazos mais
+            longos esperam no último slot e são reagendados na cascata).
+    """
+
+    def __init__(self, tick: float = 0.01, slots: int = 256, levels: int = 4):
+        if slots & (slots - 1):
+            raise ValueError("slots precisa ser potência de 2")
+        self._tick = tick
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._levels = levels
+        self._wheels: List[List[Dict[Timer, None]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._now = 0          # tique corrente
+        self._origin: Optional[float] = None
+        self._count = 0
+        self._scheduled = 0
+        self._cancelled = 0
+        self._expired = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"pending": self._count, "scheduled": self._scheduled,
+                "cancelled": self._cancelled, "expired": self._expired}
+
+    # --- Agendamento -------------------------------------------------------
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> Timer:
+        """Chama ``callback(*args)`` daqui a ``delay`` segundos (arredondado para cima)."""
+        self._ensure_running()
+        # O prazo conta do relógio do laço, não de ``_now``: se o laço
+        # atrasou, a roda ainda não andou os tiques devidos
+        try:
+            due = max(0, self._due_ticks())
+        except RuntimeError:  # fora de um laço asyncio (uso manual com ``advance``)
+            due = 0
+        if self._count == 0:
+            self._now += due  # roda vazia: pula direto para o tique atual
+            due = 0
+        timer = Timer(self, self._now + due + max(1, math.ceil(delay / self._tick)), callback, args)
+        self._insert(timer)
+        self._count += 1
+        self._scheduled += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return timer
+
+    def _insert(self, timer: Timer) -> None:
+        delta = timer.expires - self._now
+        for level in range(self._levels):
+            if delta < 1 << (self._bits * (level + 1)):
+                break
+        else:
+            level = self._levels - 1
+            timer_tick = self._now + (self._mask << (self._bits * level))
+            slot = self._wheels[level][(timer_tick >> (self._bits * level)) & self._mask]
+            slot[timer] = None
+            timer._slot = slot
+            return
+        slot = self._wheels[level][(timer.expires >> (self._bits * level)) & self._mask]
+        slot[timer] = None
+        timer._slot = slot
+
+    # --- Avanço ------------------------------------------------------------
+    def advance(self, ticks: int) -> int:
+        """Avança ``ticks`` tiques disparando o que vencer; devolve quantos dispararam."""
+        fired = 0
+        for _ in range(ticks):
+            self._now += 1
+            # Cascata: ao dar a volta num nível, desce o slot corrente do de cima
+            for level in range(1, self._levels):
+                if self._now & ((1 << (self._bits * level)) - 1):
+                    break
+                slot = self._wheels[level][(self._now >> (self._bits * level)) & self._mask]
+                if slot:
+                    moved = list(slot)
+                    slot.clear()
+                    for timer in moved:
+                        self._insert(timer)
+            slot = self._wheels[0][self._now & self._mask]
+            while slot:
+                timer = next(iter(slot))
+                del slot[timer]
+                timer._slot = None
+                if timer.expires > self._now:  # longo demais para a roda: volta para ela
+                    self._insert(timer)
+                    continue
+                self._count -= 1
+                self._expired += 1
+                fired += 1
+                timer.callback(*timer.args)
+        return fired
+
+    def _due_ticks(self) -> int:
+        loop = asyncio.get_running_loop()
+        if self._origin is None:
+            self._origin = loop.time()
+        return int((loop.time() - self._origin) / self._tick) - self._now
+
+    def _ensure_running(self) -> None:
+        if self._task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            if self._count == 0:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            due = self._due_ticks()
+            if due > 0:
+                self.advance(due)
+            else:
+                await asyncio.sleep(self._tick)
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# --- Comparação com uma tarefa por prazo ---------------------------------------
+async def _bench(timers: int, cancel_ratio: float, seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    delays = [rng.uniform(0.05, 0.5) for _ in range(timers)]
+    cancel = [rng.random() < cancel_ratio for _ in range(timers)]
+    report: Dict[str, float] = {}
+
+    wheel = TimerWheel()
+    fired = 0
+
+    def hit() -> None:
+        nonlocal fired
+        fired += 1
+
+    start = time.perf_counter()
+    handles = [wheel.call_later(d, hit) for d in delays]
+    for h, c in zip(handles, cancel):
+        if c:
+            h.cancel()
+    report["wheel_schedule_us"] = (time.perf_counter() - start) / timers * 1e6
+    while len(wheel):
+        await asyncio.sleep(0.05)
+    report["wheel_fired"] = fired
+    wheel.close()
+
+    fired = 0
+
+    async def sleeper(delay: float) -> None:
+        nonlocal fired
+        await asyncio.sleep(delay)
+        fired += 1
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(sleeper(d)) for d in delays]
+    for t, c in zip(tasks, cancel):
+        if c:
+            t.cancel()
+    await asyncio.sleep(0)  # as tarefas só começam a dormir no próximo passo
+    report["tasks_schedule_us"] = (time.perf_counter() - start) / timers * 1e6
+    await asyncio.gather(*tasks, return_exceptions=True)
+    report["tasks_fired"] = fired
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Roda de tempo contra uma tarefa por prazo.")
+    parser.add_argument("--timers", type=int, default=100000)
+    parser.add_argument("--cancel", type=float, default=0.9,
+                        help="fração dos prazos cancelados (respostas antes do prazo)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = asyncio.run(_bench(args.timers, args.cancel, args.seed))
+    print(f"Prazos: {args.timers} ({args.cancel:.0%} cancelados)")
+    print(f"Roda de tempo: {report['wheel_schedule_us']:.2f} µs por agendar/cancelar, "
+          f"{report['wheel_fired']:.0f} venceram")
+    print(f"Uma tarefa por prazo: {report['tasks_schedule_us']:.2f} µs por agendar/cancelar, "
+          f"{report['tasks_fired']:.0f} venceram")
+
+
+if __name__ == "__main__":
+    main()
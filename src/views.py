@@ -0,0 +1,56 @@
+"""Visões serializáveis do estado de uma partida.
+
+``table_view`` é a visão completa (para a interface local, que mostra a
+mesa do ponto de vista do dono do processo). ``seat_view`` é o que um
+assento pode ver: as próprias cartas, e dos oponentes só a quantidade
+(as cartas viradas são públicas).
+Ambas são dicionários novos, sem referências ao estado vivo do jogo, e
+podem ser entregues a outra thread ou codificadas em JSON.
+"""
+from typing import TYPE_CHECKING, Dict, List
+
+from cards import card_character
+
+if TYPE_CHECKING:
+    from game_manager import GameManager
+
+
+def _common(game: "GameManager") -> Dict:
+    players = game.players
+    history = game.history
+    winner = game.winner
+    return {
+        "turn_index": game._turn_index,
+        "current": game._turn_index if players else None,
+        "rounds": len(history),
+        "last": game.describe(history[-1]) if history else None,
+        "discard": [card_character(c) for c in game._deck.discard_pile],
+        "game_over": game.is_game_over,
+        "winner": winner.name if winner is not None else None,
+    }
+
+
+def table_view(game: "GameManager") -> Dict:
+    """Estado completo da mesa, com as cartas de todos os jogadores."""
+    view = _common(game)
+    view["players"] = [
+        {"name": p.name, "coins": p.coins, "characters": list(p.characters),
+         "revealed": list(p.revealed), "alive": p.is_alive}
+        for p in game.players
+    ]
+    return view
+
+
+def seat_view(game: "GameManager", seat: int) -> Dict:
+    """Estado visto pelo assento ``seat``: cartas alheias viram só uma contagem."""
+    view = _common(game)
+    players: List[Dict] = []
+    for i, p in enumerate(game.players):
+        entry = {"name": p.name, "coins": p.coins, "cards": len(p.characters),
+                 "revealed": list(p.revealed), "alive": p.is_alive}
+        if i == seat:
+            entry["characters"] = list(p.characters)
+        players.append(entry)
+    view["seat"] = seat
+    view["players"] = players
+    return view
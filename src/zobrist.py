@@ -0,0 +1,283 @@
+"""Hash de Zobrist incremental dos estados de jogo e tabela de transposição.
+
+Cada componente do estado tem uma chave fixa de 64 bits: moedas de cada
+assento, cada cópia de cada personagem na mão e nas cartas viradas de
+cada assento, cada carta em cada posição do baralho, cada carta no
+descarte e o assento da vez. O hash é o XOR das chaves presentes, então
+uma mudança só desfaz a chave antiga e aplica a nova:
+
+- ``Player`` mantém o hash do próprio assento (moedas, mão, viradas) e o
+  atualiza no setter de ``coins``, em ``lose_influence`` e nas trocas de
+  carta; ``GameManager`` liga cada jogador ao seu assento.
+- ``Deck`` mantém o hash das pilhas em ``draw``, ``discard`` e
+  ``return_cards`` (O(1) por carta movida).
+- ``GameManager.zobrist`` junta a vez, o baralho e os jogadores.
+
+As chaves vêm de um misturador determinístico (splitmix64), não de um
+sorteio, então o mesmo estado tem o mesmo hash em qualquer processo e a
+tabela de transposição pode ser compartilhada entre eles.
+
+``TranspositionTable`` tem tamanho fixo e entradas de 16 bytes num
+buffer qualquer (por exemplo ``multiprocessing.shared_memory``). Cada
+entrada grava ``hash ^ dados`` e ``dados`` (o truque "lockless" de
+Hyatt): uma escrita concorrente pela metade não bate com o hash e vira
+só uma falha de consulta, sem travas.
+
+Uso:
+    python -m src.zobrist --depth 6 --entries 65536
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cards import CHARACTERS, HAND_BITS
+
+MASK = (1 << 64) - 1
+_COIN, _HAND, _REVEALED, _TURN, _DECK, _DISCARD = range(1, 7)
+COIN_KEYS = 64  # moedas acima disso usam o misturador direto
+_SLOTS = len(CHARACTERS) << HAND_BITS  # (personagem, n-ésima cópia)
+
+
+def _mix(x: int) -> int:
+    """Finalizador do splitmix64."""
+    x = (x + 0x9E3779B97F4A7C15) & MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK
+    return x ^ (x >> 31)
+
+
+def key(*parts: int) -> int:
+    """Chave de 64 bits de uma tupla de inteiros (sempre a mesma)."""
+    x = 0
+    for part in parts:
+        x = _mix(x ^ part)
+    return x
+
+
+class SeatKeys:
+    """Chaves de um assento: moedas e cópias de personagem na mão e viradas.
+
+    ``hand[(c << 4) + n]`` é a chave da n-ésima cópia do personagem ``c``;
+    uma mão é o XOR das chaves das cópias que ela tem.
+    """
+
+    __slots__ = ("seat", "coins", "hand", "revealed")
+
+    def __init__(self, seat: int):
+        self.seat = seat
+        self.coins = [key(_COIN, seat, c) for c in range(COIN_KEYS)]
+        self.hand = [key(_HAND, seat, i) if i & 15 else 0 for i in range(_SLOTS)]
+        self.revealed = [key(_REVEALED, seat, i) if i & 15 else 0 for i in range(_SLOTS)]
+
+    def coin(self, coins: int) -> int:
+        return self.coins[coins] if coins < COIN_KEYS else key(_COIN, self.seat, coins)
+
+    def player(self, coins: int, hand: int, revealed: int) -> int:
+        """Hash completo do assento (para ligar um jogador ou recalcular)."""
+        h = self.coin(coins)
+        for c in range(len(CHARACTERS)):
+            for n in range(1, (hand >> (HAND_BITS * c) & 15) + 1):
+                h ^= self.hand[(c << 4) + n]
+            for n in range(1, (revealed >> (HAND_BITS * c) & 15) + 1):
+                h ^= self.revealed[(c << 4) + n]
+        return h
+
+
+@lru_cache(maxsize=None)
+def seat_keys(seat: int) -> SeatKeys:
+    return SeatKeys(seat)
+
+
+@lru_cache(maxsize=None)
+def turn_key(seat: int) -> int:
+    return key(_TURN, seat)
+
+
+_deck_keys: Dict[int, int] = {}
+
+
+def deck_key(card: int, position: int) -> int:
+    """Chave de ``card`` (inteiro de ``cards.make_card``) na posição ``position`` do baralho."""
+    k = card << 16 | position
+    value = _deck_keys.get(k)
+    if value is None:
+        value = _deck_keys[k] = key(_DECK, card, position)
+    return value
+
+
+@lru_cache(maxsize=None)
+def discard_key(card: int) -> int:
+    return key(_DISCARD, card)
+
+
+def deck_hash(cards, discard_pile) -> int:
+    """Hash completo das pilhas (``cards`` na ordem interna do ``Deck``)."""
+    h = 0
+    for i, card in enumerate(cards):
+        h ^= deck_key(card, i)
+    for card in discard_pile:
+        h ^= discard_key(card)
+    return h
+
+
+# --- Tabela de transposição -------------------------------------------------------
+ENTRY_BYTES = 16
+_FLOAT = struct.Struct("<f")
+_U32 = struct.Struct("<I")
+
+
+class TranspositionTable:
+    """Tabela de transposição de tamanho fixo, com baldes de duas entradas.
+
+    Cada entrada guarda um valor (``float`` de 32 bits), a profundidade da
+    busca que o produziu, a geração (``new_search``) e uma jogada (16 bits,
+    como as de ``moves.encode_move``).
+
+    Substituição: no balde do hash, a entrada do mesmo hash é atualizada;
+    senão vai para uma entrada vazia ou de uma busca anterior; senão
+    substitui a de menor profundidade, se a nova for pelo menos tão
+    profunda. Caso contrário a gravação é descartada.
+
+    Args:
+        entries: Número de entradas (potência de 2).
+        buffer: Buffer gravável de ``entries * ENTRY_BYTES`` bytes para
+            compartilhar a tabela (por padrão um ``bytearray`` próprio).
+    """
+
+    __slots__ = ("_words", "_mask", "_generation", "hits", "misses", "stores", "replaced", "rejected")
+
+    def __init__(self, entries: int = 1 << 16, buffer=None):
+        if entries < 2 or entries & (entries - 1):
+            raise ValueError("entries precisa ser potência de 2 (>= 2)")
+        if buffer is None:
+            buffer = bytearray(entries * ENTRY_BYTES)
+        elif len(buffer) < entries * ENTRY_BYTES:
+            raise ValueError(f"buffer precisa de {entries * ENTRY_BYTES} bytes")
+        self._words = memoryview(buffer)[:entries * ENTRY_BYTES].cast("Q")
+        self._mask = (entries - 1) & ~1  # início do balde
+        self._generation = 1
+        self.hits = self.misses = self.stores = self.replaced = self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._words) // 2
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        probes = self.hits + self.misses
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / probes if probes else 0.0, "stores": self.stores,
+                "replaced": self.replaced, "rejected": self.rejected}
+
+    def new_search(self) -> None:
+        """Começa uma nova geração: as entradas antigas passam a ser substituíveis primeiro."""
+        self._generation = self._generation % 255 + 1
+
+    def clear(self) -> None:
+        words = self._words
+        for i in range(len(words)):
+            words[i] = 0
+        self.hits = self.misses = self.stores = self.replaced = self.rejected = 0
+
+    def probe(self, zobrist: int) -> Optional[Tuple[float, int, int]]:
+        """(valor, profundidade, jogada) guardados para ``zobrist``, ou ``None``."""
+        words = self._words
+        base = (zobrist & self._mask) << 1
+        for slot in (base, base + 2):
+            data = words[slot + 1]
+            if data and words[slot] ^ data == zobrist:
+                self.hits += 1
+                return _FLOAT.unpack(_U32.pack(data >> 32))[0], data >> 24 & 0xFF, data & 0xFFFF
+        self.misses += 1
+        return None
+
+    def store(self, zobrist: int, value: float, depth: int = 0, move: int = 0) -> bool:
+        """Grava a entrada; ``False`` se a política de substituição a descartou."""
+        data = (_U32.unpack(_FLOAT.pack(value))[0] << 32 | min(depth, 0xFF) << 24
+                | self._generation << 16 | move & 0xFFFF)
+        words = self._words
+        base = (zobrist & self._mask) << 1
+        victim = -1
+        victim_depth = 256
+        for slot in (base, base + 2):
+            old = words[slot + 1]
+            if not old or words[slot] ^ old == zobrist:
+                victim = slot
+                break
+            old_depth = old >> 24 & 0xFF
+            if old >> 16 & 0xFF != self._generation:
+                old_depth = -1  # de uma busca anterior
+            if old_depth < victim_depth:
+                victim, victim_depth = slot, old_depth
+        else:
+            if depth < victim_depth:
+                self.rejected += 1
+                return False
+            self.replaced += 1
+        words[victim + 1] = data
+        words[victim] = zobrist ^ data
+        self.stores += 1
+        return True
+
+
+# --- Demonstração: negamax de informação perfeita com make/unmake ------------------
+def _negamax(game, depth: int, table: Optional[TranspositionTable], counter: List[int]) -> float:
+    counter[0] += 1
+    me = game.current_player
+    if game.is_game_over:
+        return 1000.0 if game.winner is me else -1000.0
+    if depth == 0:
+        return float(me.coins + 10 * len(me.characters)
+                     - max(p.coins + 10 * len(p.characters) for p in game.alive_players if p is not me))
+    h = game.zobrist
+    if table is not None:
+        hit = table.probe(h)
+        # Só a mesma profundidade, para o valor bater com o da busca sem tabela
+        if hit is not None and hit[1] == depth:
+            return hit[0]
+    player = me
+    best = -1e9
+    for action in game.get_available_actions(player):
+        targets = [p for p in game.alive_players if p is not player] if action.needs_target else [None]
+        for target in targets:
+            game.make_action(action, target)
+            best = max(best, -_negamax(game, depth - 1, table, counter))
+            game.unmake()
+    if table is not None:
+        table.store(h, best, depth)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from Deck import Deck
+    from game_manager import GameManager
+    from player import AIPlayer
+
+    parser = argparse.ArgumentParser(description="Busca com e sem tabela de transposição.")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--entries", type=int, default=1 << 16)
+    args = parser.parse_args(argv)
+
+    for table in (None, TranspositionTable(args.entries)):
+        game = GameManager([AIPlayer(f"Bot {i + 1}") for i in range(args.players)],
+                           state_file=None, deck=Deck(None))
+        counter = [0]
+        start = time.perf_counter()
+        value = _negamax(game, args.depth, table, counter)
+        elapsed = time.perf_counter() - start
+        label = "sem tabela" if table is None else "com tabela"
+        print(f"{label}: valor {value:.0f}, {counter[0]} nós em {elapsed:.2f}s")
+        if table is not None:
+            stats = table.stats
+            print(f"  acertos {stats['hit_rate']:.1%}, gravações {stats['stores']}, "
+                  f"substituições {stats['replaced']}, descartes {stats['rejected']}")
+
+
+if __name__ == "__main__":
+    main()